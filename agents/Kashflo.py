@@ -1,18 +1,56 @@
+import asyncio
+import inspect
 from typing import Annotated
+
 from langchain.agents import create_agent
-from langchain_core.tools import tool, InjectedToolArg
+from langchain_core.tools import InjectedToolArg, StructuredTool
 from langchain_core.runnables import RunnableConfig
-from . import kashflo_help_agent, savings_advisor
+from . import get_kashflo_help_agent, get_savings_advisor
 from .context import UserDetails
-from .utils import model
+from const import SUPERVISOR_MODEL, AGENT_SUBAGENT_TIMEOUT_SECONDS
+from .snapshot import snapshot_prompt
+from .utils import get_model, get_routing_middleware, latest_message_content
+
+
+def _sub_agent_answer(result) -> str:
+    # An empty last message is passed on as is: the fallback would hand the supervisor the
+    # sub-agent's whole state, every message and tool output included
+    content = latest_message_content(result)
+    return str(result) if content is None else content
 
 
-@tool
-def finance_advisor(
-        request: str,
-        config: Annotated[RunnableConfig, InjectedToolArg]
-) -> str:
+def _sub_agent_tool(name: str, description: str, get_agent, error_prefix: str) -> StructuredTool:
     """
+    Wrap a sub-agent as a supervisor tool with both a sync and an async implementation. On the
+    async path independent calls from one supervisor turn run concurrently, each bounded by
+    ``AGENT_SUBAGENT_TIMEOUT_SECONDS`` and cancelled when it runs over.
+    """
+
+    def ask(request: str, config: Annotated[RunnableConfig, InjectedToolArg]) -> str:
+        try:
+            # Pass the config through to the sub-agent, this carries the user context
+            result = get_agent().invoke({"messages": [{"role": "user", "content": request}]}, config=config)
+            return _sub_agent_answer(result)
+        except Exception as e:
+            return f"{error_prefix}: {str(e)}"
+
+    async def aask(request: str, config: Annotated[RunnableConfig, InjectedToolArg]) -> str:
+        try:
+            result = await asyncio.wait_for(
+                get_agent().ainvoke({"messages": [{"role": "user", "content": request}]}, config=config),
+                timeout=AGENT_SUBAGENT_TIMEOUT_SECONDS
+            )
+            return _sub_agent_answer(result)
+        except asyncio.TimeoutError:
+            return f"{error_prefix}: the request took too long, try a narrower question"
+        except Exception as e:
+            return f"{error_prefix}: {str(e)}"
+
+    return StructuredTool.from_function(func=ask, coroutine=aask, name=name, description=inspect.cleandoc(description),
+                                        parse_docstring=False)
+
+
+finance_advisor = _sub_agent_tool("finance_advisor", """
     Get personalized financial advice and savings recommendations.
 
     Use this tool when users ask about:
@@ -30,37 +68,10 @@ def finance_advisor(
 
     Returns:
         Personalized financial advice based on user's transaction data
-    """
-    try:
-        # Pass the config through to the sub-agent
-        result = savings_advisor.invoke(
-            {"messages": [{"role": "user", "content": request}]},
-            config=config  # This passes the user context through
-        )
-
-        # Handle different response structures
-        if isinstance(result, dict) and "messages" in result and result["messages"]:
-            latest_message = result["messages"][-1]
-            if hasattr(latest_message, 'content'):
-                return latest_message.content
-            elif hasattr(latest_message, 'text'):
-                return latest_message.text
-            elif isinstance(latest_message, dict):
-                return latest_message.get('content', latest_message.get('text', str(latest_message)))
-            else:
-                return str(latest_message)
-        else:
-            return str(result)
-    except Exception as e:
-        return f"Error getting financial advice: {str(e)}"
-
-
-@tool
-def kashflo_helper(
-        request: str,
-        config: Annotated[RunnableConfig, InjectedToolArg]
-) -> str:
-    """
+    """, get_savings_advisor, "Error getting financial advice")
+
+
+kashflo_helper = _sub_agent_tool("kashflo_helper", """
     Get help with Kashflo app features, navigation, and technical support.
 
     Use this tool when users ask about:
@@ -79,29 +90,7 @@ def kashflo_helper(
 
     Returns:
         Step-by-step guidance and helpful information about Kashflo features
-    """
-    try:
-        # Pass the config through to the sub-agent
-        result = kashflo_help_agent.invoke(
-            {"messages": [{"role": "user", "content": request}]},
-            config=config  # This passes the user context through
-        )
-
-        # Handle different response structures
-        if isinstance(result, dict) and "messages" in result and result["messages"]:
-            latest_message = result["messages"][-1]
-            if hasattr(latest_message, 'content'):
-                return latest_message.content
-            elif hasattr(latest_message, 'text'):
-                return latest_message.text
-            elif isinstance(latest_message, dict):
-                return latest_message.get('content', latest_message.get('text', str(latest_message)))
-            else:
-                return str(latest_message)
-        else:
-            return str(result)
-    except Exception as e:
-        return f"Error getting help information: {str(e)}"
+    """, get_kashflo_help_agent, "Error getting help information")
 
 
 # Multi-Agent Supervisor Prompt
@@ -128,6 +117,8 @@ Available Specialized Agents:
 
 **Handle directly for:**
 - Simple greetings ("Hello", "Hi")
+- Questions answered by the user's financial snapshot below (current month totals, recent trend,
+  top categories, category list)
 - Basic app information
 - General Kashflo overview
 - Thank you messages
@@ -135,7 +126,8 @@ Available Specialized Agents:
 Response Strategy:
 1. **Analyze** the user's query intent and complexity
 2. **Route** to the appropriate specialist agent if needed
-3. **Synthesize** responses from multiple agents if the query is complex
+3. **Synthesize** responses from multiple agents if the query is complex. When a query has independent parts for
+   different agents, call all of them in the same turn instead of one after another; they run in parallel
 4. **Provide** clear, actionable, and personalized assistance
 5. **Follow up** with relevant suggestions or next steps
 
@@ -149,8 +141,12 @@ Communication Style:
 Remember: Your goal is to provide users with the most relevant, accurate, and helpful assistance by leveraging the expertise of specialized agents while maintaining a seamless user experience.
 """
 
-kashflo_supervisor_agent = create_agent(
-    model,
-    tools=[finance_advisor, kashflo_helper],
-    system_prompt=KASHFLO_SUPERVISOR_PROMPT
-)
\ No newline at end of file
+
+
+def build_kashflo_supervisor_agent():
+    return create_agent(
+        get_model(SUPERVISOR_MODEL),
+        tools=[finance_advisor, kashflo_helper],
+        system_prompt=KASHFLO_SUPERVISOR_PROMPT,
+        middleware=[snapshot_prompt, get_routing_middleware()]
+    )
@@ -1,8 +1,10 @@
 from langchain.agents import create_agent
 
 from .context import UserDetails
-from .utils import model
-from .tools import get_year_wise_category_report
+from const import SAVINGS_ADVISOR_MODEL
+from .snapshot import snapshot_prompt
+from .utils import get_model, get_routing_middleware
+from .tools import get_year_wise_category_report, get_budget_status
 
 SAVINGS_ADVISOR_PROMPT = (
     """You are Kashflo's AI Savings Advisor, a knowledgeable and supportive financial assistant specializing in personal finance management and savings optimization.
@@ -17,6 +19,7 @@ Your Role:
 Your Capabilities:
 You have access to the following tools to analyze user financial data:
 - get_year_wise_category_report: Get detailed monthly spending by category for any year
+- get_budget_status: Check spending against the user's monthly category budgets ("am I over budget?")
 
 Guidelines for Responses:
 1. **Be Personal & Supportive**: Address users by acknowledging their financial journey and goals
@@ -51,8 +54,12 @@ Communication Style:
     Remember: Your goal is to empower users to make better financial decisions and build sustainable savings habits. Always prioritize their financial well-being and long-term success."""
 )
 
-savings_advisor = create_agent(
-    model,
-    tools=[get_year_wise_category_report],
-    system_prompt=SAVINGS_ADVISOR_PROMPT,
-)
+
+
+def build_savings_advisor():
+    return create_agent(
+        get_model(SAVINGS_ADVISOR_MODEL),
+        tools=[get_year_wise_category_report, get_budget_status],
+        system_prompt=SAVINGS_ADVISOR_PROMPT,
+        middleware=[snapshot_prompt, get_routing_middleware()],
+    )
@@ -1,3 +1,23 @@
-from .SavingsAdvisorAgent import savings_advisor
-from .kashfloHelpAgent import kashflo_help_agent
-from .Kashflo import kashflo_supervisor_agent
+"""
+Agents are built lazily on first use: importing this package does not import LangChain or
+the model SDKs, so API workers that only serve CRUD traffic never pay for them.
+"""
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def get_savings_advisor():
+    from .SavingsAdvisorAgent import build_savings_advisor
+    return build_savings_advisor()
+
+
+@lru_cache(maxsize=None)
+def get_kashflo_help_agent():
+    from .kashfloHelpAgent import build_kashflo_help_agent
+    return build_kashflo_help_agent()
+
+
+@lru_cache(maxsize=None)
+def get_supervisor_agent():
+    from .Kashflo import build_kashflo_supervisor_agent
+    return build_kashflo_supervisor_agent()
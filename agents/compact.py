@@ -0,0 +1,104 @@
+"""
+Compact tabular encoding of tool results for LLM consumption.
+
+Verbose tool results repeat every key for every record. The compact form is a single
+header plus value rows, numbers are rounded, and long tables are capped with the remainder
+aggregated into one "Other" row, which cuts the tokens the model has to read.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from const import AGENT_TOOL_MAX_ROWS
+
+MONTH_ABBREVIATIONS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def round_amount(amount) -> float:
+    """Whole units for large amounts, cents only where they still matter."""
+    amount = float(amount or 0)
+    return round(amount) if abs(amount) >= 100 else round(amount, 2)
+
+
+def table(columns: List[str], rows: List[List], **extra) -> Dict:
+    return {"columns": columns, "rows": rows, **extra}
+
+
+def compact_category_report(report: Dict[str, List[Dict]], max_rows: int = AGENT_TOOL_MAX_ROWS) -> Dict:
+    """
+    Pivot ``{month name: [{category, total_amount, transaction_count}]}`` into one row per
+    category with a column per month, keeping the ``max_rows`` largest categories.
+    """
+    months = [datetime.strptime(month, "%B").month for month in report]
+    amounts = defaultdict(lambda: defaultdict(float))
+    counts = defaultdict(int)
+    for month_name, entries in report.items():
+        month = datetime.strptime(month_name, "%B").month
+        for entry in entries:
+            amounts[entry["category"]][month] += entry["total_amount"]
+            counts[entry["category"]] += entry["transaction_count"]
+
+    ranked = sorted(amounts, key=lambda category: -sum(amounts[category].values()))
+    kept, rest = ranked[:max_rows], ranked[max_rows:]
+
+    def row(label, category_amounts, count):
+        values = [round_amount(category_amounts.get(month, 0)) for month in months]
+        return [label, *values, round_amount(sum(category_amounts.values())), count]
+
+    rows = [row(category, amounts[category], counts[category]) for category in kept]
+    if rest:
+        other = defaultdict(float)
+        for category in rest:
+            for month, amount in amounts[category].items():
+                other[month] += amount
+        rows.append(row(f"Other ({len(rest)})", other, sum(counts[category] for category in rest)))
+
+    columns = ["category", *[MONTH_ABBREVIATIONS[month - 1] for month in months], "total", "count"]
+    return table(columns, rows)
+
+
+def compact_transactions(transactions: List[Dict], max_rows: Optional[int] = None) -> Dict:
+    rows = [[
+        transaction["transaction_date"][:10],
+        transaction["name"],
+        round_amount(transaction["amount"]),
+        transaction["currency"],
+        transaction["transaction_type"],
+        transaction["category"],
+        transaction["payment_method"],
+        transaction["account"],
+    ] for transaction in transactions]
+
+    extra = {}
+    if max_rows is not None and len(rows) > max_rows:
+        extra["omitted"] = len(rows) - max_rows
+        rows = rows[:max_rows]
+    return table(["date", "name", "amount", "currency", "type", "category", "method", "account"], rows, **extra)
+
+
+def compact_spending_summary(summary: Dict) -> Dict:
+    return {
+        "period": summary["period"],
+        "currency": summary["currency"],
+        "income": round_amount(summary["total_income"]),
+        "expenses": round_amount(summary["total_expenses"]),
+        "net": round_amount(summary["net_savings"]),
+        "top_categories": table(["category", "amount"], [
+            [category["category"], round_amount(category["amount"])]
+            for category in summary["top_spending_categories"]
+        ]),
+    }
+
+
+def compact_categories(categories: List[Dict], max_rows: int = 50) -> Dict:
+    rows = [[category["name"], category.get("description") or ""] for category in categories[:max_rows]]
+    extra = {"omitted": len(categories) - max_rows} if len(categories) > max_rows else {}
+    return table(["name", "description"], rows, **extra)
+
+
+def compact_budget_status(month: str, statuses: List[Dict]) -> Dict:
+    return {"month": month, "budgets": table(["category", "budget", "spent", "remaining", "used_pct", "status"], [
+        [item["category"], round_amount(item["amount"]), round_amount(item["spent"]),
+         round_amount(item["remaining"]), item["percent_used"], item["status"]]
+        for item in statuses
+    ])}
@@ -1,6 +1,8 @@
 # agents/context.py
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Optional
+
+from const import DEFAULT_CURRENCY
 
 
 @dataclass
@@ -9,13 +11,19 @@ class UserDetails:
     user_id: str
     user_name: str
     email: Optional[str] = None
+    # Amounts returned by the tools are converted to this currency
+    currency: str = DEFAULT_CURRENCY
+    # Precomputed financial snapshot, see agents/snapshot.py
+    snapshot: Optional[Dict] = None
 
     def to_dict(self):
         """Convert to dictionary for serialization"""
         return {
             "user_id": self.user_id,
             "user_name": self.user_name,
-            "email": self.email
+            "email": self.email,
+            "currency": self.currency,
+            "snapshot": self.snapshot
         }
 
     @classmethod
@@ -24,5 +32,7 @@ class UserDetails:
         return cls(
             user_id=data.get("user_id"),
             user_name=data.get("user_name"),
-            email=data.get("email")
-        )
\ No newline at end of file
+            email=data.get("email"),
+            currency=data.get("currency") or DEFAULT_CURRENCY,
+            snapshot=data.get("snapshot")
+        )
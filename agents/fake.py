@@ -0,0 +1,66 @@
+import asyncio
+import time
+from threading import Lock
+from typing import Any, List, Optional, Union
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import PrivateAttr
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Local, deterministic chat model for tests and benchmarks.
+
+    Scripted ``responses`` are returned in order and then cycled; without a script the model
+    echoes the last user message. ``latency_seconds`` simulates a slow provider and, like a
+    real client, a call slower than ``timeout`` gives up with ``TimeoutError`` after ``timeout``.
+    """
+    responses: List[Union[str, AIMessage]] = []
+    latency_seconds: float = 0.0
+    timeout: Optional[float] = None
+
+    _index: int = PrivateAttr(default=0)
+    _lock: Any = PrivateAttr(default_factory=Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _next_message(self, messages: List[BaseMessage]) -> AIMessage:
+        if not self.responses:
+            last_user_message = next((m for m in reversed(messages) if isinstance(m, HumanMessage)), None)
+            content = last_user_message.content if last_user_message else ""
+            return AIMessage(content=f"(fake) {content}")
+
+        with self._lock:
+            response = self.responses[self._index % len(self.responses)]
+            self._index += 1
+        if isinstance(response, str):
+            return AIMessage(content=response)
+        return response.model_copy(deep=True)
+
+    def _timed_out(self) -> bool:
+        return self.timeout is not None and self.latency_seconds > self.timeout
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                  **kwargs) -> ChatResult:
+        if self._timed_out():
+            time.sleep(self.timeout)
+            raise TimeoutError("Fake model call timed out")
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager=None,
+                         **kwargs) -> ChatResult:
+        if self._timed_out():
+            await asyncio.sleep(self.timeout)
+            raise TimeoutError("Fake model call timed out")
+        if self.latency_seconds:
+            await asyncio.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._next_message(messages))])
@@ -1,7 +1,8 @@
 from langchain.agents import create_agent
 
 from .context import UserDetails
-from .utils import model
+from const import HELP_AGENT_MODEL
+from .utils import get_model, get_routing_middleware
 from .tools import create_category, get_spending_summary, get_categories, get_user_transactions
 
 KASHFLO_HELP_AGENT = (
@@ -59,8 +60,12 @@ KASHFLO_HELP_AGENT = (
     Remember: Your goal is to empower users to understand their finances, organize spending categories effectively, and make better financial decisions that lead to sustainable savings habits."""
 )
 
-kashflo_help_agent = create_agent(
-    model,
-    tools=[create_category, get_spending_summary, get_categories, get_user_transactions],
-    system_prompt=KASHFLO_HELP_AGENT,
-)
+
+
+def build_kashflo_help_agent():
+    return create_agent(
+        get_model(HELP_AGENT_MODEL),
+        tools=[create_category, get_spending_summary, get_categories, get_user_transactions],
+        system_prompt=KASHFLO_HELP_AGENT,
+        middleware=[get_routing_middleware()],
+    )
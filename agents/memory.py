@@ -0,0 +1,137 @@
+"""
+Persisted conversation memory for the supervisor.
+
+Each thread keeps its LangChain messages (including the sub-agent tool calls and their
+results, so follow-up questions can reuse them) plus a rolling summary. Only the summary
+and the most recent messages that fit in ``AGENT_HISTORY_TOKEN_BUDGET`` are sent to the
+model; once the unsummarized history outgrows the budget the oldest turns are folded into
+the summary.
+"""
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, messages_from_dict, messages_to_dict, \
+    trim_messages
+from langchain_core.messages.utils import count_tokens_approximately
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from const import AGENT_HISTORY_TOKEN_BUDGET, SUMMARY_MODEL
+from models import Conversation, ConversationMessage
+from utils.database import SessionLocal
+from .utils import get_model
+
+SUMMARY_PROMPT = """You maintain the running summary of a conversation between a user and Kashflo, a personal finance assistant.
+Update the existing summary with the new messages. Keep every fact that may matter for follow-up questions:
+figures and periods that were looked up, categories or transactions that were created, advice that was given
+and open questions. Be concise and do not invent anything.
+
+Existing summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+
+def get_or_create_conversation(session: Session, user_id, thread_id: Optional[UUID] = None,
+                               title: Optional[str] = None) -> Conversation:
+    if thread_id:
+        conversation = session.query(Conversation).filter(Conversation.id == thread_id,
+                                                          Conversation.user_id == user_id).first()
+        if not conversation:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversation not found")
+        return conversation
+
+    conversation = Conversation(user_id=user_id, title=(title or "")[:80] or None)
+    session.add(conversation)
+    session.commit()
+    return conversation
+
+
+def load_history(session: Session, conversation: Conversation,
+                 token_budget: int = AGENT_HISTORY_TOKEN_BUDGET) -> List[BaseMessage]:
+    """Summary plus the most recent unsummarized messages that fit in ``token_budget``."""
+    rows = session.query(ConversationMessage.message).filter(
+        ConversationMessage.conversation_id == conversation.id,
+        ConversationMessage.is_summarized == False
+    ).order_by(ConversationMessage.position).all()
+
+    messages = messages_from_dict([row.message for row in rows])
+    if messages:
+        # Never start in the middle of a tool-call exchange
+        messages = trim_messages(messages, max_tokens=token_budget, token_counter=count_tokens_approximately,
+                                 strategy="last", start_on="human", allow_partial=False)
+
+    if conversation.summary:
+        messages = [SystemMessage(content=f"Summary of the earlier conversation:\n{conversation.summary}")] + messages
+    return messages
+
+
+def save_turn(session: Session, conversation: Conversation, messages: List[BaseMessage]):
+    """Append the messages of one turn (user question, tool exchanges and final answer)."""
+    next_position = session.query(func.coalesce(func.max(ConversationMessage.position), -1) + 1).filter(
+        ConversationMessage.conversation_id == conversation.id).scalar()
+
+    for offset, message in enumerate(messages):
+        session.add(ConversationMessage(
+            conversation_id=conversation.id,
+            position=next_position + offset,
+            message=messages_to_dict([message])[0],
+            token_count=count_tokens_approximately([message])
+        ))
+    conversation.updated_at = datetime.now(timezone.utc)
+    session.commit()
+
+
+def _render(messages: List[BaseMessage]) -> str:
+    return "\n".join(f"{message.type}: {message.content}" for message in messages if message.content)
+
+
+def summarize_conversation(conversation_id: UUID, token_budget: int = AGENT_HISTORY_TOKEN_BUDGET):
+    """
+    Fold the oldest unsummarized turns into the rolling summary once the history outgrows the
+    budget, keeping roughly half of the budget as verbatim recent history. Meant to run as a
+    background task after the response has been sent.
+    """
+    session = SessionLocal()
+    try:
+        conversation = session.get(Conversation, conversation_id)
+        if not conversation:
+            return
+
+        rows = session.query(ConversationMessage).filter(
+            ConversationMessage.conversation_id == conversation_id,
+            ConversationMessage.is_summarized == False
+        ).order_by(ConversationMessage.position).all()
+        if sum(row.token_count for row in rows) <= token_budget:
+            return
+
+        # Keep the newest turns verbatim, cutting only at the start of a user turn
+        kept_tokens = 0
+        cut = len(rows)
+        for index in range(len(rows) - 1, -1, -1):
+            kept_tokens += rows[index].token_count
+            if kept_tokens > token_budget // 2:
+                break
+            if rows[index].message.get("type") == "human":
+                cut = index
+        to_summarize = rows[:cut]
+        if not to_summarize:
+            return
+
+        messages = messages_from_dict([row.message for row in to_summarize])
+        summary = get_model(SUMMARY_MODEL).invoke([HumanMessage(content=SUMMARY_PROMPT.format(
+            summary=conversation.summary or "(none)",
+            messages=_render(messages)
+        ))])
+
+        conversation.summary = summary.content if isinstance(summary.content, str) else str(summary.content)
+        for row in to_summarize:
+            row.is_summarized = True
+        session.commit()
+    finally:
+        session.close()
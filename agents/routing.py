@@ -0,0 +1,120 @@
+import asyncio
+import contextvars
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, List, Sequence
+
+from langchain.agents.middleware import AgentMiddleware, ModelRequest, ModelResponse
+from langchain_core.language_models import BaseChatModel
+
+from .usage import TokenBudgetExceeded
+
+logger = logging.getLogger(__name__)
+
+class ModelRoutingMiddleware(AgentMiddleware):
+    """
+    Routes each model call of an agent through its own model followed by ``fallbacks``.
+
+    A call that fails moves on to the next model immediately. A call still running after
+    ``hedge_after_seconds`` (the latency SLO) gets a hedged duplicate on the next model and
+    whichever answers first wins; the other is cancelled. No single attempt may run longer
+    than ``timeout_seconds``; the models' own client timeout should match it, so that an
+    abandoned attempt also ends on the provider side.
+
+    Synchronous calls run on a pool of ``max_workers`` threads owned by this middleware, so
+    one agent's slow provider calls can't starve the model calls of other agents.
+    """
+
+    def __init__(self, fallbacks: Sequence[BaseChatModel] = (), timeout_seconds: float = 30,
+                 hedge_after_seconds: float = 8, max_workers: int = 16):
+        super().__init__()
+        self.fallbacks = list(fallbacks)
+        self.timeout_seconds = timeout_seconds
+        self.hedge_after_seconds = hedge_after_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-call")
+
+    def _candidates(self, request: ModelRequest) -> List[ModelRequest]:
+        models = [request.model] + [model for model in self.fallbacks if model is not request.model]
+        return [request if model is request.model else request.override(model=model) for model in models]
+
+    def wrap_model_call(self, request: ModelRequest,
+                        handler: Callable[[ModelRequest], ModelResponse]) -> ModelResponse:
+        candidates = iter(self._candidates(request))
+        pending = {}
+        errors = []
+        deadline = {}
+
+        def launch() -> bool:
+            candidate = next(candidates, None)
+            if candidate is None:
+                return False
+            # Run in a copy of the caller's context so callbacks and config still propagate
+            future = self._executor.submit(contextvars.copy_context().run, handler, candidate)
+            pending[future] = candidate
+            deadline[future] = time.monotonic() + self.timeout_seconds
+            return True
+
+        launch()
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=self.hedge_after_seconds, return_when=FIRST_COMPLETED)
+                if not done:
+                    # Slower than the SLO: hedge on the next model, drop attempts past their timeout
+                    for future in [future for future in pending if time.monotonic() >= deadline[future]]:
+                        pending.pop(future)
+                        errors.append(TimeoutError("Model call timed out"))
+                    launch()
+                    if not pending:
+                        break
+                    continue
+
+                for future in done:
+                    candidate = pending.pop(future)
+                    if future.exception() is None or isinstance(future.exception(), TokenBudgetExceeded):
+                        return future.result()
+                    logger.warning("Model %s failed: %s", type(candidate.model).__name__, future.exception())
+                    errors.append(future.exception())
+                if not pending:
+                    launch()
+            raise errors[-1] if errors else TimeoutError("Model call timed out")
+        finally:
+            # Only cancels attempts still queued; running ones end at the client timeout
+            for future in pending:
+                future.cancel()
+
+    async def awrap_model_call(self, request: ModelRequest, handler) -> ModelResponse:
+        candidates = iter(self._candidates(request))
+        pending = {}
+        errors = []
+
+        def launch() -> bool:
+            candidate = next(candidates, None)
+            if candidate is None:
+                return False
+            task = asyncio.ensure_future(asyncio.wait_for(handler(candidate), timeout=self.timeout_seconds))
+            pending[task] = candidate
+            return True
+
+        launch()
+        try:
+            while pending:
+                done, _ = await asyncio.wait(pending, timeout=self.hedge_after_seconds,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # Slower than the SLO: hedge on the next model (attempts time out on their own)
+                    launch()
+                    continue
+
+                for task in done:
+                    candidate = pending.pop(task)
+                    if task.exception() is None or isinstance(task.exception(), TokenBudgetExceeded):
+                        return task.result()
+                    logger.warning("Model %s failed: %s", type(candidate.model).__name__, task.exception())
+                    errors.append(task.exception())
+                if not pending:
+                    launch()
+            raise errors[-1] if errors else TimeoutError("Model call timed out")
+        finally:
+            for task in pending:
+                task.cancel()
@@ -0,0 +1,72 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+from uuid import UUID
+
+from langchain_core.messages import AIMessage, HumanMessage
+from sqlalchemy.orm import Session
+
+from . import get_supervisor_agent
+from .context import UserDetails
+from .snapshot import build_snapshot
+from .memory import get_or_create_conversation, load_history, save_turn
+from .usage import UsageTracker, TokenBudgetExceeded, check_user_budget, record_usage
+from .utils import extract_response_content
+
+TRUNCATED_ANSWER = ("I had to stop before finishing because this request reached its usage limit. "
+                    "Please try a narrower question.")
+
+
+@dataclass
+class SupervisorTurn:
+    content: str
+    thread_id: UUID
+    truncated: bool = False
+    usage: Dict = field(default_factory=dict)
+
+
+async def run_supervisor_turn(session: Session, user, query: str, thread_id: Optional[UUID] = None) -> SupervisorTurn:
+    """
+    Run one conversation turn through the supervisor: enforce the user's daily budget, load the
+    thread history, invoke the agent under a per-run token budget and persist the turn and usage.
+    Blocking database work runs in worker threads; the session is only used by one of them at a time.
+    """
+    conversation = await asyncio.to_thread(get_or_create_conversation, session, user.id, thread_id, query)
+    await asyncio.to_thread(check_user_budget, session, user.id)
+
+    # Read from the rollup, lets most questions be answered without an orienting tool call
+    snapshot = await asyncio.to_thread(build_snapshot, session, user.id, currency=user.base_currency)
+    user_details = UserDetails(
+        user_id=str(user.id),
+        user_name=f"{user.first_name} {user.last_name}",
+        currency=user.base_currency,
+        snapshot=snapshot
+    )
+
+    # Building the agent the first time is blocking work, keep it off the event loop
+    supervisor_agent = await asyncio.to_thread(get_supervisor_agent)
+
+    # Summary and recent turns of this thread, trimmed to the history token budget
+    history = await asyncio.to_thread(load_history, session, conversation)
+    input_messages = history + [HumanMessage(content=query)]
+
+    tracker = UsageTracker()
+    truncated = False
+    try:
+        response = await supervisor_agent.ainvoke(
+            {"messages": input_messages},
+            config={"configurable": {"user_details": user_details}, "callbacks": [tracker]}
+        )
+        content = extract_response_content(response)
+        new_messages = response["messages"][len(input_messages):] if isinstance(response, dict) else []
+    except TokenBudgetExceeded:
+        # Graceful truncation: return the best answer produced so far instead of failing the request
+        truncated = True
+        content = tracker.last_answer or TRUNCATED_ANSWER
+        new_messages = [AIMessage(content=content)]
+
+    # Persist the question and everything the agent produced for it
+    await asyncio.to_thread(save_turn, session, conversation, [HumanMessage(content=query)] + new_messages)
+    await asyncio.to_thread(record_usage, session, user.id, conversation.id, tracker, truncated)
+
+    return SupervisorTurn(content=content, thread_id=conversation.id, truncated=truncated, usage=tracker.summary())
@@ -0,0 +1,99 @@
+"""
+Per-user financial snapshot injected into the agents' system prompt.
+
+Built from the ``monthly_category_totals`` rollup (a few small indexed reads), it carries
+what the agents used to look up first with a tool call: the current month's totals, the
+last 12 months' trend, the top spending categories and the active category names.
+"""
+import json
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Optional
+
+from langchain.agents.middleware import ModelRequest, dynamic_prompt
+from langgraph.config import get_config
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from const import DEFAULT_CURRENCY
+from models import Category, MonthlyCategoryTotal
+from utils.fx import converter
+from utils.transaction_enums import TransactionType
+from .compact import round_amount, table
+
+SNAPSHOT_MONTHS = 12
+SNAPSHOT_TOP_CATEGORIES = 5
+
+SNAPSHOT_PROMPT = """
+
+User's financial snapshot (amounts in "currency", "net" is income minus expenses):
+{snapshot}
+Answer from this snapshot when it is enough; use the tools only for details it does not cover
+(individual transactions, other years, per-month category breakdowns)."""
+
+
+def _months_back(month: date, count: int) -> date:
+    index = month.year * 12 + month.month - 1 - count
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def build_snapshot(session: Session, user_id, today: Optional[date] = None,
+                   currency: str = DEFAULT_CURRENCY) -> Dict:
+    today = today or date.today()
+    current_month = date(today.year, today.month, 1)
+    first_month = _months_back(current_month, SNAPSHOT_MONTHS - 1)
+    in_window = [MonthlyCategoryTotal.user_id == user_id, MonthlyCategoryTotal.month >= first_month]
+
+    rows = session.query(
+        MonthlyCategoryTotal.month, MonthlyCategoryTotal.transaction_type, MonthlyCategoryTotal.currency,
+        Category.name, func.sum(MonthlyCategoryTotal.total_amount)
+    ).join(Category, Category.id == MonthlyCategoryTotal.category_id).filter(*in_window).group_by(
+        MonthlyCategoryTotal.month, MonthlyCategoryTotal.transaction_type, MonthlyCategoryTotal.currency,
+        Category.name
+    ).all()
+    convert = converter(session, {row.currency for row in rows}, currency)
+
+    totals = defaultdict(lambda: defaultdict(float))
+    category_totals = defaultdict(float)
+    for month, transaction_type, row_currency, category_name, amount in rows:
+        converted = convert(amount, row_currency, month)
+        totals[month][transaction_type] += converted
+        if transaction_type == TransactionType.EXPENSE:
+            category_totals[category_name] += converted
+
+    def period(month: date):
+        income = totals[month][TransactionType.INCOME]
+        expenses = totals[month][TransactionType.EXPENSE]
+        return [month.strftime("%Y-%m"), round_amount(income), round_amount(expenses),
+                round_amount(income - expenses)]
+
+    top_categories = sorted(category_totals.items(), key=lambda item: item[1], reverse=True)[
+        :SNAPSHOT_TOP_CATEGORIES]
+
+    categories = session.query(Category.name).filter(Category.user_id == user_id,
+                                                     Category.is_active == True).order_by(Category.name).all()
+
+    return {
+        "as_of": today.isoformat(),
+        "currency": currency,
+        "current_month": dict(zip(["month", "income", "expenses", "net"], period(current_month))),
+        "trend": table(["month", "income", "expenses", "net"],
+                       [period(month) for month in sorted(totals) if month != current_month]),
+        "top_expense_categories_12m": table(["category", "amount"],
+                                            [[name, round_amount(total)] for name, total in top_categories]),
+        "active_categories": [name for (name,) in categories],
+    }
+
+
+def render_snapshot(snapshot: Dict) -> str:
+    return SNAPSHOT_PROMPT.format(snapshot=json.dumps(snapshot, separators=(",", ":")))
+
+
+@dynamic_prompt
+def snapshot_prompt(request: ModelRequest) -> str:
+    """Append the snapshot carried by ``UserDetails`` in the run config to the agent's system prompt."""
+    user_details = get_config().get("configurable", {}).get("user_details")
+    snapshot = user_details.get("snapshot") if isinstance(user_details, dict) else getattr(
+        user_details, "snapshot", None)
+    base_prompt = request.system_prompt or ""
+    return base_prompt + render_snapshot(snapshot) if snapshot else base_prompt
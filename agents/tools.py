@@ -1,13 +1,23 @@
 from typing import Annotated, Dict, List, Optional
 from langchain_core.tools import tool, InjectedToolArg
 from langchain_core.runnables import RunnableConfig
-from datetime import datetime
+from datetime import date, datetime
 from collections import defaultdict
 from sqlalchemy import func, extract
+from sqlalchemy.exc import IntegrityError
 
+from const import AGENT_TOOL_OUTPUT_MODE, DEFAULT_CURRENCY
 from models.transaction import Transaction, Category
 from models.users import User
 from utils.database import SessionLocal
+from utils.read_routing import read_session_for
+from utils.budgets import budget_status, month_start
+from utils.category_cache import category_names
+from utils.fx import MissingFxRate, converter
+from utils.reports import year_wise_category_report
+from utils.transaction_enums import TransactionType
+from .compact import compact_category_report, compact_transactions, compact_spending_summary, compact_categories, \
+    compact_budget_status
 
 
 def get_user_id_from_config(config: RunnableConfig) -> Optional[str]:
@@ -56,56 +66,23 @@ def get_year_wise_category_report(
     if not user_id:
         return {"error": "User ID not found in context"}
 
-    session = SessionLocal()
-    try:
-        start_date = datetime(year, 1, 1)
-        end_date = datetime(year, 12, 31, 23, 59, 59)
-
-        query = session.query(
-            extract('month', Transaction.transaction_date).label('month'),
-            Category.name.label('category_name'),
-            func.sum(Transaction.amount).label('total_amount'),
-            func.count(Transaction.id).label('transaction_count')
-        ).join(
-            Transaction.category
-        ).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date <= end_date
-        ).group_by(
-            extract('month', Transaction.transaction_date),
-            Category.id
-        ).order_by(
-            extract('month', Transaction.transaction_date)
-        )
+    # Read-only, served by the replica unless it lags behind this user's last write
+    currency = user_details.get("currency") if isinstance(user_details, dict) else user_details.currency
+    currency = currency or DEFAULT_CURRENCY
 
-        if exclude_categories:
-            query = query.filter(~Category.name.in_(exclude_categories))
-
-        results = query.all()
+    session = read_session_for(user_id)
+    try:
+        report = year_wise_category_report(session, user_id, year, exclude_categories, currency)
 
-        if not results:
+        if not report:
             return {"message": "No transactions found for the specified year"}
 
-        def month_name(month_num: int) -> str:
-            return datetime(1900, month_num, 1).strftime("%B")
-
-        month_data = defaultdict(list)
-        for row in results:
-            month_data[month_name(int(row.month))].append({
-                "category": row.category_name,
-                "total_amount": float(row.total_amount),
-                "transaction_count": row.transaction_count,
-            })
-
-        ordered_months = sorted(
-            month_data.items(),
-            key=lambda x: datetime.strptime(x[0], "%B").month
-        )
-
-        response = {month: data for month, data in ordered_months}
-        return {"data": response}
+        if AGENT_TOOL_OUTPUT_MODE == "compact":
+            return {"year": year, "currency": currency, "data": compact_category_report(report)}
+        return {"currency": currency, "data": report}
 
+    except MissingFxRate as error:
+        return {"error": error.detail}
     finally:
         session.close()
 
@@ -133,12 +110,15 @@ def get_user_transactions(
 
     user_id = user_details.user_id
 
-    session = SessionLocal()
+    session = read_session_for(user_id)
     try:
         query = session.query(Transaction).filter(Transaction.user_id == user_id)
 
         if category_name:
-            query = query.join(Category).filter(Category.name == category_name)
+            category_id = category_names.lookup(session, user_id, category_name)
+            if not category_id:
+                return {"message": f"No category named {category_name}"}
+            query = query.filter(Transaction.category_id == category_id)
 
         transactions = query.order_by(
             Transaction.transaction_date.desc()
@@ -153,6 +133,7 @@ def get_user_transactions(
                 "id": str(transaction.id),
                 "name": transaction.name,
                 "amount": float(transaction.amount),
+                "currency": transaction.currency,
                 "transaction_type": transaction.transaction_type.value,
                 "transaction_date": transaction.transaction_date.isoformat(),
                 "category": transaction.category.name if transaction.category else None,
@@ -161,6 +142,8 @@ def get_user_transactions(
                 "description": transaction.description
             })
 
+        if AGENT_TOOL_OUTPUT_MODE == "compact":
+            return {"transactions": compact_transactions(transaction_data)}
         return {"transactions": transaction_data}
 
     finally:
@@ -190,7 +173,7 @@ def get_spending_summary(
 
     user_id = user_details.user_id
 
-    session = SessionLocal()
+    session = read_session_for(user_id)
     try:
         start_date = datetime(year, month or 1, 1)
         if month:
@@ -201,49 +184,52 @@ def get_spending_summary(
         else:
             end_date = datetime(year + 1, 1, 1)
 
-        income_query = session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date < end_date,
-            Transaction.transaction_type == 'income'
-        )
-
-        expense_query = session.query(func.sum(Transaction.amount)).filter(
-            Transaction.user_id == user_id,
-            Transaction.transaction_date >= start_date,
-            Transaction.transaction_date < end_date,
-            Transaction.transaction_type == 'expense'
-        )
-
-        total_income = income_query.scalar() or 0
-        total_expenses = expense_query.scalar() or 0
-        net_savings = float(total_income) - float(total_expenses)
-
-        category_spending = session.query(
+        # Summed per month and currency in the database; only these aggregates are converted
+        rows = session.query(
+            extract('month', Transaction.transaction_date).label('month'),
+            Transaction.transaction_type,
+            Transaction.currency,
             Category.name,
             func.sum(Transaction.amount).label('total')
-        ).join(Transaction).filter(
+        ).outerjoin(Transaction.category).filter(
             Transaction.user_id == user_id,
             Transaction.transaction_date >= start_date,
-            Transaction.transaction_date < end_date,
-            Transaction.transaction_type == 'expense'
-        ).group_by(Category.name).order_by(
-            func.sum(Transaction.amount).desc()
-        ).limit(5).all()
+            Transaction.transaction_date < end_date
+        ).group_by(extract('month', Transaction.transaction_date), Transaction.transaction_type,
+                   Transaction.currency, Category.name).all()
+        convert = converter(session, {row.currency for row in rows}, user_details.currency)
+
+        totals = defaultdict(float)
+        category_spending = defaultdict(float)
+        for row in rows:
+            amount = convert(row.total, row.currency, date(year, int(row.month), 1))
+            totals[row.transaction_type] += amount
+            if row.transaction_type == TransactionType.EXPENSE and row.name:
+                category_spending[row.name] += amount
+
+        total_income = totals[TransactionType.INCOME]
+        total_expenses = totals[TransactionType.EXPENSE]
+        net_savings = total_income - total_expenses
 
         top_categories = [
-            {"category": cat.name, "amount": float(cat.total)}
-            for cat in category_spending
+            {"category": name, "amount": round(amount, 2)}
+            for name, amount in sorted(category_spending.items(), key=lambda item: item[1], reverse=True)[:5]
         ]
 
-        return {
+        summary = {
             "period": f"{year}" + (f"-{month:02d}" if month else ""),
-            "total_income": float(total_income),
-            "total_expenses": float(total_expenses),
-            "net_savings": net_savings,
+            "currency": user_details.currency,
+            "total_income": round(total_income, 2),
+            "total_expenses": round(total_expenses, 2),
+            "net_savings": round(net_savings, 2),
             "top_spending_categories": top_categories
         }
+        if AGENT_TOOL_OUTPUT_MODE == "compact":
+            return compact_spending_summary(summary)
+        return summary
 
+    except MissingFxRate as error:
+        return {"error": error.detail}
     finally:
         session.close()
 
@@ -265,7 +251,7 @@ def get_categories(
 
     user_id = user_details.user_id
 
-    session = SessionLocal()
+    session = read_session_for(user_id)
     try:
         categories = session.query(Category).filter(
             Category.user_id == user_id,
@@ -284,12 +270,59 @@ def get_categories(
                 "is_active": category.is_active
             })
 
+        if AGENT_TOOL_OUTPUT_MODE == "compact":
+            return {"categories": compact_categories(category_data)}
         return {"categories": category_data}
 
     finally:
         session.close()
 
 
+@tool
+def get_budget_status(
+        month: Optional[str] = None,
+        config: Annotated[RunnableConfig, InjectedToolArg] = None
+) -> Dict:
+    """
+    Get the user's monthly budgets with the amount spent so far, what remains and whether each
+    budget is ok, close to its limit (warning) or over.
+
+    Args:
+        month: Optional month as YYYY-MM (default: the current month)
+
+    Returns:
+        Dictionary containing the status of every budget
+    """
+    # Extract user_id from config
+    user_details = config.get("configurable", {}).get("user_details")
+    if not user_details:
+        return {"error": "User context not provided"}
+
+    user_id = user_details.user_id
+
+    try:
+        period = month_start(month)
+    except ValueError:
+        return {"error": "month must be formatted as YYYY-MM"}
+
+    session = read_session_for(user_id)
+    try:
+        statuses = budget_status(session, user_id, period, user_details.currency)
+        if not statuses:
+            return {"message": "No budgets set up"}
+
+        if AGENT_TOOL_OUTPUT_MODE == "compact":
+            return compact_budget_status(period.strftime("%Y-%m"), statuses)
+        return {"month": period.strftime("%Y-%m"),
+                "budgets": [{**item, "budget_id": str(item["budget_id"]), "category_id": str(item["category_id"])}
+                            for item in statuses]}
+
+    except MissingFxRate as error:
+        return {"error": error.detail}
+    finally:
+        session.close()
+
+
 @tool
 def create_category(
         category_name: str,
@@ -315,10 +348,8 @@ def create_category(
 
     session = SessionLocal()
     try:
-        existing_category = session.query(Category).filter(
-            Category.user_id == user_id,
-            Category.name == category_name
-        ).first()
+        existing_id = category_names.lookup(session, user_id, category_name)
+        existing_category = session.get(Category, existing_id) if existing_id else None
 
         if existing_category:
             return {
@@ -336,7 +367,14 @@ def create_category(
             user_id=user_id
         )
         session.add(new_category)
-        session.commit()
+        try:
+            session.commit()
+        except IntegrityError:
+            # Created concurrently under the same name
+            session.rollback()
+            return {"message": "Category already present", "category": {"name": category_name}}
+        finally:
+            category_names.invalidate(user_id)
 
         return {
             "message": "Category successfully created",
@@ -0,0 +1,174 @@
+"""
+Token and cost accounting for agent runs.
+
+A ``UsageTracker`` is attached as a callback to the supervisor run; the config (and with it
+the callback) is passed down to the sub-agents, so every model call of the run is counted.
+Provider-reported usage is used when available, otherwise tokens are estimated.
+"""
+from collections import defaultdict
+from datetime import datetime, timezone, timedelta
+from threading import Lock
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import LLMResult
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from const import AGENT_RUN_TOKEN_BUDGET, AGENT_USER_DAILY_TOKEN_BUDGET, AGENT_PROMPT_PRICE_PER_MTOK, \
+    AGENT_CACHED_PROMPT_PRICE_PER_MTOK, AGENT_COMPLETION_PRICE_PER_MTOK
+from models import AgentUsage
+
+
+class TokenBudgetExceeded(Exception):
+    """Raised before a model call that would start after the run's token budget is used up."""
+
+
+def _prompt_part(message: BaseMessage) -> str:
+    """Label used for the prompt-size breakdown."""
+    if message.type == "system":
+        first_line = str(message.content).strip().splitlines()[0] if message.content else ""
+        return f"system: {first_line[:60]}"
+    if message.type == "tool":
+        return f"tool: {getattr(message, 'name', None) or 'unknown'}"
+    if message.type == "ai":
+        return "assistant"
+    return "user"
+
+
+class UsageTracker(BaseCallbackHandler):
+    # Budget violations must abort the run instead of being logged and ignored
+    raise_error = True
+
+    def __init__(self, token_budget: int = AGENT_RUN_TOKEN_BUDGET):
+        self.token_budget = token_budget
+        self.llm_calls = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.prompt_breakdown = defaultdict(int)
+        self.last_answer: Optional[str] = None
+        self._estimated_prompts: Dict[UUID, int] = {}
+        self._lock = Lock()
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    @property
+    def cost(self) -> float:
+        uncached_prompt_tokens = self.prompt_tokens - self.cached_tokens
+        return round((uncached_prompt_tokens * AGENT_PROMPT_PRICE_PER_MTOK
+                      + self.cached_tokens * AGENT_CACHED_PROMPT_PRICE_PER_MTOK
+                      + self.completion_tokens * AGENT_COMPLETION_PRICE_PER_MTOK) / 1_000_000, 6)
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[BaseMessage]], *, run_id: UUID,
+                            **kwargs: Any) -> None:
+        with self._lock:
+            if self.total_tokens >= self.token_budget:
+                raise TokenBudgetExceeded(f"Run used {self.total_tokens} of {self.token_budget} tokens")
+
+            estimated = 0
+            for message in messages[0] if messages else []:
+                tokens = count_tokens_approximately([message])
+                self.prompt_breakdown[_prompt_part(message)] += tokens
+                estimated += tokens
+            self._estimated_prompts[run_id] = estimated
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        with self._lock:
+            self.llm_calls += 1
+            estimated_prompt = self._estimated_prompts.pop(run_id, 0)
+            for generations in response.generations:
+                for generation in generations:
+                    message = getattr(generation, "message", None)
+                    usage = getattr(message, "usage_metadata", None) if message is not None else None
+                    if usage:
+                        self.prompt_tokens += usage.get("input_tokens", 0)
+                        self.completion_tokens += usage.get("output_tokens", 0)
+                        self.cached_tokens += (usage.get("input_token_details") or {}).get("cache_read", 0) or 0
+                    else:
+                        self.prompt_tokens += estimated_prompt
+                        self.completion_tokens += count_tokens_approximately([message]) if message else 0
+
+                    if message is not None and message.content and not getattr(message, "tool_calls", None):
+                        self.last_answer = message.content if isinstance(message.content, str) else str(
+                            message.content)
+
+    def summary(self) -> Dict:
+        return {
+            "llm_calls": self.llm_calls,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "total_tokens": self.total_tokens,
+            "cost": self.cost,
+            # Estimated prompt tokens per source, largest first
+            "prompt_breakdown": dict(sorted(self.prompt_breakdown.items(), key=lambda item: -item[1])),
+        }
+
+
+def _start_of_day() -> datetime:
+    now = datetime.now(timezone.utc)
+    return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def tokens_used_since(session: Session, user_id, since: datetime) -> int:
+    return session.query(
+        func.coalesce(func.sum(AgentUsage.prompt_tokens + AgentUsage.completion_tokens), 0)
+    ).filter(AgentUsage.user_id == user_id, AgentUsage.created_at >= since).scalar()
+
+
+def check_user_budget(session: Session, user_id):
+    if tokens_used_since(session, user_id, _start_of_day()) >= AGENT_USER_DAILY_TOKEN_BUDGET:
+        raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                            detail="Daily assistant usage limit reached, please try again tomorrow")
+
+
+def record_usage(session: Session, user_id, conversation_id, tracker: UsageTracker, truncated: bool):
+    session.add(AgentUsage(
+        user_id=user_id,
+        conversation_id=conversation_id,
+        llm_calls=tracker.llm_calls,
+        prompt_tokens=tracker.prompt_tokens,
+        completion_tokens=tracker.completion_tokens,
+        cached_tokens=tracker.cached_tokens,
+        cost=tracker.cost,
+        truncated=truncated,
+        prompt_breakdown=dict(tracker.prompt_breakdown)
+    ))
+    session.commit()
+
+
+def usage_report(session: Session, user_id, days: int = 30) -> Dict:
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    totals = session.query(
+        func.count(AgentUsage.id).label("runs"),
+        func.coalesce(func.sum(AgentUsage.prompt_tokens), 0).label("prompt_tokens"),
+        func.coalesce(func.sum(AgentUsage.completion_tokens), 0).label("completion_tokens"),
+        func.coalesce(func.sum(AgentUsage.cached_tokens), 0).label("cached_tokens"),
+        func.coalesce(func.sum(AgentUsage.cost), 0).label("cost"),
+    ).filter(AgentUsage.user_id == user_id, AgentUsage.created_at >= since).one()
+
+    # Aggregate the per-run breakdowns to show which prompts and tool outputs dominate
+    breakdown = defaultdict(int)
+    for (run_breakdown,) in session.query(AgentUsage.prompt_breakdown).filter(
+            AgentUsage.user_id == user_id, AgentUsage.created_at >= since).limit(1000):
+        for part, tokens in (run_breakdown or {}).items():
+            breakdown[part] += tokens
+
+    return {
+        "days": days,
+        "runs": totals.runs,
+        "prompt_tokens": int(totals.prompt_tokens),
+        "completion_tokens": int(totals.completion_tokens),
+        "cached_tokens": int(totals.cached_tokens),
+        "cost": float(totals.cost),
+        "tokens_used_today": tokens_used_since(session, user_id, _start_of_day()),
+        "daily_token_budget": AGENT_USER_DAILY_TOKEN_BUDGET,
+        "prompt_breakdown": dict(sorted(breakdown.items(), key=lambda item: -item[1])),
+    }
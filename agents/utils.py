@@ -1,4 +1,84 @@
-from langchain.chat_models import init_chat_model
-from const import GOOGLE_API_KEY
+from functools import lru_cache
+from typing import Callable, Dict
 
-model = init_chat_model("google_genai:gemini-2.0-flash-lite")
+from const import GOOGLE_API_KEY, AGENT_MODEL, AGENT_FALLBACK_MODEL, AGENT_MODEL_LATENCY_SLO_SECONDS, \
+    AGENT_MODEL_TIMEOUT_SECONDS, AGENT_MODEL_MAX_RETRIES, AGENT_MODEL_CALL_WORKERS
+
+
+def _fake_provider(options: str):
+    from .fake import FakeChatModel
+
+    # "fake:latency=0.5" -> FakeChatModel(latency_seconds=0.5)
+    settings = dict(option.split("=", 1) for option in options.split(",") if "=" in option)
+    return FakeChatModel(latency_seconds=float(settings.get("latency", 0)),
+                         timeout=float(settings.get("timeout", AGENT_MODEL_TIMEOUT_SECONDS)))
+
+
+# Providers handled locally instead of through init_chat_model, keyed by the spec prefix
+MODEL_PROVIDERS: Dict[str, Callable[[str], object]] = {
+    "fake": _fake_provider,
+}
+
+
+def register_model_provider(name: str, factory: Callable[[str], object]):
+    """Make ``name:<options>`` model specs resolve through ``factory(options)``."""
+    MODEL_PROVIDERS[name] = factory
+    get_model.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def get_model(spec: str = AGENT_MODEL):
+    """
+    Chat model for a ``provider:model`` spec, created on first use so importing the API does not
+    load the LLM SDKs. Instances are cached and shared between agents using the same spec.
+    """
+    provider, _, options = spec.partition(":")
+    if provider in MODEL_PROVIDERS:
+        return MODEL_PROVIDERS[provider](options)
+
+    from langchain.chat_models import init_chat_model
+
+    # The routing middleware gives up on an attempt after AGENT_MODEL_TIMEOUT_SECONDS; the client
+    # timeout makes the request itself end then too, instead of running on in its thread
+    return init_chat_model(spec, timeout=AGENT_MODEL_TIMEOUT_SECONDS, max_retries=AGENT_MODEL_MAX_RETRIES)
+
+
+def get_routing_middleware():
+    """Timeout, hedging and fallback routing around every model call of an agent."""
+    from .routing import ModelRoutingMiddleware
+
+    fallbacks = [get_model(AGENT_FALLBACK_MODEL)] if AGENT_FALLBACK_MODEL else []
+    return ModelRoutingMiddleware(fallbacks=fallbacks, timeout_seconds=AGENT_MODEL_TIMEOUT_SECONDS,
+                                  hedge_after_seconds=AGENT_MODEL_LATENCY_SLO_SECONDS,
+                                  max_workers=AGENT_MODEL_CALL_WORKERS)
+
+
+def latest_message_content(response):
+    """Content of the last message of an agent invocation result, ``None`` when it has no messages."""
+    if not isinstance(response, dict) or not response.get("messages"):
+        return None
+    latest_message = response["messages"][-1]
+
+    # Handle different message types
+    if hasattr(latest_message, 'content'):
+        return latest_message.content
+    if hasattr(latest_message, 'text'):
+        return latest_message.text
+    if isinstance(latest_message, dict):
+        return latest_message.get('content') or latest_message.get('text') or ""
+    return str(latest_message)
+
+
+def extract_response_content(response) -> str:
+    """Pull the final answer text out of an agent invocation result."""
+    content = latest_message_content(response)
+
+    # If no messages, check for output key
+    if content is None and isinstance(response, dict):
+        content = response.get("output")
+
+    # Fallback to string conversion
+    if not content:
+        content = str(response)
+
+    return content
@@ -0,0 +1,120 @@
+"""
+Bandwidth and latency of full, compressed and conditional (304) responses of the read endpoints.
+
+Usage:
+    python benchmarks/conditional_get.py [--transactions 2000] [--categories 30] [--requests 200]
+
+Runs the real application in-process against a seeded in-memory SQLite database (no
+Postgres needed). Each endpoint is requested uncompressed, with ``Accept-Encoding: gzip`` and
+with ``If-None-Match`` carrying the ETag of a previous response, the way the mobile app
+revalidates its cached screens. Latency is server time in-process, without network transfer.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: F401  (import order: utils before models)
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from models import User, Category, Transaction, UserDataVersion
+from utils import Base, get_db, get_current_user
+from utils.read_routing import get_read_db
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+
+
+def seed(engine, transactions: int, categories: int):
+    """Core inserts, so the Postgres-only flush listeners are not involved."""
+    user_id = uuid4()
+    now = datetime.now(timezone.utc)
+    category_ids = [uuid4() for _ in range(categories)]
+    with engine.begin() as connection:
+        connection.execute(insert(User.__table__), [{
+            "id": user_id, "first_name": "Bench", "last_name": "Mark", "email": "bench@example.com",
+            "password": "x", "is_verified": True, "created_at": now}])
+        connection.execute(insert(Category.__table__), [{
+            "id": category_id, "name": f"Category {index}", "description": f"Category {index} related expenses",
+            "is_active": True, "user_id": user_id, "created_at": now, "updated_at": now,
+        } for index, category_id in enumerate(category_ids)])
+        connection.execute(insert(Transaction.__table__), [{
+            "id": uuid4(), "name": f"Expense {index}", "amount": round(random.uniform(5, 500), 2),
+            "transaction_date": datetime(2025, 1, 1) + timedelta(hours=index * 4),
+            "transaction_type": random.choice([TransactionType.EXPENSE, TransactionType.INCOME]),
+            "category_id": random.choice(category_ids), "user_id": user_id,
+            "description": "Auto-generated transaction", "payment_method": PaymentMethodEnum.UPI,
+            "account": AccountEnum.CHECKING, "created_at": now,
+        } for index in range(transactions)])
+        connection.execute(insert(UserDataVersion.__table__), [{"user_id": user_id, "version": 42,
+                                                                "updated_at": now}])
+    return user_id
+
+
+def measure(client: TestClient, method: str, url: str, body, headers: dict, repeat: int):
+    timings = []
+    response = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        response = client.request(method, url, json=body, headers=headers)
+        timings.append((time.perf_counter() - start) * 1000)
+    # Bytes on the wire: compressed length when the body was encoded
+    size = int(response.headers.get("content-length", len(response.content)))
+    return response, size, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=2000)
+    parser.add_argument("--categories", type=int, default=30)
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    random.seed(7)
+
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine, tables=[User.__table__, Category.__table__, Transaction.__table__,
+                                             UserDataVersion.__table__])
+    user_id = seed(engine, args.transactions, args.categories)
+
+    def get_bench_db():
+        session = Session(engine)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = app.dependency_overrides[get_read_db] = get_bench_db
+    app.dependency_overrides[get_current_user] = lambda: Session(engine).get(User, user_id)
+    client = TestClient(app)
+
+    endpoints = [
+        ("GET", "/transactions?limit=100", None),
+        ("GET", "/categories", None),
+        ("GET", "/report/category/year", {"year": 2025}),
+        ("GET", "/auth/me", None),
+    ]
+
+    print(f"{'endpoint':<26} {'full B':>8} {'gzip B':>8} {'304 B':>6} {'full ms':>8} {'gzip ms':>8} {'304 ms':>7}")
+    for method, url, body in endpoints:
+        full, full_size, full_ms = measure(client, method, url, body, {"Accept-Encoding": "identity"},
+                                           args.requests)
+        _, gzip_size, gzip_ms = measure(client, method, url, body, {"Accept-Encoding": "gzip"}, args.requests)
+        revalidated, _, not_modified_ms = measure(client, method, url, body, {
+            "Accept-Encoding": "gzip", "If-None-Match": full.headers["etag"]}, args.requests)
+        assert revalidated.status_code == 304, revalidated.status_code
+        # Status line and headers of a 304 are all that crosses the wire
+        not_modified_size = sum(len(key) + len(value) + 4 for key, value in revalidated.headers.items()) + 17
+        print(f"{url:<26} {full_size:>8} {gzip_size:>8} {not_modified_size:>6} {full_ms:>8.2f} {gzip_ms:>8.2f} "
+              f"{not_modified_ms:>7.2f}")
+
+
+if __name__ == "__main__":
+    main()
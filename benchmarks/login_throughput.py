@@ -0,0 +1,59 @@
+"""
+Login (password verification) throughput versus hashing pool size.
+
+Usage:
+    python benchmarks/login_throughput.py [--logins 200] [--executor thread|process]
+
+Each row verifies ``--logins`` passwords through a pool of N workers, for N = 1 .. cpu_count,
+which is what the login handler does through ``utils.password_hash``.
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from passlib.context import CryptContext
+
+from const import PASSWORD_HASH_ROUNDS
+
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS)
+PASSWORD = "Password123!"
+HASHED_PASSWORD = pwd_context.hash(PASSWORD)
+
+
+def verify(_):
+    return pwd_context.verify(PASSWORD, HASHED_PASSWORD)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    args = parser.parse_args()
+
+    executor_class = ProcessPoolExecutor if args.executor == "process" else ThreadPoolExecutor
+    cores = os.cpu_count() or 1
+
+    print(f"pbkdf2_sha256 rounds={PASSWORD_HASH_ROUNDS}, executor={args.executor}, logins={args.logins}")
+    print(f"{'workers':>8} {'seconds':>10} {'logins/s':>10} {'speedup':>8}")
+
+    baseline = None
+    for workers in range(1, cores + 1):
+        with executor_class(max_workers=workers) as executor:
+            # Warm the pool so worker start-up is not measured
+            list(executor.map(verify, range(workers)))
+            start = time.perf_counter()
+            results = list(executor.map(verify, range(args.logins)))
+            elapsed = time.perf_counter() - start
+        assert all(results)
+
+        throughput = args.logins / elapsed
+        baseline = baseline or throughput
+        print(f"{workers:>8} {elapsed:>10.3f} {throughput:>10.1f} {throughput / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
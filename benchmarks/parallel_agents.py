@@ -0,0 +1,83 @@
+"""
+End-to-end latency of a compound question answered with sequential versus parallel sub-agent calls.
+
+Usage:
+    python benchmarks/parallel_agents.py [--latency 1.0] [--runs 5]
+
+Every model is a FakeChatModel with ``--latency`` seconds per call. The scripted supervisor
+either asks the two sub-agents one after another (one tool call per turn, the old behaviour)
+or in a single turn (both tool calls at once, which the tool node runs concurrently).
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Must be set before const is imported: local models only, sub-agents on the "bench" provider below
+os.environ["AGENT_MODEL"] = "fake"
+os.environ["SAVINGS_ADVISOR_MODEL"] = os.environ["HELP_AGENT_MODEL"] = "bench"
+
+import utils  # noqa: F401  (import order: utils before models)
+from langchain.agents import create_agent
+from langchain_core.messages import AIMessage
+
+from agents.context import UserDetails
+from agents.fake import FakeChatModel
+from agents.utils import register_model_provider
+
+
+def tool_call(name: str, request: str, call_id: str):
+    return {"name": name, "args": {"request": request}, "id": call_id, "type": "tool_call"}
+
+
+FINANCE = tool_call("finance_advisor", "How can I cut my food spending?", "call-finance")
+HELPER = tool_call("kashflo_helper", "Create a Groceries category", "call-helper")
+ANSWER = "Created the Groceries category. To cut food spending, plan meals and set a budget."
+
+SCRIPTS = {
+    "sequential": [AIMessage(content="", tool_calls=[HELPER]), AIMessage(content="", tool_calls=[FINANCE]), ANSWER],
+    "parallel": [AIMessage(content="", tool_calls=[HELPER, FINANCE]), ANSWER],
+}
+
+
+async def run(agent, runs: int):
+    config = {"configurable": {"user_details": UserDetails(user_id="benchmark", user_name="Bench Mark")}}
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        await agent.ainvoke({"messages": [{"role": "user", "content": "Create a Groceries category and tell me "
+                                                                       "how to cut food spending"}]}, config=config)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=1.0)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    # Sub-agents answer directly (no tool calls) after one slow model call
+    register_model_provider("bench", lambda options: FakeChatModel(latency_seconds=args.latency))
+    from agents.Kashflo import finance_advisor, kashflo_helper
+
+    results = {}
+    for name, script in SCRIPTS.items():
+        supervisor = create_agent(FakeChatModel(responses=script, latency_seconds=args.latency),
+                                  tools=[finance_advisor, kashflo_helper])
+        results[name] = asyncio.run(run(supervisor, args.runs))
+
+    print(f"{'mode':<12} {'model calls':>11} {'mean s':>8} {'p50 s':>8} {'max s':>8}")
+    for name, timings in results.items():
+        model_calls = len(SCRIPTS[name]) + 2
+        print(f"{name:<12} {model_calls:>11} {statistics.mean(timings):>8.2f} {statistics.median(timings):>8.2f} "
+              f"{max(timings):>8.2f}")
+    saved = 1 - statistics.mean(results["parallel"]) / statistics.mean(results["sequential"])
+    print(f"\nparallel sub-agent calls cut end-to-end latency by {saved:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Yearly category report latency on a plain versus a range-partitioned transactions table.
+
+Usage:
+    python benchmarks/partitioning.py [--rows 100000000] [--users 100000] [--years 10]
+                                      [--interval monthly] [--queries 50] [--keep]
+
+Needs the Postgres from .env and a lot of disk at the default size (~15 GB per table at 100M
+rows); try ``--rows 10000000`` first. Both tables are built in a scratch ``bench_partitioning``
+schema with the same indexes as ``models/transaction.py``, filled with ``generate_series``
+and analyzed. The report query of ``utils/reports.py`` then runs for random users and years on
+each table. The schema is dropped afterwards unless ``--keep`` is given.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from utils.database import engine
+from utils.partitions import partition_name
+
+SCHEMA = "bench_partitioning"
+
+COLUMNS = """
+    id uuid NOT NULL DEFAULT gen_random_uuid(),
+    user_id integer NOT NULL,
+    category_id integer NOT NULL,
+    transaction_date timestamp NOT NULL,
+    amount numeric(10, 2) NOT NULL,
+    transaction_type text NOT NULL
+"""
+
+REPORT = """
+    SELECT extract(month FROM transaction_date) AS month, category_id, sum(amount), count(id)
+    FROM {table}
+    WHERE user_id = :user_id AND transaction_date >= :start AND transaction_date <= :end
+    GROUP BY extract(month FROM transaction_date), category_id
+    ORDER BY extract(month FROM transaction_date)
+"""
+
+
+def periods(first_year: int, years: int, interval: str):
+    start = date(first_year, 1, 1)
+    end = date(first_year + years, 1, 1)
+    while start < end:
+        following = date(start.year + 1, 1, 1) if interval == "yearly" else \
+            date(start.year + start.month // 12, start.month % 12 + 1, 1)
+        yield start, following
+        start = following
+
+
+def build(connection, args, first_year: int):
+    connection.execute(text(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE"))
+    connection.execute(text(f"CREATE SCHEMA {SCHEMA}"))
+    connection.execute(text(f"CREATE TABLE {SCHEMA}.plain ({COLUMNS}, PRIMARY KEY (id))"))
+    connection.execute(text(f"CREATE TABLE {SCHEMA}.partitioned ({COLUMNS}, PRIMARY KEY (id, transaction_date)) "
+                            f"PARTITION BY RANGE (transaction_date)"))
+    for start, end in periods(first_year, args.years, args.interval):
+        name = partition_name(start, args.interval).replace("transactions", "partitioned")
+        connection.execute(text(f"CREATE TABLE {SCHEMA}.{name} PARTITION OF {SCHEMA}.partitioned "
+                                f"FOR VALUES FROM ('{start}') TO ('{end}')"))
+
+    fill = f"""
+        SELECT (random() * :users)::int, (random() * 20)::int,
+               timestamp '{first_year}-01-01' + random() * (timestamp '{first_year + args.years}-01-01'
+                                                          - timestamp '{first_year}-01-01'),
+               round((random() * 500)::numeric, 2),
+               CASE WHEN random() < 0.8 THEN 'expense' ELSE 'income' END
+        FROM generate_series(1, :rows)
+    """
+    for table in ("plain", "partitioned"):
+        started = time.perf_counter()
+        connection.execute(text(f"INSERT INTO {SCHEMA}.{table} "
+                                f"(user_id, category_id, transaction_date, amount, transaction_type) {fill}"),
+                           {"users": args.users, "rows": args.rows})
+        for suffix, columns in (("user_date", "user_id, transaction_date"),
+                                ("user_category_date", "user_id, category_id, transaction_date")):
+            connection.execute(text(f"CREATE INDEX ix_{table}_{suffix} ON {SCHEMA}.{table} ({columns})"))
+        connection.execute(text(f"ANALYZE {SCHEMA}.{table}"))
+        print(f"built {table} in {time.perf_counter() - started:.0f}s")
+
+
+def run_reports(connection, table: str, args, first_year: int):
+    random.seed(7)
+    timings = []
+    for _ in range(args.queries):
+        year = first_year + random.randrange(args.years)
+        params = {"user_id": random.randrange(args.users), "start": date(year, 1, 1),
+                  "end": f"{year}-12-31 23:59:59"}
+        started = time.perf_counter()
+        connection.execute(text(REPORT.format(table=f"{SCHEMA}.{table}")), params).all()
+        timings.append((time.perf_counter() - started) * 1000)
+    plan = connection.execute(text("EXPLAIN " + REPORT.format(table=f"{SCHEMA}.{table}")), params).scalars().all()
+    scanned = sum(1 for line in plan if " on " in line and "Scan" in line)
+    return statistics.median(timings), statistics.quantiles(timings, n=20)[-1], scanned
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000_000)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--interval", choices=["yearly", "monthly"], default="monthly")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--keep", action="store_true")
+    args = parser.parse_args()
+    first_year = date.today().year - args.years + 1
+
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        build(connection, args, first_year)
+        try:
+            print(f"{'table':<12} {'p50 ms':>8} {'p95 ms':>8} {'relations scanned':>18}")
+            for table in ("plain", "partitioned"):
+                p50, p95, scanned = run_reports(connection, table, args, first_year)
+                print(f"{table:<12} {p50:>8.2f} {p95:>8.2f} {scanned:>18}")
+            sizes = connection.execute(text(
+                f"SELECT pg_size_pretty(pg_total_relation_size('{SCHEMA}.plain')), "
+                f"pg_size_pretty(sum(pg_total_relation_size(inhrelid))) FROM pg_inherits "
+                f"WHERE inhparent = '{SCHEMA}.partitioned'::regclass")).one()
+            print(f"size: plain {sizes[0]}, partitioned {sizes[1]}")
+        finally:
+            if not args.keep:
+                connection.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+
+
+if __name__ == "__main__":
+    main()
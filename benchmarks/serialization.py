@@ -0,0 +1,103 @@
+"""
+Time to serialize a page of transactions into a response body, per 1,000 transactions.
+
+Usage:
+    python benchmarks/serialization.py [--transactions 1000] [--repeat 50]
+
+No database needed. Each pipeline starts from what the query returns:
+- "pydantic + stdlib" is the previous list_transactions: TransactionSchema.model_validate
+  per ORM object, the TransactionResponse envelope, its revalidation through the response
+  model, and the stdlib JSONResponse;
+- "dicts + stdlib" builds column dicts and renders them with FastJSONResponse's stdlib fallback;
+- "dicts + orjson" is the current path.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: F401  (import order: utils before models)
+from fastapi.responses import JSONResponse
+
+import utils.responses
+from models import Transaction
+from routes.transactions import TRANSACTION_FIELDS
+from schema import TransactionSchema, TransactionResponse
+from utils.responses import FastJSONResponse
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+
+
+def make_rows(count: int):
+    user_id, category_id = uuid4(), uuid4()
+    now = datetime.now(timezone.utc)
+    transactions = [Transaction(
+        id=uuid4(), name=f"Expense {index}", description="Auto-generated transaction",
+        amount=round(random.uniform(5, 500), 2), currency="INR",
+        transaction_date=datetime(2025, 1, 1) + timedelta(hours=index),
+        transaction_type=random.choice([TransactionType.EXPENSE, TransactionType.INCOME]),
+        payment_method=PaymentMethodEnum.UPI, account=AccountEnum.CHECKING, created_at=now,
+        user_id=user_id, category_id=category_id,
+    ) for index in range(count)]
+    rows = [tuple(getattr(transaction, field) for field in TRANSACTION_FIELDS) for transaction in transactions]
+    return transactions, rows
+
+
+def envelope(transactions):
+    return {"page": 1, "limit": len(transactions), "total_transaction": len(transactions), "total_pages": 1,
+            "message": "transactions retrieved successfully", "transactions": transactions}
+
+
+def pydantic_stdlib(transactions, rows) -> bytes:
+    response = TransactionResponse(**envelope([TransactionSchema.model_validate(item) for item in transactions]))
+    # What FastAPI's response_model does with the returned object
+    validated = TransactionResponse.model_validate(response, from_attributes=True)
+    return JSONResponse(validated.model_dump(mode="json")).body
+
+
+def dicts_stdlib(transactions, rows) -> bytes:
+    orjson, utils.responses.orjson = utils.responses.orjson, None
+    try:
+        return FastJSONResponse(envelope([dict(zip(TRANSACTION_FIELDS, row)) for row in rows])).body
+    finally:
+        utils.responses.orjson = orjson
+
+
+def dicts_orjson(transactions, rows) -> bytes:
+    return FastJSONResponse(envelope([dict(zip(TRANSACTION_FIELDS, row)) for row in rows])).body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--transactions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    random.seed(7)
+
+    transactions, rows = make_rows(args.transactions)
+    pipelines = [("pydantic + stdlib", pydantic_stdlib), ("dicts + stdlib", dicts_stdlib)]
+    if utils.responses.orjson is not None:
+        pipelines.append(("dicts + orjson", dicts_orjson))
+    else:
+        print("orjson is not installed, skipping the orjson pipeline")
+
+    print(f"{'pipeline':<20} {'ms / 1k':>9} {'bytes':>9}")
+    baseline = None
+    for name, pipeline in pipelines:
+        timings = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            body = pipeline(transactions, rows)
+            timings.append((time.perf_counter() - started) * 1000 * 1000 / args.transactions)
+        median = statistics.median(timings)
+        baseline = baseline or median
+        print(f"{name:<20} {median:>9.2f} {len(body):>9}  ({baseline / median:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
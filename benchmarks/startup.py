@@ -0,0 +1,60 @@
+"""
+Cold-start time and baseline RSS of an API worker, with and without building the agents.
+
+Usage:
+    python benchmarks/startup.py [--runs 5]
+
+"lazy" imports every router, which is what a worker does before serving CRUD traffic.
+"eager" additionally builds the supervisor agent and its sub-agents, which is what every
+worker used to pay at import time (needs GOOGLE_API_KEY to be set).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "lazy": "import routes",
+    "eager": "import routes\nfrom agents import get_supervisor_agent\nget_supervisor_agent()",
+}
+
+PROBE = """
+import json, resource, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(code=code)],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'scenario':>8} {'median s':>10} {'max RSS MB':>11}")
+    for name, code in SCENARIOS.items():
+        try:
+            samples = [run_scenario(code) for _ in range(args.runs)]
+        except subprocess.CalledProcessError as e:
+            print(f"{name:>8} failed: {e.stderr.strip().splitlines()[-1] if e.stderr else e}")
+            continue
+        seconds = statistics.median(sample["seconds"] for sample in samples)
+        rss_mb = statistics.median(sample["max_rss_kb"] for sample in samples) / 1024
+        print(f"{name:>8} {seconds:>10.3f} {rss_mb:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
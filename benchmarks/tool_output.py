@@ -0,0 +1,109 @@
+"""
+Token and latency cost of verbose versus compact agent tool output.
+
+Usage:
+    python benchmarks/tool_output.py [--categories 15] [--transactions 50] [--prefill-tps 3000]
+
+Synthetic results shaped like each read tool's output are serialized the way the tool node
+hands them to the model (json.dumps). Tokens are estimated at ~4 characters per token; the
+model-side latency is estimated from ``--prefill-tps`` (prompt tokens processed per second).
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.compact import compact_category_report, compact_transactions, compact_spending_summary, \
+    compact_categories
+
+
+def category_report(categories: int):
+    return {
+        datetime(1900, month, 1).strftime("%B"): [{
+            "category": f"Category {index}",
+            "total_amount": round(random.uniform(10, 2000), 2),
+            "transaction_count": random.randint(1, 30),
+        } for index in range(categories)]
+        for month in range(1, 13)
+    }
+
+
+def transactions(count: int):
+    return [{
+        "id": "3f1c6a52-9a8e-4c43-9d8e-0f6b1b7f2c%02d" % (index % 100),
+        "name": f"Expense on Mar {index % 28 + 1:02d}",
+        "amount": round(random.uniform(10, 500), 2),
+        "transaction_type": "expense",
+        "transaction_date": datetime(2025, 3, index % 28 + 1, 12).isoformat(),
+        "category": f"Category {index % 10}",
+        "payment_method": "credit card",
+        "account": "checking",
+        "description": "Auto-generated expense transaction",
+    } for index in range(count)]
+
+
+def spending_summary():
+    return {
+        "period": "2025-03",
+        "total_income": 5234.17,
+        "total_expenses": 4120.55,
+        "net_savings": 1113.62,
+        "top_spending_categories": [{"category": f"Category {index}", "amount": round(random.uniform(100, 900), 2)}
+                                    for index in range(5)],
+    }
+
+
+def categories(count: int):
+    return [{"id": "3f1c6a52-9a8e-4c43-9d8e-0f6b1b7f2c%02d" % index, "name": f"Category {index}",
+             "description": f"Category {index} related expenses", "is_active": True} for index in range(count)]
+
+
+def measure(encode, repeat=200):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        text = json.dumps(encode())
+    return text, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--categories", type=int, default=15)
+    parser.add_argument("--transactions", type=int, default=50)
+    parser.add_argument("--prefill-tps", type=float, default=3000)
+    args = parser.parse_args()
+    random.seed(7)
+
+    report = category_report(args.categories)
+    transaction_rows = transactions(args.transactions)
+    summary = spending_summary()
+    category_rows = categories(args.categories * 2)
+
+    cases = {
+        "get_year_wise_category_report": (lambda: {"data": report},
+                                          lambda: {"year": 2025, "data": compact_category_report(report)}),
+        "get_user_transactions": (lambda: {"transactions": transaction_rows},
+                                  lambda: {"transactions": compact_transactions(transaction_rows)}),
+        "get_spending_summary": (lambda: summary, lambda: compact_spending_summary(summary)),
+        "get_categories": (lambda: {"categories": category_rows},
+                           lambda: {"categories": compact_categories(category_rows)}),
+    }
+
+    print(f"{'tool':<32} {'verbose tok':>11} {'compact tok':>11} {'saved':>7} "
+          f"{'encode ms v/c':>15} {'est. prefill ms saved':>22}")
+    for name, (verbose, compact) in cases.items():
+        verbose_text, verbose_ms = measure(verbose)
+        compact_text, compact_ms = measure(compact)
+        verbose_tokens, compact_tokens = len(verbose_text) // 4, len(compact_text) // 4
+        saved = 1 - compact_tokens / verbose_tokens
+        prefill_saved_ms = (verbose_tokens - compact_tokens) / args.prefill_tps * 1000
+        print(f"{name:<32} {verbose_tokens:>11} {compact_tokens:>11} {saved:>6.0%} "
+              f"{verbose_ms:>7.3f}/{compact_ms:<7.3f} {prefill_saved_ms:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
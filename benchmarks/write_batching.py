@@ -0,0 +1,113 @@
+"""
+Transaction creation throughput with one commit per row versus group commit.
+
+Usage:
+    python benchmarks/write_batching.py [--writers 16] [--rows 200] [--window-ms 5] [--max-rows 200]
+
+Needs the Postgres from .env; commit cost is dominated by the WAL fsync, so run it against a
+database with the production ``synchronous_commit``/disk setup. ``--writers`` threads, like
+the API's worker threads during a webhook burst, each create ``--rows`` transactions for a
+scratch user. The rows are created once with a commit per row (the current handler) and
+once through ``TransactionWriteBatcher``. The flush listeners (rollup and data version) run
+in both modes. The scratch user and its rows are deleted afterwards.
+"""
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: F401  (import order: utils before models)
+from sqlalchemy import delete, event
+
+from models import User, Category, Transaction, MonthlyCategoryTotal, UserDataVersion
+from utils.database import engine, SessionLocal
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+from utils.write_batcher import TransactionWriteBatcher
+
+
+def new_transaction(user_id, category_id, index: int) -> Transaction:
+    return Transaction(name=f"Card payment {index}", amount=12.5, transaction_date=datetime(2025, 1, 1)
+                       + timedelta(minutes=index), transaction_type=TransactionType.EXPENSE,
+                       category_id=category_id, user_id=user_id, payment_method=PaymentMethodEnum.CREDIT_CARD,
+                       account=AccountEnum.CHECKING)
+
+
+def run(args, user_id, category_id, write) -> tuple:
+    latencies = []
+    lock = threading.Lock()
+
+    def writer(offset: int):
+        timings = []
+        for index in range(args.rows):
+            started = time.perf_counter()
+            write(new_transaction(user_id, category_id, offset + index))
+            timings.append((time.perf_counter() - started) * 1000)
+        with lock:
+            latencies.extend(timings)
+
+    threads = [threading.Thread(target=writer, args=(number * args.rows,)) for number in range(args.writers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    return len(latencies) / elapsed, statistics.median(latencies), statistics.quantiles(latencies, n=100)[98]
+
+
+def commit_per_row(transaction: Transaction):
+    session = SessionLocal()
+    try:
+        session.add(transaction)
+        session.commit()
+    finally:
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--rows", type=int, default=200)
+    parser.add_argument("--window-ms", type=float, default=5)
+    parser.add_argument("--max-rows", type=int, default=200)
+    args = parser.parse_args()
+
+    user_id, category_id = uuid4(), uuid4()
+    with SessionLocal() as session:
+        session.add(User(id=user_id, first_name="Bench", last_name="Mark", email=f"bench-{user_id}@example.com",
+                         password="x", is_verified=True))
+        session.add(Category(id=category_id, name="Card feed", user_id=user_id))
+        session.commit()
+
+    commits = []
+    event.listen(engine, "commit", lambda connection: commits.append(1))
+    try:
+        print(f"{'mode':<16} {'rows/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'commits':>8}")
+        commits.clear()
+        throughput, p50, p99 = run(args, user_id, category_id, commit_per_row)
+        print(f"{'commit per row':<16} {throughput:>9.0f} {p50:>8.2f} {p99:>8.2f} {len(commits):>8}")
+
+        batcher = TransactionWriteBatcher(args.window_ms, args.max_rows)
+        batcher.start()
+        commits.clear()
+        try:
+            throughput, p50, p99 = run(args, user_id, category_id, batcher.submit)
+        finally:
+            batcher.stop()
+        print(f"{'group commit':<16} {throughput:>9.0f} {p50:>8.2f} {p99:>8.2f} {len(commits):>8}")
+    finally:
+        with SessionLocal() as session:
+            for model in (Transaction, MonthlyCategoryTotal, Category, UserDataVersion):
+                session.execute(delete(model).where(model.user_id == user_id))
+            session.execute(delete(User).where(User.id == user_id))
+            session.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,3 +16,134 @@ REFRESH_SECRET_KEY = os.getenv("REFRESH_SECRET_KEY")
 
 # GOOGLE API KEY
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+
+# JWT TOKEN LIFETIMES
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_MINUTES = int(os.getenv("REFRESH_TOKEN_EXPIRE_MINUTES", 30))
+
+# REFRESH TOKEN STORE
+TOKEN_PRUNE_INTERVAL_SECONDS = int(os.getenv("TOKEN_PRUNE_INTERVAL_SECONDS", 3600))
+REVOKED_TOKEN_CACHE_SIZE = int(os.getenv("REVOKED_TOKEN_CACHE_SIZE", 100000))
+
+# PASSWORD HASHING
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", 29000))
+PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # "thread" or "process"
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 1))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 2 * (os.cpu_count() or 1)))
+PASSWORD_HASH_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_HASH_TIMEOUT_SECONDS", 10))
+
+# DATABASE POOL & STARTUP
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 10))
+DB_POOL_WARMUP = int(os.getenv("DB_POOL_WARMUP", 2))
+DB_SCHEMA_ACTION = os.getenv("DB_SCHEMA_ACTION", "create")  # "create", "check" or "none"
+
+# APPLICATION LIFECYCLE
+PRELOAD_AGENTS = os.getenv("PRELOAD_AGENTS", "false").lower() == "true"
+SHUTDOWN_DRAIN_TIMEOUT_SECONDS = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT_SECONDS", 30))
+
+# AGENT MODELS ("provider:model" for init_chat_model, or "fake[:latency=0.5]" for the local scripted model)
+AGENT_MODEL = os.getenv("AGENT_MODEL", "google_genai:gemini-2.0-flash-lite")
+_USING_FAKE_MODEL = AGENT_MODEL.startswith("fake")
+# Cheap, fast model for the supervisor's routing decisions; stronger model for savings analysis
+SUPERVISOR_MODEL = os.getenv("SUPERVISOR_MODEL", AGENT_MODEL)
+SAVINGS_ADVISOR_MODEL = os.getenv("SAVINGS_ADVISOR_MODEL",
+                                  AGENT_MODEL if _USING_FAKE_MODEL else "google_genai:gemini-2.0-flash")
+HELP_AGENT_MODEL = os.getenv("HELP_AGENT_MODEL", AGENT_MODEL)
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", AGENT_MODEL)
+# Used when the agent's model fails, times out or is slower than the latency SLO ("" disables fallback)
+AGENT_FALLBACK_MODEL = os.getenv("AGENT_FALLBACK_MODEL", "" if _USING_FAKE_MODEL else "google_genai:gemini-2.0-flash")
+# A hedged request to the next model starts once a call has been running longer than the SLO
+AGENT_MODEL_LATENCY_SLO_SECONDS = float(os.getenv("AGENT_MODEL_LATENCY_SLO_SECONDS", 8))
+# Passed to the model clients, so an abandoned attempt ends instead of holding its thread
+AGENT_MODEL_TIMEOUT_SECONDS = float(os.getenv("AGENT_MODEL_TIMEOUT_SECONDS", 30))
+# Client-side retries per attempt; failed attempts already move on to the fallback model
+AGENT_MODEL_MAX_RETRIES = int(os.getenv("AGENT_MODEL_MAX_RETRIES", 0))
+# Threads per agent for synchronous model calls (each call can run one attempt per model at once)
+AGENT_MODEL_CALL_WORKERS = int(os.getenv("AGENT_MODEL_CALL_WORKERS", 16))
+
+# AGENT ADMISSION CONTROL (per API worker)
+AGENT_MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", 4))
+AGENT_MAX_QUEUE = int(os.getenv("AGENT_MAX_QUEUE", 16))
+AGENT_QUEUE_TIMEOUT_SECONDS = float(os.getenv("AGENT_QUEUE_TIMEOUT_SECONDS", 10))
+AGENT_USER_RATE_PER_MINUTE = float(os.getenv("AGENT_USER_RATE_PER_MINUTE", 10))
+AGENT_USER_BURST = int(os.getenv("AGENT_USER_BURST", 5))
+
+# BACKGROUND JOBS (set JOB_WORKERS=0 to run jobs only in a separate `python worker.py` process)
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_INTERVAL_SECONDS = float(os.getenv("JOB_POLL_INTERVAL_SECONDS", 2))
+JOB_STALE_AFTER_SECONDS = int(os.getenv("JOB_STALE_AFTER_SECONDS", 900))
+JOB_RESULT_TTL_SECONDS = int(os.getenv("JOB_RESULT_TTL_SECONDS", 86400))
+JOB_PRUNE_INTERVAL_SECONDS = int(os.getenv("JOB_PRUNE_INTERVAL_SECONDS", 3600))
+
+# AGENT CONVERSATION MEMORY
+AGENT_HISTORY_TOKEN_BUDGET = int(os.getenv("AGENT_HISTORY_TOKEN_BUDGET", 4000))
+
+# AGENT TOKEN BUDGETS & PRICING (USD per million tokens)
+AGENT_RUN_TOKEN_BUDGET = int(os.getenv("AGENT_RUN_TOKEN_BUDGET", 30000))
+AGENT_USER_DAILY_TOKEN_BUDGET = int(os.getenv("AGENT_USER_DAILY_TOKEN_BUDGET", 300000))
+AGENT_PROMPT_PRICE_PER_MTOK = float(os.getenv("AGENT_PROMPT_PRICE_PER_MTOK", 0.075))
+AGENT_CACHED_PROMPT_PRICE_PER_MTOK = float(os.getenv("AGENT_CACHED_PROMPT_PRICE_PER_MTOK", 0.01875))
+AGENT_COMPLETION_PRICE_PER_MTOK = float(os.getenv("AGENT_COMPLETION_PRICE_PER_MTOK", 0.30))
+
+# AGENT TOOL OUTPUT ("compact" tables for the LLM or the original "verbose" dicts)
+AGENT_TOOL_OUTPUT_MODE = os.getenv("AGENT_TOOL_OUTPUT_MODE", "compact")
+AGENT_TOOL_MAX_ROWS = int(os.getenv("AGENT_TOOL_MAX_ROWS", 10))
+
+# Upper bound for one sub-agent call made by the supervisor; parallel calls are bounded individually
+AGENT_SUBAGENT_TIMEOUT_SECONDS = float(os.getenv("AGENT_SUBAGENT_TIMEOUT_SECONDS", 60))
+
+# DATA VERSIONS (Postgres NOTIFY channel for version bumps, listened to when DATA_VERSION_LISTEN=true)
+DATA_VERSION_CHANNEL = os.getenv("DATA_VERSION_CHANNEL", "user_data_version")
+DATA_VERSION_LISTEN = os.getenv("DATA_VERSION_LISTEN", "false").lower() == "true"
+
+# RESPONSE COMPRESSION ("gzip", "brotli" (needs the brotli-asgi package, falls back to gzip) or "none")
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "gzip")
+RESPONSE_COMPRESSION_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESSION_MIN_SIZE", 1000))
+
+# TRANSACTIONS PARTITIONING ("none", "yearly" or "monthly" range partitions on transaction_date).
+# Only applies when the table is created; see `python manage.py partitions --help` for the tooling.
+TRANSACTIONS_PARTITIONING = os.getenv("TRANSACTIONS_PARTITIONING", "none")
+TRANSACTIONS_PARTITIONS_FROM = os.getenv("TRANSACTIONS_PARTITIONS_FROM", "2020-01-01")
+TRANSACTIONS_PARTITIONS_AHEAD = int(os.getenv("TRANSACTIONS_PARTITIONS_AHEAD", 2))
+TRANSACTIONS_PARTITION_CHECK_INTERVAL_SECONDS = int(os.getenv("TRANSACTIONS_PARTITION_CHECK_INTERVAL_SECONDS", 86400))
+
+# READ REPLICA (leave REPLICA_HOST empty to serve every read from the primary; pointing it at the
+# primary itself gives a local two-engine setup that exercises the routing)
+REPLICA_HOST = os.getenv("REPLICA_HOST", "")
+REPLICA_PORT = os.getenv("REPLICA_PORT", PORT)
+REPLICA_POOL_SIZE = int(os.getenv("REPLICA_POOL_SIZE", DB_POOL_SIZE))
+REPLICA_MAX_OVERFLOW = int(os.getenv("REPLICA_MAX_OVERFLOW", DB_MAX_OVERFLOW))
+
+# BATCH ENDPOINT
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", 50))
+
+# IDEMPOTENCY KEYS (stored responses are replayed for retries within the TTL)
+IDEMPOTENCY_KEY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_KEY_TTL_SECONDS", 86400))
+IDEMPOTENCY_PRUNE_INTERVAL_SECONDS = int(os.getenv("IDEMPOTENCY_PRUNE_INTERVAL_SECONDS", 3600))
+
+# CURRENCIES & FX RATES (rates are stored per one unit of FX_RATE_BASE, see `python manage.py fx load`)
+DEFAULT_CURRENCY = os.getenv("DEFAULT_CURRENCY", "INR")
+FX_RATE_BASE = os.getenv("FX_RATE_BASE", "EUR")
+FX_CACHE_TTL_SECONDS = int(os.getenv("FX_CACHE_TTL_SECONDS", 3600))
+
+# GROUP COMMIT FOR TRANSACTION CREATION (off by default; each batch waits at most the window)
+TRANSACTION_WRITE_BATCHING = os.getenv("TRANSACTION_WRITE_BATCHING", "false").lower() == "true"
+TRANSACTION_BATCH_WINDOW_MS = float(os.getenv("TRANSACTION_BATCH_WINDOW_MS", 5))
+TRANSACTION_BATCH_MAX_ROWS = int(os.getenv("TRANSACTION_BATCH_MAX_ROWS", 200))
+# A request whose row is not picked up by the writer in time gets a 503 instead of waiting forever
+TRANSACTION_BATCH_SUBMIT_TIMEOUT_SECONDS = float(os.getenv("TRANSACTION_BATCH_SUBMIT_TIMEOUT_SECONDS", 10))
+
+# CATEGORY NAME CACHE (per-user name -> id maps kept in memory)
+CATEGORY_CACHE_MAX_USERS = int(os.getenv("CATEGORY_CACHE_MAX_USERS", 10000))
+
+# SOFT DELETE (deleted transactions are purged after the retention period; a deleted category's
+# transactions are purged in chunks in the background)
+SOFT_DELETE_RETENTION_DAYS = int(os.getenv("SOFT_DELETE_RETENTION_DAYS", 30))
+PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 1000))
+PURGE_INTERVAL_SECONDS = int(os.getenv("PURGE_INTERVAL_SECONDS", 600))
+
+# TRANSACTIONS ARCHIVE (months older than this many years move to transactions_archive; 0 disables
+# the periodic run, `python manage.py archive run` works either way)
+TRANSACTIONS_ARCHIVE_AFTER_YEARS = int(os.getenv("TRANSACTIONS_ARCHIVE_AFTER_YEARS", 0))
+TRANSACTIONS_ARCHIVE_INTERVAL_SECONDS = int(os.getenv("TRANSACTIONS_ARCHIVE_INTERVAL_SECONDS", 86400))
@@ -1,19 +1,135 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 import uvicorn
 
-from routes import user_router, categories_router, transaction_router, report_router, agents_router
+from routes import user_router, categories_router, transaction_router, report_router, agents_router, health_router, \
+    jobs_router, budgets_router, batch_router
 
-from models import User, BlackListToken, Category, Transaction
+from const import TOKEN_PRUNE_INTERVAL_SECONDS, DB_SCHEMA_ACTION, DB_POOL_WARMUP, PRELOAD_AGENTS, \
+    SHUTDOWN_DRAIN_TIMEOUT_SECONDS, JOB_WORKERS, JOB_PRUNE_INTERVAL_SECONDS, DATA_VERSION_LISTEN, \
+    RESPONSE_COMPRESSION, RESPONSE_COMPRESSION_MIN_SIZE, \
+    TRANSACTIONS_PARTITION_CHECK_INTERVAL_SECONDS, IDEMPOTENCY_PRUNE_INTERVAL_SECONDS, TRANSACTION_WRITE_BATCHING, \
+    PURGE_INTERVAL_SECONDS, TRANSACTIONS_ARCHIVE_AFTER_YEARS, TRANSACTIONS_ARCHIVE_INTERVAL_SECONDS
+from models import User, RefreshToken, Category, Transaction, Job
+from models.transaction import TRANSACTIONS_PARTITIONED
 from utils import engine, Base
+from utils.data_version import DataVersionListener
+from utils.archive import archive_old_transactions
+from utils.database import warm_up_pool, check_schema, replica_engine
+from utils.etag import ETagMiddleware
+from utils.idempotency import prune_expired_idempotency_keys
+from utils.jobs import JobWorkerPool, prune_finished_jobs
+from utils.lifecycle import lifecycle
+from utils.maintenance import run_periodically
+from utils.partitions import ensure_future_partitions
+from utils.responses import FastJSONResponse
+from utils.soft_delete import purge_deleted
+from utils.token_store import prune_expired_tokens
+from utils.write_batcher import transaction_writer
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_database():
+    if DB_SCHEMA_ACTION == "create":
+        Base.metadata.create_all(bind=engine)
+    elif DB_SCHEMA_ACTION == "check":
+        check_schema()
+
+    if DB_POOL_WARMUP > 0:
+        warm_up_pool(DB_POOL_WARMUP)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(prepare_database)
+
+    if PRELOAD_AGENTS:
+        from agents import get_supervisor_agent
+        await asyncio.to_thread(get_supervisor_agent)
+
+    # Expired refresh tokens are removed in the background so the token store stays compact
+    prune_task = asyncio.create_task(run_periodically(prune_expired_tokens, TOKEN_PRUNE_INTERVAL_SECONDS))
+    job_prune_task = asyncio.create_task(run_periodically(prune_finished_jobs, JOB_PRUNE_INTERVAL_SECONDS))
+    idempotency_prune_task = asyncio.create_task(run_periodically(prune_expired_idempotency_keys,
+                                                                  IDEMPOTENCY_PRUNE_INTERVAL_SECONDS))
+    # Soft-deleted rows are hard-deleted in the background, old months move to the archive
+    purge_task = asyncio.create_task(run_periodically(purge_deleted, PURGE_INTERVAL_SECONDS))
+    archive_task = asyncio.create_task(run_periodically(archive_old_transactions, TRANSACTIONS_ARCHIVE_INTERVAL_SECONDS)
+                                       ) if TRANSACTIONS_ARCHIVE_AFTER_YEARS > 0 else None
+    # Upcoming transaction partitions are created ahead of time so new rows never land in the default partition
+    partition_task = asyncio.create_task(run_periodically(
+        ensure_future_partitions, TRANSACTIONS_PARTITION_CHECK_INTERVAL_SECONDS)) if TRANSACTIONS_PARTITIONED else None
+
+    # Local job workers; set JOB_WORKERS=0 when jobs run in a separate worker.py deployment
+    job_pool = JobWorkerPool(JOB_WORKERS)
+    if JOB_WORKERS > 0:
+        await asyncio.to_thread(job_pool.start)
+
+    # In-process view of every user's data version, kept current by NOTIFYs from all workers
+    data_versions = DataVersionListener()
+    if DATA_VERSION_LISTEN:
+        data_versions.start()
+    app.state.data_versions = data_versions
+
+    # Group commit for transaction creation at high write rates
+    if TRANSACTION_WRITE_BATCHING:
+        transaction_writer.start()
+    lifecycle.ready = True
+
+    yield
+
+    # Stop advertising readiness and let in-flight agent requests finish before tearing down the pool
+    lifecycle.draining = True
+    if not await lifecycle.agent_requests.wait_idle(SHUTDOWN_DRAIN_TIMEOUT_SECONDS):
+        logger.warning("Shutting down with %s agent requests still in flight", lifecycle.agent_requests.count)
+    await asyncio.to_thread(job_pool.stop, SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    await asyncio.to_thread(data_versions.stop)
+    await asyncio.to_thread(transaction_writer.stop, SHUTDOWN_DRAIN_TIMEOUT_SECONDS)
+    prune_task.cancel()
+    job_prune_task.cancel()
+    idempotency_prune_task.cancel()
+    purge_task.cancel()
+    if archive_task:
+        archive_task.cancel()
+    if partition_task:
+        partition_task.cancel()
+    engine.dispose()
+    replica_engine.dispose()
+
+
+def add_compression(app: FastAPI):
+    """Compress large list and report bodies; small payloads are not worth the CPU."""
+    if RESPONSE_COMPRESSION == "brotli":
+        try:
+            from brotli_asgi import BrotliMiddleware
+        except ImportError:
+            logger.warning("brotli-asgi is not installed, falling back to gzip compression")
+        else:
+            # Serves gzip to clients that don't accept br
+            app.add_middleware(BrotliMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_SIZE)
+            return
+    if RESPONSE_COMPRESSION != "none":
+        app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_SIZE)
+
 
-app = FastAPI()
-Base.metadata.create_all(bind=engine)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+app.add_middleware(ETagMiddleware)
+add_compression(app)
 
+app.include_router(health_router)
 app.include_router(user_router)
 app.include_router(categories_router)
 app.include_router(transaction_router)
 app.include_router(report_router)
 app.include_router(agents_router)
+app.include_router(jobs_router)
+app.include_router(budgets_router)
+app.include_router(batch_router)
 
 if __name__ == "__main__":
     uvicorn.run(app, port=8000)
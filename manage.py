@@ -0,0 +1,151 @@
+"""
+Operational commands.
+
+    uv run python manage.py partitions list
+    uv run python manage.py partitions create [--ahead 2] [--from 2020-01-01]
+    uv run python manage.py partitions detach --before 2021-01-01 [--archive]
+    uv run python manage.py rollups rebuild [--user <uuid>]
+    uv run python manage.py fx load rates.csv
+    uv run python manage.py archive run [--older-than-years 3 | --before 2022-01-01]
+    uv run python manage.py purge run
+"""
+import argparse
+import csv
+import sys
+from datetime import date
+from decimal import Decimal, InvalidOperation
+from uuid import UUID
+
+import utils  # noqa: F401  (import order: utils before models)
+from const import TRANSACTIONS_PARTITIONS_AHEAD, TRANSACTIONS_ARCHIVE_AFTER_YEARS
+from models.transaction import TRANSACTIONS_PARTITIONED
+from utils.database import engine, SessionLocal
+
+
+def partitions_list(args):
+    from utils.partitions import list_partitions, partition_range
+
+    with engine.connect() as connection:
+        for name in list_partitions(connection):
+            bounds = partition_range(name)
+            print(name, f"[{bounds[0]}, {bounds[1]})" if bounds else "(default)")
+
+
+def partitions_create(args):
+    from utils.partitions import ensure_partitions, partition_horizon
+
+    start = date.fromisoformat(args.start) if args.start else date.today()
+    with engine.begin() as connection:
+        created = ensure_partitions(connection, start, partition_horizon(args.ahead))
+    print("Created:", ", ".join(created) if created else "nothing, all partitions exist")
+
+
+def partitions_detach(args):
+    from utils.partitions import detach_partitions_before
+
+    with engine.begin() as connection:
+        detached = detach_partitions_before(connection, date.fromisoformat(args.before), archive=args.archive)
+    print("Detached:", ", ".join(detached) if detached else "nothing")
+
+
+def rollups_rebuild(args):
+    from utils.rollups import rebuild_rollups
+
+    with SessionLocal() as session:
+        rebuild_rollups(session, args.user)
+    print("Rollups rebuilt")
+
+
+def fx_load(args):
+    from utils.fx import store_rates
+
+    rates = []
+    with open(args.file, newline="") as file:
+        reader = csv.reader(file)
+        header = [column.strip() for column in next(reader)]
+        long_format = [column.lower() for column in header[:3]] == ["date", "currency", "rate"]
+        for row in reader:
+            if not row or not row[0].strip():
+                continue
+            rate_date = date.fromisoformat(row[0].strip())
+            # "date,currency,rate" rows, or one column per currency as in the ECB history file
+            cells = [(row[1], row[2])] if long_format else zip(header[1:], row[1:])
+            for currency, value in cells:
+                try:
+                    rate = Decimal(value.strip())
+                except InvalidOperation:
+                    continue  # Blank or N/A: no rate published that day
+                rates.append({"currency": currency.strip().upper(), "rate_date": rate_date, "rate": rate})
+
+    with SessionLocal() as session:
+        loaded = store_rates(session, rates)
+    print(f"Loaded {loaded} rates")
+
+
+def archive_run(args):
+    from utils.archive import archive_transactions, archive_cutoff
+
+    if args.before:
+        before = date.fromisoformat(args.before)
+    elif args.older_than_years > 0:
+        before = archive_cutoff(args.older_than_years)
+    else:
+        sys.exit("Pass --older-than-years or --before, TRANSACTIONS_ARCHIVE_AFTER_YEARS is not set")
+    archived = archive_transactions(before)
+    print(f"Archived {archived} transactions from before {before.replace(day=1)}")
+
+
+def purge_run(args):
+    from utils.soft_delete import purge_deleted
+
+    purge_deleted()
+    print("Purged deleted categories and expired deleted transactions")
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="manage.py")
+    commands = parser.add_subparsers(dest="group", required=True)
+
+    partitions = commands.add_parser("partitions", help="transactions table partitions").add_subparsers(
+        dest="command", required=True)
+    partitions.add_parser("list").set_defaults(func=partitions_list)
+    create = partitions.add_parser("create", help="create missing partitions up to --ahead periods from now")
+    create.add_argument("--ahead", type=int, default=TRANSACTIONS_PARTITIONS_AHEAD)
+    create.add_argument("--from", dest="start", help="first period to cover (default: the current one)")
+    create.set_defaults(func=partitions_create)
+    detach = partitions.add_parser("detach", help="detach partitions that end on or before --before")
+    detach.add_argument("--before", required=True, help="YYYY-MM-DD")
+    detach.add_argument("--archive", action="store_true", help="move detached partitions to the archive schema")
+    detach.set_defaults(func=partitions_detach)
+
+    rollups = commands.add_parser("rollups", help="monthly category rollup").add_subparsers(
+        dest="command", required=True)
+    rebuild = rollups.add_parser("rebuild", help="recompute the rollup from the transactions table")
+    rebuild.add_argument("--user", type=UUID, help="only this user")
+    rebuild.set_defaults(func=rollups_rebuild)
+
+    fx = commands.add_parser("fx", help="exchange rates").add_subparsers(dest="command", required=True)
+    load = fx.add_parser("load", help="upsert rates per one unit of FX_RATE_BASE from a CSV file")
+    load.add_argument("file", help='"date,currency,rate" rows or the ECB history format (Date,USD,JPY,...)')
+    load.set_defaults(func=fx_load)
+
+    archive = commands.add_parser("archive", help="transactions archive").add_subparsers(
+        dest="command", required=True)
+    run = archive.add_parser("run", help="move whole months before the cutoff to transactions_archive")
+    cutoff = run.add_mutually_exclusive_group()
+    cutoff.add_argument("--older-than-years", type=int, default=TRANSACTIONS_ARCHIVE_AFTER_YEARS)
+    cutoff.add_argument("--before", help="YYYY-MM-DD, rounded down to the first of the month")
+    run.set_defaults(func=archive_run)
+
+    purge = commands.add_parser("purge", help="soft-deleted categories and transactions").add_subparsers(
+        dest="command", required=True)
+    purge.add_parser("run", help="what the periodic purge does, once").set_defaults(func=purge_run)
+
+    args = parser.parse_args()
+    if args.group == "partitions" and not TRANSACTIONS_PARTITIONED:
+        sys.exit("TRANSACTIONS_PARTITIONING is not enabled")
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,18 @@
 from .users import User
-from .token import BlackListToken
+from .token import RefreshToken
 from .transaction import Category, Transaction
+from .job import Job
+from .conversation import Conversation, ConversationMessage
+from .usage import AgentUsage
+from .rollup import MonthlyCategoryTotal
+from .data_version import UserDataVersion
+from .budget import Budget
+from .idempotency import IdempotencyKey
+from .fx import FxRate
+from .archive import TransactionArchive
+
+# Registers the flush listeners that keep the monthly rollup and the data versions in sync with writes,
+# and the query filter that hides soft-deleted rows
+import utils.rollups  # noqa: E402,F401
+import utils.data_version  # noqa: E402,F401
+import utils.soft_delete  # noqa: E402,F401
@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, UUID, Date, DateTime, ForeignKey, Integer, LargeBinary
+
+from utils import Base
+
+
+class TransactionArchive(Base):
+    """
+    One user's transactions of one month after they were moved out of ``transactions`` by
+    ``utils.archive``, stored as a single zlib-compressed, column-oriented JSON document.
+    """
+    __tablename__ = "transactions_archive"
+
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    transaction_count = Column(Integer, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    archived_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False)
@@ -0,0 +1,31 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Column, UUID, DateTime, ForeignKey, DECIMAL, Float, UniqueConstraint
+from sqlalchemy.orm import relationship
+
+from utils import Base
+
+
+class Budget(Base):
+    """
+    Monthly spending limit for one category. Spend-to-date is not stored here: it is the
+    category's expense counter in ``monthly_category_totals``, which every transaction write
+    keeps current.
+    """
+    __tablename__ = "budgets"
+    __table_args__ = (
+        UniqueConstraint('user_id', 'category_id', name='uq_budgets_user_category'),
+    )
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    category_id = Column(UUID, ForeignKey('categories.id', ondelete='CASCADE'), nullable=False)
+    amount = Column(DECIMAL(12, 2), nullable=False)  # In the user's base currency
+    # Share of the budget at which the status turns into a warning
+    alert_threshold = Column(Float, nullable=False, default=0.8)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+
+    category = relationship('Category')
@@ -0,0 +1,46 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Column, String, UUID, DateTime, ForeignKey, JSON, Text, Integer, Boolean, Index
+from sqlalchemy.orm import relationship
+
+from utils import Base
+
+
+class Conversation(Base):
+    """An agent conversation thread. Older turns are folded into ``summary``."""
+    __tablename__ = "conversations"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    title = Column(String, nullable=True)
+    summary = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc),
+                        onupdate=lambda: datetime.now(timezone.utc))
+
+    messages = relationship('ConversationMessage', back_populates='conversation', cascade='all, delete-orphan',
+                            passive_deletes=True, order_by='ConversationMessage.position')
+
+    __table_args__ = (
+        Index('ix_conversations_user_updated_at', 'user_id', 'updated_at'),
+    )
+
+
+class ConversationMessage(Base):
+    """One LangChain message of a conversation, stored in its ``messages_to_dict`` form."""
+    __tablename__ = "conversation_messages"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    conversation_id = Column(UUID, ForeignKey('conversations.id', ondelete='CASCADE'), nullable=False)
+    position = Column(Integer, nullable=False)
+    message = Column(JSON, nullable=False)
+    token_count = Column(Integer, nullable=False, default=0)
+    is_summarized = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    conversation = relationship('Conversation', back_populates='messages')
+
+    __table_args__ = (
+        Index('uq_conversation_messages_position', 'conversation_id', 'position', unique=True),
+    )
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, UUID, BigInteger, DateTime, ForeignKey
+
+from utils import Base
+
+
+class UserDataVersion(Base):
+    """
+    Monotonic version of a user's financial data, bumped in the same database transaction as
+    every transaction or category write. Caches key their entries on it.
+    """
+    __tablename__ = "user_data_versions"
+
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
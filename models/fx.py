@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, Date, DateTime, DECIMAL, func
+
+from utils import Base
+
+
+class FxRate(Base):
+    """Daily exchange rate: units of ``currency`` per one unit of ``FX_RATE_BASE``."""
+    __tablename__ = "fx_rates"
+
+    currency = Column(String(3), primary_key=True)
+    rate_date = Column(Date, primary_key=True)
+    rate = Column(DECIMAL(18, 8), nullable=False)
+    # Set by every load; the latest one is part of the validators of converted responses
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), index=True)
@@ -0,0 +1,19 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import Column, UUID, DateTime, ForeignKey, String, Integer, JSON
+
+from utils import Base
+
+
+class IdempotencyKey(Base):
+    """Response of a write made with an ``Idempotency-Key`` header, replayed on retries until it expires."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # Fingerprint of method, path and body: a key reused for a different request is rejected
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc), nullable=False,
+                        index=True)
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Column, String, UUID, DateTime, ForeignKey, Enum, JSON, Text, Integer, Index
+
+from utils import Base
+from utils.job_enums import JobStatus, JobKind
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    kind = Column(Enum(JobKind), nullable=False)
+    params = Column(JSON, nullable=False)
+    # Hash of kind + params, used to collapse identical in-flight submissions
+    dedup_key = Column(String(64), nullable=False)
+    status = Column(Enum(JobStatus), nullable=False, default=JobStatus.QUEUED)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Workers claim the oldest queued job
+        Index('ix_jobs_status_created_at', 'status', 'created_at'),
+        Index('ix_jobs_user_created_at', 'user_id', 'created_at'),
+        # At most one identical job per user can be queued or running at a time
+        Index('uq_jobs_user_dedup_in_flight', 'user_id', 'dedup_key', unique=True,
+              postgresql_where=status.in_([JobStatus.QUEUED, JobStatus.RUNNING])),
+    )
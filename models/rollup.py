@@ -0,0 +1,26 @@
+from sqlalchemy import Column, UUID, Date, Integer, Enum, DECIMAL, Index, String
+
+from utils import Base
+from utils.transaction_enums import TransactionType
+
+
+class MonthlyCategoryTotal(Base):
+    """
+    Per-user monthly totals by category, transaction type and currency, maintained on every flush by
+    ``utils.rollups`` so summaries never have to scan the transactions table.
+    """
+    __tablename__ = "monthly_category_totals"
+
+    user_id = Column(UUID, primary_key=True)
+    month = Column(Date, primary_key=True)  # First day of the month
+    # Not a foreign key: rows of a deleted category are removed when it is soft-deleted
+    category_id = Column(UUID, primary_key=True)
+    transaction_type = Column(Enum(TransactionType), primary_key=True)
+    # Totals stay in the transactions' own currency; readers convert them with utils.fx
+    currency = Column(String(3), primary_key=True)
+    total_amount = Column(DECIMAL(14, 2), nullable=False, default=0)
+    transaction_count = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        Index('ix_monthly_category_totals_user_month', 'user_id', 'month'),
+    )
@@ -2,15 +2,15 @@ from datetime import datetime, timezone
 from uuid import uuid4
 
 from utils import Base
-from sqlalchemy import Column, String, UUID, DateTime, Boolean
+from sqlalchemy import Column, UUID, DateTime, Boolean, ForeignKey
 
 
-class BlackListToken(Base):
-    __tablename__ = "blacklist_tokens"
+class RefreshToken(Base):
+    """Issued refresh tokens, keyed by the ``jti`` claim of the JWT."""
+    __tablename__ = "refresh_tokens"
 
-    id = Column(UUID, primary_key=True, nullable=False, default=uuid4)
-    token = Column(String, unique=True, nullable=False)
+    jti = Column(UUID, primary_key=True, nullable=False, default=uuid4)
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
     is_revoked = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=datetime.now(timezone.utc))
-    
\ No newline at end of file
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
@@ -1,9 +1,11 @@
 from datetime import datetime, timezone
 from uuid import uuid4
 
-from sqlalchemy import Column, String, Boolean, UUID, DateTime, Table, ForeignKey, Float, DECIMAL, Text, Enum
+from sqlalchemy import Column, String, Boolean, UUID, DateTime, Table, ForeignKey, Float, DECIMAL, Text, Enum, Index, \
+    func, text
 from sqlalchemy.orm import relationship
 
+from const import TRANSACTIONS_PARTITIONING, DEFAULT_CURRENCY
 from utils import Base
 from utils.transaction_enums import AccountEnum, TransactionType, PaymentMethodEnum
 
@@ -17,19 +19,44 @@ class Category(Base):
     is_active = Column(Boolean, default=True, nullable=False)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
     updated_at = Column(DateTime, default=datetime.now(timezone.utc))
+    # Set on delete; utils/soft_delete.py hides the row and purges it with its transactions later
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
 
     user_id = Column(UUID, ForeignKey('users.id'))
     user = relationship('User', back_populates='categories')
-    transactions = relationship('Transaction', back_populates='category', cascade='all, delete-orphan')
+    transactions = relationship('Transaction', back_populates='category')
+
+
+# Category names are unique per user regardless of case among live categories; the index also serves name lookups
+Index('uq_categories_user_lower_name', Category.user_id, func.lower(Category.name), unique=True,
+      postgresql_where=Category.deleted_at.is_(None))
+# Deleted categories awaiting their purge, for the soft delete filter on transactions
+Index('ix_categories_user_deleted', Category.user_id, Category.id, postgresql_where=Category.deleted_at.is_not(None))
+
+
+TRANSACTIONS_PARTITIONED = TRANSACTIONS_PARTITIONING in ("yearly", "monthly")
 
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # Every list/report query is scoped to one user and usually a date range, and only sees live rows
+        Index('ix_transactions_user_date', 'user_id', 'transaction_date', postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_transactions_user_category_date', 'user_id', 'category_id', 'transaction_date',
+              postgresql_where=text('deleted_at IS NULL')),
+        Index('ix_transactions_user_amount', 'user_id', 'amount', postgresql_where=text('deleted_at IS NULL')),
+        # Finds soft-deleted rows that are due for purging
+        Index('ix_transactions_deleted_at', 'deleted_at', postgresql_where=text('deleted_at IS NOT NULL')),
+        # Partitions themselves are managed by utils/partitions.py
+        {"postgresql_partition_by": "RANGE (transaction_date)"} if TRANSACTIONS_PARTITIONED else {},
+    )
 
     id = Column(UUID, primary_key=True, default=uuid4, nullable=False)
     name = Column(String, nullable=False)
-    transaction_date = Column(DateTime, nullable=False)  # Renamed for clarity
+    # A partitioned table's primary key has to include the partition key
+    transaction_date = Column(DateTime, nullable=False, primary_key=TRANSACTIONS_PARTITIONED)  # Renamed for clarity
     amount = Column(DECIMAL(10, 2), nullable=False)
+    currency = Column(String(3), nullable=False, default=DEFAULT_CURRENCY, server_default=DEFAULT_CURRENCY)
     transaction_type = Column(Enum(TransactionType), nullable=False)
     category_id = Column(UUID, ForeignKey('categories.id'))
     user_id = Column(UUID, ForeignKey('users.id'))
@@ -41,3 +68,7 @@ class Transaction(Base):
     category = relationship('Category', back_populates='transactions')
 
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+
+    # The ORM keeps identifying transactions by id alone, partitioned or not
+    __mapper_args__ = {"primary_key": [id]}
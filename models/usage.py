@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Column, UUID, DateTime, ForeignKey, Integer, Boolean, JSON, Index, Numeric
+
+from utils import Base
+
+
+class AgentUsage(Base):
+    """Token usage and cost of one agent run (supervisor plus every sub-agent call it made)."""
+    __tablename__ = "agent_usage"
+
+    id = Column(UUID, primary_key=True, default=uuid4)
+    user_id = Column(UUID, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    conversation_id = Column(UUID, ForeignKey('conversations.id', ondelete='SET NULL'), nullable=True)
+    llm_calls = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cached_tokens = Column(Integer, nullable=False, default=0)
+    cost = Column(Numeric(12, 6), nullable=False, default=0)
+    truncated = Column(Boolean, nullable=False, default=False)
+    prompt_breakdown = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        Index('ix_agent_usage_user_created_at', 'user_id', 'created_at'),
+    )
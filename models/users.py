@@ -5,6 +5,7 @@ from uuid import uuid4
 
 from sqlalchemy.orm import relationship
 
+from const import DEFAULT_CURRENCY
 from utils import Base
 
 
@@ -17,6 +18,8 @@ class User(Base):
     email = Column(String(60), unique=True, nullable=False)
     password = Column(String, nullable=False)
     is_verified = Column(Boolean, default=False)
+    # Reports and agent answers are converted to this currency
+    base_currency = Column(String(3), nullable=False, default=DEFAULT_CURRENCY, server_default=DEFAULT_CURRENCY)
     created_at = Column(DateTime, default=datetime.now(timezone.utc))
 
     categories = relationship('Category', back_populates='user', cascade='all, delete-orphan')
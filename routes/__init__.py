@@ -2,4 +2,8 @@ from .users import user_router
 from .category import categories_router
 from .transactions import transaction_router
 from .reports import report_router
-from .agents import agents_router
\ No newline at end of file
+from .agents import agents_router
+from .health import health_router
+from .jobs import jobs_router
+from .budgets import budgets_router
+from .batch import batch_router
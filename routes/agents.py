@@ -1,72 +1,109 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from uuid import UUID
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
-from agents import kashflo_supervisor_agent
-from agents.context import UserDetails
 from utils import get_db, get_current_user
-from models import User
+from models import User, Conversation
 from schema.agents import AgentQuerySchema
+from utils.admission import agent_admission
+from utils.lifecycle import lifecycle
+from utils.responses import FastJSONResponse
 
 agents_router = APIRouter(prefix="/agents", tags=["AI Agents"])
 
+# The agents package is imported inside the handlers so workers that never serve agent
+# traffic don't load LangChain at startup.
+
 
 @agents_router.post("")
-def query_kashflo_supervisor(
+async def query_kashflo_supervisor(
         query: AgentQuerySchema,
+        background_tasks: BackgroundTasks,
         user: User = Depends(get_current_user),
+        session: Session = Depends(get_db),
 ):
     """
     Query the Kashflo AI Supervisor for personalized assistance.
     """
-    try:
-        # Create UserDetails context
-        user_details = UserDetails(
-            user_id=str(user.id),
-            user_name=f"{user.first_name} {user.last_name}"
-        )
+    if not lifecycle.accepting_requests:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Server is shutting down")
 
-        # Invoke the supervisor agent with context
-        response = kashflo_supervisor_agent.invoke(
-            {"messages": [{"role": "user", "content": query.query}]},
-            config={"configurable": {"user_details": user_details}}
-        )
+    # Per-user rate limit, global concurrency cap and bounded wait queue
+    async with agent_admission.admit(str(user.id)) as wait_seconds:
+        with lifecycle.agent_requests.track():
+            response = await _run_supervisor(query, user, session, background_tasks)
 
-        # Extract content from response
-        content = None
+    response.headers["X-Queue-Wait-Ms"] = str(round(wait_seconds * 1000, 2))
+    return response
 
-        if isinstance(response, dict):
-            # Check if it has messages array
-            if "messages" in response and response["messages"]:
-                latest_message = response["messages"][-1]
 
-                # Handle different message types
-                if hasattr(latest_message, 'content'):
-                    content = latest_message.content
-                elif hasattr(latest_message, 'text'):
-                    content = latest_message.text
-                elif isinstance(latest_message, dict):
-                    content = latest_message.get('content') or latest_message.get('text')
+@agents_router.get("/admission")
+def agent_admission_stats(user: User = Depends(get_current_user)):
+    """
+    Current state of the agent admission controller on this worker (queue depth, wait times, rejections).
+    """
+    return FastJSONResponse(content=agent_admission.stats(), status_code=status.HTTP_200_OK)
+
+
+@agents_router.get("/usage")
+def agent_usage(days: int = 30, user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    """
+    Token usage, cost and prompt-size breakdown of the user's agent runs over the last ``days`` days.
+    """
+    from agents.usage import usage_report
 
-            # If no messages, check for output key
-            elif "output" in response:
-                content = response["output"]
+    return FastJSONResponse(content=usage_report(session, user.id, days), status_code=status.HTTP_200_OK)
 
-        # Fallback to string conversion
-        if not content:
-            content = str(response)
 
-        return JSONResponse(
+@agents_router.get("/threads")
+def list_threads(user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    conversations = session.query(Conversation).filter(Conversation.user_id == user.id).order_by(
+        Conversation.updated_at.desc()).limit(50).all()
+    return FastJSONResponse(content={"threads": [{
+        "thread_id": str(conversation.id),
+        "title": conversation.title,
+        "updated_at": conversation.updated_at.isoformat() if conversation.updated_at else None
+    } for conversation in conversations]}, status_code=status.HTTP_200_OK)
+
+
+@agents_router.delete("/threads/{thread_id}")
+def delete_thread(thread_id: UUID, user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    from agents.memory import get_or_create_conversation
+
+    conversation = get_or_create_conversation(session, user.id, thread_id)
+    session.delete(conversation)
+    session.commit()
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def _run_supervisor(query: AgentQuerySchema, user: User, session: Session, background_tasks: BackgroundTasks):
+    from agents.memory import summarize_conversation
+    from agents.runner import run_supervisor_turn
+
+    try:
+        turn = await run_supervisor_turn(session, user, query.query, query.thread_id)
+
+        # Compact the thread history after the response has been sent
+        background_tasks.add_task(summarize_conversation, turn.thread_id)
+
+        return FastJSONResponse(
             content={
-                "response": content,
+                "response": turn.content,
+                "thread_id": str(turn.thread_id),
+                "truncated": turn.truncated,
+                "usage": turn.usage,
                 "user_name": f"{user.first_name} {user.last_name}"
             },
             status_code=status.HTTP_200_OK
         )
 
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in query_kashflo_supervisor: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error generating response: {str(e)}"
-        )
\ No newline at end of file
+        )
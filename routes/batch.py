@@ -0,0 +1,111 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+
+from const import BATCH_MAX_OPERATIONS
+from models import User
+from schema.batch import BatchRequestSchema
+from utils import get_current_user
+from utils.batch import dispatch, EXCLUDED_PREFIXES
+from utils.category_cache import category_names
+from utils.data_version import note_committed_versions
+from utils.database import engine, SessionLocal, batch_session
+from utils.dependencies import batch_user
+from utils.idempotency import IdempotentRequest, idempotency_key, claim, store
+from utils.responses import FastJSONResponse
+
+batch_router = APIRouter(prefix="/batch", tags=["Batch"])
+
+
+def _open_batch_session():
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Endpoints keep calling commit(); inside the batch that only releases a savepoint and the
+    # batch decides at the end whether the outer transaction commits
+    session = SessionLocal(bind=connection, join_transaction_mode="create_savepoint")
+    return connection, transaction, session
+
+
+def _close_batch_session(connection, transaction, session, user_id, commit: bool):
+    try:
+        session.close()
+        if commit:
+            transaction.commit()
+            note_committed_versions(session)
+        else:
+            transaction.rollback()
+            session.info.pop("data_versions", None)
+            # Nothing the batch wrote exists any more
+            category_names.invalidate(user_id)
+    finally:
+        connection.close()
+
+
+@batch_router.post("")
+async def run_batch(batch: BatchRequestSchema, request: Request, user: User = Depends(get_current_user),
+                    idempotent: Optional[IdempotentRequest] = Depends(idempotency_key)):
+    """
+    Run an ordered list of operations against the API in one authenticated session and one
+    database transaction. With ``atomic`` the batch stops at the first failed operation and
+    nothing is committed; otherwise failed operations are rolled back individually and the rest
+    is committed.
+    """
+    if len(batch.operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"A batch can contain at most {BATCH_MAX_OPERATIONS} operations")
+    excluded = [operation.path for operation in batch.operations if operation.path.startswith(EXCLUDED_PREFIXES)]
+    if excluded:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"Operations not allowed in a batch: {', '.join(excluded)}")
+
+    connection, transaction, session = await run_in_threadpool(_open_batch_session)
+    try:
+        # A retried batch gets its stored results back instead of running again
+        replay = await run_in_threadpool(claim, session, user.id, idempotent)
+        if not replay:
+            # Moves the key into the outer transaction, so rolling back a failed operation can't
+            # release it to a concurrent retry while the batch is still running
+            await run_in_threadpool(session.commit)
+    except BaseException:
+        await run_in_threadpool(_close_batch_session, connection, transaction, session, user.id, False)
+        raise
+    if replay:
+        await run_in_threadpool(_close_batch_session, connection, transaction, session, user.id, False)
+        return replay
+
+    session_token = batch_session.set(session)
+    user_token = batch_user.set(await run_in_threadpool(session.get, User, user.id))
+    results = []
+    failed = False
+    try:
+        for index, operation in enumerate(batch.operations):
+            if failed and batch.atomic:
+                results.append({"index": index, "status": None, "skipped": True})
+                continue
+
+            result = await dispatch(request.app, request.scope, operation)
+            if result["status"] >= 400:
+                failed = True
+                # Undo whatever the failed operation flushed since the previous one finished
+                await run_in_threadpool(session.rollback)
+            else:
+                await run_in_threadpool(session.commit)
+            results.append({"index": index, **result})
+    except BaseException:
+        await run_in_threadpool(_close_batch_session, connection, transaction, session, user.id, False)
+        raise
+    finally:
+        batch_user.reset(user_token)
+        batch_session.reset(session_token)
+
+    committed = not (failed and batch.atomic)
+    response = {"atomic": batch.atomic, "committed": committed, "results": results}
+    try:
+        if committed:
+            # Stored in the batch's transaction; a rolled back batch can be retried with the same key
+            await run_in_threadpool(store, session, user.id, idempotent, status.HTTP_200_OK, response)
+            await run_in_threadpool(session.commit)
+    finally:
+        await run_in_threadpool(_close_batch_session, connection, transaction, session, user.id, committed)
+    return FastJSONResponse(response, status_code=status.HTTP_200_OK)
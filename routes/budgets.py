@@ -0,0 +1,97 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status, responses
+from sqlalchemy.orm import Session
+
+from models import Budget, Category, User
+from schema import BudgetCreateSchema, BudgetUpdateSchema, BudgetSchema, BudgetStatusSchema
+from utils import get_db, get_current_user
+from utils.budgets import budget_status, month_start
+from utils.etag import data_version, converted_data_version
+from utils.read_routing import get_read_db
+from utils.responses import FastJSONResponse
+
+budgets_router = APIRouter(prefix="/budgets", tags=["Budgets"])
+
+
+def _get_user_budget(session: Session, budget_id: str, user: User) -> Budget:
+    budget = session.query(Budget).filter(Budget.id == budget_id, Budget.user_id == user.id).first()
+    if not budget:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Budget not found")
+    return budget
+
+
+@budgets_router.post("", status_code=status.HTTP_201_CREATED)
+def create_budget(budget: BudgetCreateSchema, user_details: User = Depends(get_current_user),
+                  session: Session = Depends(get_db)):
+    category = session.query(Category).filter(Category.user_id == user_details.id,
+                                              Category.id == budget.category_id).first()
+    if not category:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Category not found")
+
+    existing_budget = session.query(Budget).filter(Budget.user_id == user_details.id,
+                                                   Budget.category_id == budget.category_id).first()
+    if existing_budget:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category already has a budget")
+
+    new_budget = Budget(user_id=user_details.id, category_id=budget.category_id, amount=budget.amount,
+                        alert_threshold=budget.alert_threshold)
+    session.add(new_budget)
+    session.commit()
+
+    return FastJSONResponse({
+        "message": "Budget created successfully",
+        "data": BudgetSchema.model_validate(new_budget)
+    }, status_code=status.HTTP_201_CREATED)
+
+
+@budgets_router.get("")
+def list_budgets(user_details: User = Depends(get_current_user), session: Session = Depends(get_read_db),
+                 version: int = Depends(data_version)):
+    budgets = session.query(Budget).filter(Budget.user_id == user_details.id).all()
+    return FastJSONResponse({
+        "message": "Budgets retrieved successfully" if budgets else "No budgets found",
+        "data": [BudgetSchema.model_validate(budget) for budget in budgets]
+    })
+
+
+@budgets_router.get("/status")
+def get_budget_status(month: Optional[str] = None, user_details: User = Depends(get_current_user),
+                      session: Session = Depends(get_read_db), version: int = Depends(converted_data_version)):
+    """Spend-to-date against each budget for ``month`` (YYYY-MM, current month by default)."""
+    try:
+        period = month_start(month)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="month must be formatted as YYYY-MM")
+
+    statuses = [BudgetStatusSchema(**item)
+                for item in budget_status(session, user_details.id, period, user_details.base_currency)]
+    return FastJSONResponse({
+        "month": period.strftime("%Y-%m"),
+        "data": statuses,
+        "alerts": [item for item in statuses if item.status != "ok"]
+    })
+
+
+@budgets_router.put("/{budget_id}")
+def update_budget(budget_id: str, budget: BudgetUpdateSchema, user_details: User = Depends(get_current_user),
+                  session: Session = Depends(get_db)):
+    existing_budget = _get_user_budget(session, budget_id, user_details)
+    if budget.amount is not None:
+        existing_budget.amount = budget.amount
+    if budget.alert_threshold is not None:
+        existing_budget.alert_threshold = budget.alert_threshold
+    session.commit()
+
+    return FastJSONResponse({
+        "message": "Budget updated successfully",
+        "data": BudgetSchema.model_validate(existing_budget)
+    })
+
+
+@budgets_router.delete("/{budget_id}")
+def delete_budget(budget_id: str, user_details: User = Depends(get_current_user),
+                  session: Session = Depends(get_db)):
+    session.delete(_get_user_budget(session, budget_id, user_details))
+    session.commit()
+    return responses.Response(status_code=status.HTTP_204_NO_CONTENT)
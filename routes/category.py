@@ -1,29 +1,44 @@
-from fastapi import APIRouter, Depends, HTTPException, status, responses
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status, responses
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from schema import CategoryResponse, CategoryCreateSchema, CategorySchema, CategoryUpdateSchema
 from utils import get_db, get_current_user
+from utils.category_cache import category_names
+from utils.etag import data_version
+from utils.read_routing import get_read_db
+from utils.responses import FastJSONResponse
+from utils.soft_delete import soft_delete_category, purge_category
 from models import Category, User
 
 categories_router = APIRouter(prefix="/categories", tags=["Category"])
 
 
+def commit_category_write(session: Session, user_id):
+    try:
+        session.commit()
+    except IntegrityError:
+        # Lost a race on the (user_id, lower(name)) unique index
+        session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category already exists")
+    finally:
+        category_names.invalidate(user_id)
+
+
 @categories_router.post("", response_model=CategoryResponse)
 def create_category(category: CategoryCreateSchema, user_details=Depends(get_current_user),
                     session: Session = Depends(get_db)):
-    # Checking if category already exists
-    existing_category = session.query(Category).filter(Category.name == category.name,
-                                                       Category.user_id == user_details.id).first()
-    if existing_category:
+    # Checking if category already exists (names are case-insensitive)
+    if category_names.lookup(session, user_details.id, category.name):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Category already exists")
 
     # Creating a new category
     new_category = Category(name=category.name, description=category.description, user_id=user_details.id)
     session.add(new_category)
-    session.commit()
+    commit_category_write(session, user_details.id)
 
     # Returning the response
-    return responses.JSONResponse({
+    return FastJSONResponse({
         "message": "Category created successfully",
         "data": {
             "id": str(new_category.id),  # You can include other fields as needed
@@ -36,30 +51,33 @@ def create_category(category: CategoryCreateSchema, user_details=Depends(get_cur
     }, status_code=status.HTTP_201_CREATED)
 
 
+CATEGORY_FIELDS = tuple(CategorySchema.model_fields.keys())
+CATEGORY_COLUMNS = [getattr(Category, field) for field in CATEGORY_FIELDS]
+
+
 @categories_router.get("", response_model=CategoryResponse)
-def list_categories(user_details=Depends(get_current_user), session: Session = Depends(get_db)):
-    categories = session.query(Category).filter(Category.user_id == user_details.id).all()
-    if not categories:
-        return CategoryResponse(
-            message="No categories found",
-            categories=[]
-        )
-    return CategoryResponse(
-        message="Categories retrieved successfully",
-        categories=[CategorySchema.model_validate(category) for category in categories]
-    )
+def list_categories(user_details=Depends(get_current_user), session: Session = Depends(get_read_db),
+                    version: int = Depends(data_version)):
+    # Read straight into the response, without validating every row through CategorySchema
+    rows = session.query(*CATEGORY_COLUMNS).filter(Category.user_id == user_details.id).all()
+    return FastJSONResponse({
+        "message": "Categories retrieved successfully" if rows else "No categories found",
+        "categories": [dict(zip(CATEGORY_FIELDS, row)) for row in rows]
+    }, status_code=status.HTTP_200_OK)
 
 
 @categories_router.delete("/{category_id}/")
-def delete_categories(category_id: str, user_details: User = Depends(get_current_user),
-                      session: Session = Depends(get_db)):
+def delete_categories(category_id: str, background_tasks: BackgroundTasks,
+                      user_details: User = Depends(get_current_user), session: Session = Depends(get_db)):
     exisiting_category = session.query(Category).filter(
-        Category.user_id == user_details.id and Category.id == category_id).first()
+        Category.user_id == user_details.id, Category.id == category_id).first()
     if not exisiting_category:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Category not found")
 
-    session.delete(exisiting_category)
-    session.commit()
+    # The category disappears now; its transactions are purged in chunks after the response
+    soft_delete_category(session, exisiting_category)
+    background_tasks.add_task(purge_category, exisiting_category.id)
+    commit_category_write(session, user_details.id)
 
     return responses.Response(status_code=status.HTTP_204_NO_CONTENT)
 
@@ -80,7 +98,7 @@ def delete_categories(category_id: str, category: CategoryUpdateSchema, user_det
     if category.is_active is not None:
         existing_category.is_active = category.is_active
 
-    session.commit()
+    commit_category_write(session, user_details.id)
     return CategoryResponse(
         message="Category updated successfully",
         categories=[CategorySchema.model_validate(existing_category)]
@@ -0,0 +1,27 @@
+from fastapi import APIRouter, status
+
+from utils.admission import agent_admission
+from utils.database import ping
+from utils.lifecycle import lifecycle
+from utils.responses import FastJSONResponse
+
+health_router = APIRouter(tags=["Health"])
+
+
+@health_router.get("/health")
+def health():
+    """Readiness probe: fails while starting up, while draining on shutdown, or when the database is unreachable."""
+    if not lifecycle.accepting_requests:
+        return FastJSONResponse({"status": "draining" if lifecycle.draining else "starting"},
+                                status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    if not ping():
+        return FastJSONResponse({"status": "unavailable", "database": "unreachable"},
+                                status_code=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    return FastJSONResponse({
+        "status": "ok",
+        "database": "ok",
+        "in_flight_agent_requests": lifecycle.agent_requests.count,
+        "agent_queue_depth": agent_admission.waiting
+    }, status_code=status.HTTP_200_OK)
@@ -0,0 +1,60 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from models import Job, User
+from schema import JobCreateSchema, JobSchema
+from utils import get_db, get_current_user
+from utils.job_enums import JobStatus
+from utils.job_handlers import JOB_HANDLERS
+from utils.jobs import submit_job
+from utils.responses import FastJSONResponse
+
+jobs_router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+
+def _get_user_job(session: Session, job_id: str, user: User) -> Job:
+    job = session.query(Job).filter(Job.id == job_id, Job.user_id == user.id).first()
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
+@jobs_router.post("", status_code=status.HTTP_202_ACCEPTED)
+def create_job(job: JobCreateSchema, user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    """
+    Queue a long-running report or agent analysis. Identical jobs already queued or running
+    for the same user are returned instead of being queued twice.
+    """
+    params_schema, _ = JOB_HANDLERS[job.kind]
+    try:
+        params = params_schema.model_validate(job.params).model_dump(mode="json")
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=jsonable_encoder(e.errors()))
+
+    new_job, created = submit_job(session, user.id, job.kind, params)
+    return FastJSONResponse({
+        "message": "Job submitted successfully" if created else "Identical job already in progress",
+        "data": JobSchema.model_validate(new_job)
+    }, status_code=status.HTTP_202_ACCEPTED, headers={"Location": f"/jobs/{new_job.id}"})
+
+
+@jobs_router.get("/{job_id}")
+def get_job(job_id: str, user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    job = _get_user_job(session, job_id, user)
+    return FastJSONResponse({"data": JobSchema.model_validate(job)}, status_code=status.HTTP_200_OK)
+
+
+@jobs_router.get("/{job_id}/result")
+def get_job_result(job_id: str, user: User = Depends(get_current_user), session: Session = Depends(get_db)):
+    job = _get_user_job(session, job_id, user)
+
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job failed: {job.error}")
+
+    if job.status != JobStatus.SUCCEEDED:
+        return FastJSONResponse({"message": "Job is not finished yet", "status": job.status.value},
+                                status_code=status.HTTP_202_ACCEPTED, headers={"Retry-After": "2"})
+
+    return FastJSONResponse({"message": "Job completed", "data": job.result}, status_code=status.HTTP_200_OK)
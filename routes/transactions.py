@@ -1,21 +1,37 @@
+from datetime import datetime, timezone
+from typing import Optional
 from unicodedata import category
+from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, status, responses
-from sqlalchemy import desc
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import desc, func
 from sqlalchemy.orm import Session
 
 from models import Transaction, Category, User
 from schema import TransactionCreateResponseSchema, TransactionCreateSchema, TransactionSchema, TransactionResponse, \
     TransactionUpdateSchema
 from utils import get_current_user, get_db
-from utils.transaction_enums import TransactionType
+from utils.etag import data_version
+from utils.idempotency import IdempotentRequest, idempotency_key, claim, store
+from utils.database import batch_session
+from utils.read_routing import get_read_db
+from utils.responses import FastJSONResponse
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+from utils.write_batcher import transaction_writer
 
 transaction_router = APIRouter(prefix="/transactions", tags=['Transactions'])
 
 
 @transaction_router.post("", response_model=TransactionCreateResponseSchema)
 def create_transaction(transaction: TransactionCreateSchema, session: Session = Depends(get_db),
-                       user_details: User = Depends(get_current_user)):
+                       user_details: User = Depends(get_current_user),
+                       idempotent: Optional[IdempotentRequest] = Depends(idempotency_key)):
+    # A retry with the same Idempotency-Key gets the stored response back without writing again
+    replay = claim(session, user_details.id, idempotent)
+    if replay:
+        return replay
+
     category = session.query(Category).filter(Category.user_id == user_details.id,
                                               Category.id == transaction.category_id).first()
     if not category:
@@ -28,6 +44,7 @@ def create_transaction(transaction: TransactionCreateSchema, session: Session =
         name=transaction.name,
         transaction_date=transaction.transaction_date,
         amount=transaction.amount,
+        currency=transaction.currency or user_details.base_currency,
         transaction_type=transaction.transaction_type,
         category_id=transaction.category_id,
         user_id=user_details.id,
@@ -36,13 +53,25 @@ def create_transaction(transaction: TransactionCreateSchema, session: Session =
         account=transaction.account
     )
 
+    if transaction_writer.running and not idempotent and batch_session.get() is None:
+        # Committed together with other requests' rows; give the connection back while waiting
+        session.close()
+        new_transaction = transaction_writer.submit(new_transaction)
+        return TransactionCreateResponseSchema(
+            message="Transaction has been created successfully",
+            transaction=TransactionSchema.model_validate(new_transaction)
+        )
+
     session.add(new_transaction)
-    session.commit()
+    session.flush()
 
-    return TransactionCreateResponseSchema(
+    response = TransactionCreateResponseSchema(
         message="Transaction has been created successfully",
         transaction=TransactionSchema.model_validate(new_transaction)
     )
+    store(session, user_details.id, idempotent, status.HTTP_200_OK, jsonable_encoder(response))
+    session.commit()
+    return response
 
 
 @transaction_router.delete("/{transaction_id}")
@@ -55,37 +84,91 @@ def delete_transaction(transaction_id, session: Session = Depends(get_db),
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Transaction not found"
         )
-    session.delete(exisiting_transaction)
+    # Soft delete: hidden from now on, purged after SOFT_DELETE_RETENTION_DAYS
+    exisiting_transaction.deleted_at = datetime.now(timezone.utc)
     session.commit()
 
     return responses.Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
+# Columns that can be used for sorting the transaction list (prefix with "-" for descending)
+TRANSACTION_SORT_FIELDS = {
+    "transaction_date": Transaction.transaction_date,
+    "amount": Transaction.amount,
+    "name": Transaction.name,
+    "created_at": Transaction.created_at,
+}
+
+# Columns that can be requested through the sparse fieldset parameter
+TRANSACTION_FIELDS = tuple(TransactionSchema.model_fields.keys())
+
+
 @transaction_router.get("", response_model=TransactionResponse)
-def list_transactions(page: int = 1, limit: int = 20, user_details=Depends(get_current_user),
-                      session: Session = Depends(get_db)):
-    offset = (page - 1) * limit
+def list_transactions(page: int = 1, limit: int = 20,
+                      start_date: Optional[datetime] = None, end_date: Optional[datetime] = None,
+                      transaction_type: Optional[TransactionType] = None,
+                      category_id: Optional[UUID] = None,
+                      payment_method: Optional[PaymentMethodEnum] = None,
+                      account: Optional[AccountEnum] = None,
+                      min_amount: Optional[float] = None, max_amount: Optional[float] = None,
+                      sort: str = "-transaction_date", fields: Optional[str] = None,
+                      user_details=Depends(get_current_user),
+                      session: Session = Depends(get_read_db), version: int = Depends(data_version)):
+    if page < 1 or limit < 1 or limit > 100:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail="page must be >= 1 and limit must be between 1 and 100")
+
+    # Validating the sort parameter against the allow-list
+    sort_column = TRANSACTION_SORT_FIELDS.get(sort.lstrip("-"))
+    if sort_column is None:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"sort must be one of {', '.join(TRANSACTION_SORT_FIELDS)}")
+    order_by = sort_column.desc() if sort.startswith("-") else sort_column.asc()
+
+    # Validating the sparse fieldset
+    selected_fields = None
+    if fields:
+        selected_fields = [field.strip() for field in fields.split(",") if field.strip()]
+        invalid_fields = [field for field in selected_fields if field not in TRANSACTION_FIELDS]
+        if invalid_fields:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                                detail=f"Unknown fields: {', '.join(invalid_fields)}")
+
+    filters = [Transaction.user_id == user_details.id]
+    if start_date is not None:
+        filters.append(Transaction.transaction_date >= start_date)
+    if end_date is not None:
+        filters.append(Transaction.transaction_date <= end_date)
+    if transaction_type is not None:
+        filters.append(Transaction.transaction_type == transaction_type)
+    if category_id is not None:
+        filters.append(Transaction.category_id == category_id)
+    if payment_method is not None:
+        filters.append(Transaction.payment_method == payment_method)
+    if account is not None:
+        filters.append(Transaction.account == account)
+    if min_amount is not None:
+        filters.append(Transaction.amount >= min_amount)
+    if max_amount is not None:
+        filters.append(Transaction.amount <= max_amount)
 
-    transactions = session.query(Transaction).filter(Transaction.user_id == user_details.id).offset(offset).limit(limit)
-    total_transaction = session.query(Transaction).filter(Transaction.user_id == user_details.id).count()
+    offset = (page - 1) * limit
+    total_transaction = session.query(func.count(Transaction.id)).filter(*filters).scalar()
     total_pages = (total_transaction + limit - 1) // limit
-    if not transactions:
-        return TransactionResponse(
-            page=page,
-            limit=limit,
-            total_transaction=total_transaction,
-            total_pages=total_pages,
-            message="No transactions found",
-            transactions=[]
-        )
-    return TransactionResponse(
-        page=page,
-        limit=limit,
-        total_transaction=total_transaction,
-        total_pages=total_pages,
-        message="transactions retrieved successfully",
-        transactions=[TransactionSchema.model_validate(transaction) for transaction in transactions]
-    )
+
+    # Columns are read straight into the response: the rows come from our own schema, so
+    # validating them again through TransactionSchema and the response model is skipped
+    selected_fields = selected_fields or TRANSACTION_FIELDS
+    rows = session.query(*[getattr(Transaction, field) for field in selected_fields]).filter(
+        *filters).order_by(order_by, Transaction.id).offset(offset).limit(limit).all()
+    return FastJSONResponse({
+        "page": page,
+        "limit": limit,
+        "total_transaction": total_transaction,
+        "total_pages": total_pages,
+        "message": "transactions retrieved successfully" if rows else "No transactions found",
+        "transactions": [dict(zip(selected_fields, row)) for row in rows]
+    }, status_code=status.HTTP_200_OK)
 
 
 @transaction_router.put("/{transaction_id}")
@@ -105,6 +188,8 @@ def delete_transaction(transaction_id, transactions: TransactionUpdateSchema, se
         exisiting_transaction.description = transactions.description
     if transactions.amount is not None:
         exisiting_transaction.amount = transactions.amount
+    if transactions.currency is not None:
+        exisiting_transaction.currency = transactions.currency
     if transactions.transaction_date is not None:
         exisiting_transaction.transaction_date = transactions.transaction_date
     if transactions.transaction_type is not None:
@@ -1,48 +1,70 @@
-from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
+from const import DEFAULT_CURRENCY
 from schema import UserSignupResponseSchema, UserSignupSchema, UserLoginSchema, RefreshTokenSchema
-from utils import get_db, Token, PasswordHasher, get_current_user
-from models import User, BlackListToken
+from utils import get_db, Token, PasswordHasher, get_current_user, TokenStore
+from models import User
+from utils.etag import check_not_modified, make_etag
+from utils.responses import FastJSONResponse
 
 user_router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
+def _find_user(session: Session, email: str):
+    return session.query(User).filter(User.email == email).first()
+
+
 @user_router.post("/signup/", response_model=UserSignupResponseSchema)
-def signup(user_detail: UserSignupSchema, session: Session = Depends(get_db)):
-    existing_user = session.query(User).filter(User.email == user_detail.email).first()
+async def signup(user_detail: UserSignupSchema, session: Session = Depends(get_db)):
+    # Async so the request holds no thread while the password is hashed; database calls go to the threadpool
+    existing_user = await run_in_threadpool(_find_user, session, user_detail.email)
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = PasswordHasher.hash_password(user_detail.password)
+    hashed_password = await PasswordHasher.hash_password(user_detail.password)
     new_user = User(
         email=user_detail.email,
         password=hashed_password,
         first_name=user_detail.first_name,
         last_name=user_detail.last_name,
+        base_currency=user_detail.base_currency or DEFAULT_CURRENCY,
     )
 
     session.add(new_user)
-    session.commit()
+    await run_in_threadpool(session.commit)
+
+    return FastJSONResponse(content={"message": "User created successfully"}, status_code=201)
 
-    return JSONResponse(content={"message": "User created successfully"}, status_code=201)
+
+def _start_session(session: Session, user: User, new_hash):
+    # Transparently upgrade hashes created with older parameters
+    if new_hash:
+        user.password = new_hash
+
+    access_token, refresh_token, refresh_token_payload = Token.generate_token(id=str(user.id), email=user.email)
+    TokenStore.issue(session, refresh_token_payload)
+    session.commit()
+    return access_token, refresh_token
 
 
 @user_router.post("/login/")
-def login(login_details: UserLoginSchema, session: Session = Depends(get_db)):
-    existing_user = session.query(User).filter(User.email == login_details.email).first()
+async def login(login_details: UserLoginSchema, session: Session = Depends(get_db)):
+    existing_user = await run_in_threadpool(_find_user, session, login_details.email)
     if not existing_user:
         raise HTTPException(status_code=400, detail="Email or password is incorrect")
 
-    password_status = PasswordHasher.verify_password(existing_user.password, login_details.password)
+    password_status, new_hash = await PasswordHasher.verify_and_update(login_details.password,
+                                                                       existing_user.password)
     if not password_status:
         raise HTTPException(status_code=400, detail="Email or password is incorrect")
-    access_token, refresh_token = Token.generate_token(id=str(existing_user.id), email=existing_user.email)
-    new_blacklist_token = BlackListToken(token=refresh_token)
-    session.add(new_blacklist_token)
-    session.commit()
-    return JSONResponse(content={"message": "Login successful", "data": {
+
+    access_token, refresh_token = await run_in_threadpool(_start_session, session, existing_user, new_hash)
+    return FastJSONResponse(content={"message": "Login successful", "data": {
         "access_token": access_token,
         "refresh_token": refresh_token
     }}, status_code=200)
@@ -50,30 +72,44 @@ def login(login_details: UserLoginSchema, session: Session = Depends(get_db)):
 
 @user_router.post('/refresh-token')
 def generate_token(token: RefreshTokenSchema, session: Session = Depends(get_db)):
-    exisiting_token = session.query(BlackListToken).filter(BlackListToken.token == token.refresh_token).first()
-    if not exisiting_token:
-        raise HTTPException(status_code=400, detail="Token is invalid")
+    # Signature and expiry are verified statelessly, the store only tracks the token id
     user_details = Token.verify_refresh_token(token.refresh_token)
-    existing_user = session.query(User).filter(
-        User.email == user_details.get("email") and User.id == user_details.get("id")).first()
-    if not existing_user:
+
+    # Refresh tokens are single use: consuming it revokes it in the same statement
+    if not TokenStore.consume(session, user_details.get("jti")):
+        raise HTTPException(status_code=400, detail="Token is invalid")
+
+    existing_user = session.get(User, UUID(user_details.get("id")))
+    if not existing_user or existing_user.email != user_details.get("email"):
         raise HTTPException(status_code=400, detail="Token is invalid")
-    access_token, refresh_token = Token.generate_token(id=str(existing_user.id), email=existing_user.email)
-    new_blacklist_token = BlackListToken(token=refresh_token)
-    session.add(new_blacklist_token)
+    access_token, refresh_token, refresh_token_payload = Token.generate_token(id=str(existing_user.id),
+                                                                              email=existing_user.email)
+    TokenStore.issue(session, refresh_token_payload)
     session.commit()
-    return JSONResponse(content={"message": "Login successful", "data": {
+    return FastJSONResponse(content={"message": "Login successful", "data": {
         "access_token": access_token,
         "refresh_token": refresh_token
     }}, status_code=200)
 
 
+@user_router.post('/logout')
+def logout(token: RefreshTokenSchema, session: Session = Depends(get_db)):
+    user_details = Token.verify_refresh_token(token.refresh_token)
+    TokenStore.revoke(session, user_details.get("jti"))
+    session.commit()
+    return Response(status_code=204)
+
+
 @user_router.get("/me")
-def get_user_details(user_details=Depends(get_current_user)):
-    return JSONResponse({"data": {
+def get_user_details(request: Request, user_details=Depends(get_current_user)):
+    data = {
         "email": user_details.email,
         "first_name": user_details.first_name,
         "last_name": user_details.last_name,
         "is_verified": user_details.is_verified,
+        "base_currency": user_details.base_currency,
         "created_at": user_details.created_at.isoformat()
-    }})
+    }
+    # The profile is not part of the financial data version, its ETag is derived from the fields
+    check_not_modified(request, make_etag(user_details.id, 0, *data.values()))
+    return FastJSONResponse({"data": data})
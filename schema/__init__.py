@@ -4,3 +4,6 @@ from .transactions import TransactionCreateResponseSchema, TransactionCreateSche
     TransactionResponse, TransactionUpdateSchema
 from .reports import YearWiseCategoryReportSchema
 from .agents import AgentQuerySchema
+from .jobs import JobCreateSchema, JobSchema
+from .budgets import BudgetCreateSchema, BudgetUpdateSchema, BudgetSchema, BudgetStatusSchema
+from .batch import BatchOperationSchema, BatchRequestSchema
@@ -1,7 +1,9 @@
 from pydantic import BaseModel, Field
 from typing import Optional
+from uuid import UUID
 
 
 class AgentQuerySchema(BaseModel):
     query: str
-  
\ No newline at end of file
+    # Continue an existing conversation; a new thread is started when omitted
+    thread_id: Optional[UUID] = None
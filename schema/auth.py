@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from typing import Optional
+
+from pydantic import BaseModel, Field
 from uuid import UUID
 
 
@@ -7,6 +9,8 @@ class UserSignupSchema(BaseModel):
     last_name: str
     email: str
     password: str
+    # Currency reports are shown in, DEFAULT_CURRENCY when not given
+    base_currency: Optional[str] = Field(default=None, pattern=r"^[A-Z]{3}$")
 
     class Config:
         orm_mode = True
@@ -0,0 +1,17 @@
+from typing import Any, Dict, List, Literal, Optional
+
+from pydantic import BaseModel, Field
+
+
+class BatchOperationSchema(BaseModel):
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"]
+    path: str = Field(pattern=r"^/")
+    query: Dict[str, Any] = {}
+    body: Optional[Any] = None
+    headers: Dict[str, str] = {}
+
+
+class BatchRequestSchema(BaseModel):
+    operations: List[BatchOperationSchema] = Field(min_length=1)
+    # All-or-nothing: stop at the first failed operation and roll everything back
+    atomic: bool = False
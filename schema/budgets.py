@@ -0,0 +1,39 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class BudgetCreateSchema(BaseModel):
+    category_id: UUID
+    amount: Decimal = Field(gt=0, max_digits=12, decimal_places=2)
+    alert_threshold: float = Field(default=0.8, gt=0, le=1)
+
+
+class BudgetUpdateSchema(BaseModel):
+    amount: Optional[Decimal] = Field(default=None, gt=0, max_digits=12, decimal_places=2)
+    alert_threshold: Optional[float] = Field(default=None, gt=0, le=1)
+
+
+class BudgetSchema(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: UUID
+    category_id: UUID
+    amount: Decimal
+    alert_threshold: float
+    created_at: datetime
+    updated_at: datetime
+
+
+class BudgetStatusSchema(BaseModel):
+    budget_id: UUID
+    category_id: UUID
+    category: str
+    amount: float
+    spent: float
+    remaining: float
+    percent_used: float
+    status: str  # "ok", "warning" or "over"
@@ -32,6 +32,6 @@ class CategoryResponse(BaseModel):
 
 
 class CategoryUpdateSchema(BaseModel):
-    name: Optional[bool] = None
+    name: Optional[str] = None
     is_active: Optional[bool] = None
     description: Optional[str] = None
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional, Dict, Any
+from uuid import UUID
+
+from pydantic import BaseModel
+
+from utils.job_enums import JobKind, JobStatus
+
+
+class JobCreateSchema(BaseModel):
+    kind: JobKind
+    params: Dict[str, Any]
+
+
+class JobSchema(BaseModel):
+    model_config = {"from_attributes": True}
+
+    id: UUID
+    kind: JobKind
+    status: JobStatus
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
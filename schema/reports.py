@@ -1,7 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 
 class YearWiseCategoryReportSchema(BaseModel):
     year: int
     exclude: Optional[List[str]] = None
+    # Defaults to the user's base currency
+    currency: Optional[str] = Field(default=None, pattern=r"^[A-Z]{3}$")
+    # Also read months moved to the transactions archive (slower)
+    include_archived: bool = False
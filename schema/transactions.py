@@ -2,7 +2,7 @@ from uuid import UUID
 from datetime import datetime
 from typing import Optional, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
 
@@ -11,6 +11,8 @@ class TransactionCreateSchema(BaseModel):
     name: str
     description: Optional[str] = None
     amount: float
+    # Defaults to the user's base currency
+    currency: Optional[str] = Field(default=None, pattern=r"^[A-Z]{3}$")
     transaction_date: datetime
     transaction_type: TransactionType
     payment_method: PaymentMethodEnum
@@ -25,6 +27,7 @@ class TransactionSchema(BaseModel):
     name: str
     description: Optional[str] = None
     amount: float
+    currency: str
     transaction_date: datetime
     transaction_type: TransactionType
     payment_method: PaymentMethodEnum
@@ -57,6 +60,7 @@ class TransactionUpdateSchema(BaseModel):
     name: str
     description: Optional[str] = None
     amount: float
+    currency: Optional[str] = Field(default=None, pattern=r"^[A-Z]{3}$")
     transaction_date: datetime
     transaction_type: TransactionType
     payment_method: PaymentMethodEnum
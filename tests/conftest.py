@@ -0,0 +1,8 @@
+import os
+
+# Settings are read from the environment at import time
+os.environ.setdefault("ACCESS_SECRET_KEY", "test-access-secret-key-with-enough-bytes")
+os.environ.setdefault("REFRESH_SECRET_KEY", "test-refresh-secret-key-with-enough-bytes")
+os.environ.setdefault("AGENT_MODEL", "fake")
+
+import utils  # noqa: E402,F401  (import order: utils before models)
@@ -0,0 +1,154 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+import utils.admission
+from utils.admission import AdmissionController, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(utils.admission, "time", clock)
+    return clock
+
+
+def controller(**overrides) -> AdmissionController:
+    settings = dict(max_concurrency=2, max_queue=2, queue_timeout_seconds=5, user_rate_per_minute=6000,
+                    user_burst=100)
+    settings.update(overrides)
+    return AdmissionController(**settings)
+
+
+def test_token_bucket_refills_at_its_rate(clock):
+    bucket = TokenBucket(capacity=2, rate_per_second=0.5)
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() == pytest.approx(2.0)
+
+    clock.now += 1
+    assert bucket.take() == pytest.approx(1.0)
+    clock.now += 1
+    assert bucket.take() == 0
+
+    # Refills never exceed the capacity
+    clock.now += 60
+    assert bucket.take() == 0
+    assert bucket.take() == 0
+    assert bucket.take() > 0
+
+
+def test_rate_limited_user_gets_429_with_retry_after(clock):
+    admission = controller(user_rate_per_minute=30, user_burst=1)
+
+    async def run():
+        async with admission.admit("user"):
+            pass
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit("user"):
+                pass
+        # Other users have their own bucket
+        async with admission.admit("someone-else"):
+            pass
+        return error.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 429
+    assert error.headers["Retry-After"] == "2"
+    assert admission.stats()["rejected_rate_limited"] == 1
+    assert admission.stats()["admitted"] == 2
+
+
+def test_semaphore_caps_in_flight_requests_and_reports_stats():
+    admission = controller(max_concurrency=2, max_queue=5)
+
+    async def run():
+        release = asyncio.Event()
+        entered = []
+
+        async def request(name):
+            async with admission.admit(name):
+                entered.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(request(f"user-{index}")) for index in range(3)]
+        await asyncio.sleep(0.01)
+        during = admission.stats()
+        assert len(entered) == 2
+
+        release.set()
+        await asyncio.gather(*tasks)
+        return during
+
+    during = asyncio.run(run())
+    assert during["in_flight"] == 2
+    assert during["queue_depth"] == 1
+
+    after = admission.stats()
+    assert after["in_flight"] == 0
+    assert after["queue_depth"] == 0
+    assert after["admitted"] == 3
+    assert after["max_wait_ms"] > 0
+
+
+def test_full_queue_is_rejected_with_503():
+    admission = controller(max_concurrency=1, max_queue=1)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def request(name):
+            async with admission.admit(name):
+                await release.wait()
+
+        holder = asyncio.create_task(request("holder"))
+        waiter = asyncio.create_task(request("waiter"))
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit("overflow"):
+                pass
+        release.set()
+        await asyncio.gather(holder, waiter)
+        return error.value
+
+    error = asyncio.run(run())
+    assert error.status_code == 503
+    assert error.headers["Retry-After"] == "1"
+    stats = admission.stats()
+    assert stats["rejected_queue_full"] == 1
+    assert stats["admitted"] == 2
+
+
+def test_queue_timeout_is_rejected_with_503():
+    admission = controller(max_concurrency=1, max_queue=1, queue_timeout_seconds=0.05)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def hold():
+            async with admission.admit("holder"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0.01)
+        with pytest.raises(HTTPException) as error:
+            async with admission.admit("waiter"):
+                pass
+        waiting_after_timeout = admission.waiting
+        release.set()
+        await holder
+        return error.value, waiting_after_timeout
+
+    error, waiting = asyncio.run(run())
+    assert error.status_code == 503
+    assert waiting == 0
+    assert admission.stats()["rejected_timeout"] == 1
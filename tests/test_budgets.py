@@ -0,0 +1,132 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Budget, Category, MonthlyCategoryTotal, Transaction, User
+from utils import Base
+from utils.budgets import budget_status
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+
+JANUARY, FEBRUARY = date(2026, 1, 1), date(2026, 2, 1)
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+@pytest.fixture
+def user(session):
+    user = User(first_name="Asha", email="asha@example.com", password="hash")
+    session.add(user)
+    session.commit()
+    return user
+
+
+@pytest.fixture
+def food(session, user):
+    return add_category(session, user, "Food")
+
+
+def add_category(session, user, name):
+    category = Category(name=name, user_id=user.id)
+    session.add(category)
+    session.commit()
+    return category
+
+
+def spend(session, user, category, amount, day=date(2026, 1, 5)):
+    transaction = Transaction(user_id=user.id, category_id=category.id, name="Spend", amount=Decimal(amount),
+                              transaction_date=datetime(day.year, day.month, day.day),
+                              transaction_type=TransactionType.EXPENSE, payment_method=list(PaymentMethodEnum)[0],
+                              account=list(AccountEnum)[0])
+    session.add(transaction)
+    session.commit()
+    return transaction
+
+
+def counters(session):
+    return {(row.category_id, row.month): (row.total_amount, row.transaction_count)
+            for row in session.query(MonthlyCategoryTotal)}
+
+
+def test_insert_and_amount_update(session, user, food):
+    transaction = spend(session, user, food, "40")
+    spend(session, user, food, "10")
+    assert counters(session) == {(food.id, JANUARY): (Decimal("50.00"), 2)}
+
+    transaction.amount = Decimal("65")
+    session.commit()
+    assert counters(session) == {(food.id, JANUARY): (Decimal("75.00"), 2)}
+
+
+def test_category_move(session, user, food):
+    rent = add_category(session, user, "Rent")
+    transaction = spend(session, user, food, "40")
+
+    transaction.category_id = rent.id
+    session.commit()
+    # The emptied counter row is removed
+    assert counters(session) == {(rent.id, JANUARY): (Decimal("40.00"), 1)}
+
+
+def test_month_move(session, user, food):
+    transaction = spend(session, user, food, "40")
+    spend(session, user, food, "5")
+
+    transaction.transaction_date = datetime(2026, 2, 10)
+    session.commit()
+    assert counters(session) == {(food.id, JANUARY): (Decimal("5.00"), 1),
+                                 (food.id, FEBRUARY): (Decimal("40.00"), 1)}
+
+
+def test_soft_and_hard_delete(session, user, food):
+    soft = spend(session, user, food, "40")
+    hard = spend(session, user, food, "10")
+    spend(session, user, food, "1")
+
+    soft.deleted_at = datetime.now(timezone.utc)
+    session.commit()
+    assert counters(session) == {(food.id, JANUARY): (Decimal("11.00"), 2)}
+
+    session.delete(hard)
+    session.commit()
+    assert counters(session) == {(food.id, JANUARY): (Decimal("1.00"), 1)}
+
+
+@pytest.mark.parametrize("spent, expected", [("0", "ok"), ("79.99", "ok"), ("80", "warning"), ("100", "warning"),
+                                             ("100.01", "over")])
+def test_budget_status_thresholds(session, user, food, spent, expected):
+    session.add(Budget(user_id=user.id, category_id=food.id, amount=Decimal("100"), alert_threshold=0.8))
+    session.commit()
+    if Decimal(spent):
+        spend(session, user, food, spent)
+
+    [status] = budget_status(session, user.id, JANUARY, user.base_currency)
+    assert status["status"] == expected
+    assert status["spent"] == float(spent)
+    assert status["remaining"] == round(100 - float(spent), 2)
+
+
+def test_budget_status_follows_updates(session, user, food):
+    session.add(Budget(user_id=user.id, category_id=food.id, amount=Decimal("100")))
+    session.commit()
+    transaction = spend(session, user, food, "90")
+    assert budget_status(session, user.id, JANUARY)[0]["status"] == "warning"
+
+    transaction.transaction_date = datetime(2026, 2, 1)
+    session.commit()
+    assert budget_status(session, user.id, JANUARY)[0]["spent"] == 0
+    assert budget_status(session, user.id, FEBRUARY)[0]["status"] == "warning"
+
+    transaction.amount = Decimal("120")
+    session.commit()
+    assert budget_status(session, user.id, FEBRUARY)[0]["status"] == "over"
@@ -0,0 +1,86 @@
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+from models import Category
+from routes.batch import _close_batch_session
+from utils import Base
+from utils.category_cache import CategoryNameCache, category_names
+from utils.data_version import known_version
+from utils.database import batch_session
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+
+    # pysqlite only begins transactions lazily, so releasing the batch's first savepoint
+    # would commit; let SQLAlchemy emit BEGIN itself
+    @event.listens_for(engine, "connect")
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(connection):
+        connection.exec_driver_sql("BEGIN")
+
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+def open_batch(engine):
+    """Same setup as POST /batch: endpoint commits only release savepoints of one outer transaction."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    return connection, transaction, Session(bind=connection, join_transaction_mode="create_savepoint")
+
+
+def test_batch_lookups_bypass_the_cache(engine):
+    cache = CategoryNameCache(max_users=10)
+    user_id = uuid4()
+    connection, transaction, session = open_batch(engine)
+    token = batch_session.set(session)
+    try:
+        session.add(Category(name="Uncommitted", user_id=user_id))
+        session.commit()
+        assert cache.lookup(session, user_id, "uncommitted") is not None
+    finally:
+        batch_session.reset(token)
+    session.close()
+    transaction.rollback()
+    connection.close()
+
+    # The batch rolled back and left nothing behind in the cache
+    with sessionmaker(bind=engine)() as session:
+        assert cache.lookup(session, user_id, "uncommitted") is None
+
+
+def test_savepoint_commits_do_not_note_versions(engine):
+    user_id = uuid4()
+    connection, transaction, session = open_batch(engine)
+    session.info["data_versions"] = {user_id: 7}
+    session.commit()
+    session.rollback()
+    assert known_version(user_id) == 0
+
+    _close_batch_session(connection, transaction, session, user_id, True)
+    assert known_version(user_id) == 7
+
+
+def test_rolled_back_batch_forgets_versions_and_invalidates_names(engine):
+    user_id = uuid4()
+    with sessionmaker(bind=engine)() as session:
+        category_names.names(session, user_id)
+    assert str(user_id) in category_names._users
+
+    connection, transaction, session = open_batch(engine)
+    session.info["data_versions"] = {user_id: 3}
+    session.commit()
+    _close_batch_session(connection, transaction, session, user_id, False)
+
+    assert known_version(user_id) == 0
+    assert str(user_id) not in category_names._users
@@ -0,0 +1,68 @@
+from datetime import date
+from decimal import Decimal
+from uuid import uuid4
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from utils import Base
+from utils.etag import converted_data_version, fx_data_state
+from utils.fx import store_rates
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    with sessionmaker(bind=engine)() as session:
+        yield session
+    engine.dispose()
+
+
+class FakeUser:
+    def __init__(self):
+        self.id = uuid4()
+
+
+def get(path, etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": b"month=2026-01",
+                    "headers": headers})
+
+
+def rates(rate):
+    return [{"currency": "USD", "rate_date": date(2026, 1, 2), "rate": Decimal(rate)}]
+
+
+def test_rate_load_changes_the_validators(session):
+    user = FakeUser()
+    _, last_modified, before = fx_data_state(session, user.id)
+    assert (last_modified, before) == (None, "fx-none")
+
+    store_rates(session, rates("1.10"))
+    _, first_load, after_first = fx_data_state(session, user.id)
+    store_rates(session, rates("1.20"))
+    _, second_load, after_second = fx_data_state(session, user.id)
+
+    assert len({before, after_first, after_second}) == 3
+    assert first_load is not None and second_load >= first_load
+
+
+def test_cached_converted_response_is_revalidated_after_a_rate_load(session):
+    user = FakeUser()
+    store_rates(session, rates("1.10"))
+    request = get("/budgets/status")
+    converted_data_version(request, user, session)
+    etag = request.state.etag
+
+    with pytest.raises(HTTPException) as not_modified:
+        converted_data_version(get("/budgets/status", etag), user, session)
+    assert not_modified.value.status_code == 304
+
+    store_rates(session, rates("1.20"))
+    # Same user data version, but the amounts were converted with the old rates
+    assert converted_data_version(get("/budgets/status", etag), user, session) == 0
@@ -0,0 +1,143 @@
+from datetime import datetime, timezone
+from uuid import uuid4
+
+import orjson
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import StaticPool
+
+from models import IdempotencyKey
+from utils import Base
+from utils.idempotency import IdempotentRequest, claim, store, REPLAYED_HEADER
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def process(session_factory, user_id, idempotent, body=None):
+    """What an endpoint does: claim, write, store the response, commit."""
+    with session_factory() as session:
+        replay = claim(session, user_id, idempotent)
+        if replay:
+            return replay
+        store(session, user_id, idempotent, 201, body or {"id": "first"})
+        session.commit()
+
+
+def test_without_a_key_nothing_is_claimed(session_factory):
+    with session_factory() as session:
+        assert claim(session, uuid4(), None) is None
+        store(session, uuid4(), None, 201, {})
+        assert session.query(IdempotencyKey).count() == 0
+
+
+def test_retry_replays_the_stored_response(session_factory):
+    user_id = uuid4()
+    idempotent = IdempotentRequest(key="retry-me", request_hash="hash")
+
+    assert process(session_factory, user_id, idempotent) is None
+    replay = process(session_factory, user_id, idempotent, body={"id": "second"})
+
+    assert replay.status_code == 201
+    assert replay.headers[REPLAYED_HEADER] == "true"
+    assert orjson.loads(replay.body) == {"id": "first"}
+
+
+def test_keys_are_scoped_per_user(session_factory):
+    idempotent = IdempotentRequest(key="shared", request_hash="hash")
+
+    assert process(session_factory, uuid4(), idempotent) is None
+    assert process(session_factory, uuid4(), idempotent) is None
+
+
+def test_key_reused_for_a_different_request_is_rejected(session_factory):
+    user_id = uuid4()
+    process(session_factory, user_id, IdempotentRequest(key="reused", request_hash="hash"))
+
+    with pytest.raises(HTTPException) as error:
+        process(session_factory, user_id, IdempotentRequest(key="reused", request_hash="other-hash"))
+    assert error.value.status_code == 422
+
+
+def test_duplicate_of_an_unfinished_request_gets_409(session_factory):
+    user_id = uuid4()
+    idempotent = IdempotentRequest(key="in-flight", request_hash="hash")
+    with session_factory() as first:
+        claim(first, user_id, idempotent)
+        first.commit()  # Claimed, but no response stored yet
+
+    with pytest.raises(HTTPException) as error:
+        process(session_factory, user_id, idempotent)
+    assert error.value.status_code == 409
+
+
+def test_conflicting_row_that_vanishes_is_claimed_again(session_factory, monkeypatch):
+    user_id = uuid4()
+    idempotent = IdempotentRequest(key="pruned", request_hash="hash")
+    with session_factory() as other:
+        claim(other, user_id, idempotent)
+        other.commit()
+
+    original_get = Session.get
+
+    def get_after_prune(session, *args, **kwargs):
+        # The row is pruned between the conflicting insert and the lookup
+        session.execute(delete(IdempotencyKey).where(IdempotencyKey.key == idempotent.key))
+        monkeypatch.setattr(Session, "get", original_get)
+        return None
+
+    monkeypatch.setattr(Session, "get", get_after_prune)
+    with session_factory() as session:
+        assert claim(session, user_id, idempotent) is None
+        store(session, user_id, idempotent, 201, {"id": "retry"})
+        session.commit()
+
+    replay = process(session_factory, user_id, idempotent)
+    assert orjson.loads(replay.body) == {"id": "retry"}
+
+
+def test_row_that_keeps_conflicting_gives_409_instead_of_500(session_factory, monkeypatch):
+    user_id = uuid4()
+    idempotent = IdempotentRequest(key="racing", request_hash="hash")
+    with session_factory() as other:
+        claim(other, user_id, idempotent)
+        other.commit()
+
+    monkeypatch.setattr(Session, "get", lambda session, *args, **kwargs: None)
+    with session_factory() as session, pytest.raises(HTTPException) as error:
+        claim(session, user_id, idempotent)
+    assert error.value.status_code == 409
+
+
+def test_batch_claim_survives_a_failed_first_operation(session_factory):
+    # Same steps as POST /batch: endpoints commit savepoints inside one outer transaction
+    user_id = uuid4()
+    idempotent = IdempotentRequest(key="batch", request_hash="hash")
+    connection = session_factory.kw["bind"].connect()
+    outer = connection.begin()
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+
+    claim(session, user_id, idempotent)
+    session.commit()
+    # Operation 0 fails and its savepoint is rolled back
+    session.add(IdempotencyKey(user_id=user_id, key="written-by-the-operation", request_hash="other",
+                               created_at=datetime.now(timezone.utc)))
+    session.flush()
+    session.rollback()
+
+    store(session, user_id, idempotent, 200, {"committed": True})
+    session.commit()
+    session.close()
+    outer.commit()
+    connection.close()
+
+    with session_factory() as check:
+        assert [row.key for row in check.query(IdempotencyKey)] == ["batch"]
+        assert check.get(IdempotencyKey, (user_id, "batch")).response == {"committed": True}
@@ -0,0 +1,112 @@
+import asyncio
+import time
+
+import pytest
+from langchain.agents.middleware import ModelRequest
+from langchain_core.messages import HumanMessage
+
+from agents.fake import FakeChatModel
+from agents.routing import ModelRoutingMiddleware
+
+
+class FailingChatModel(FakeChatModel):
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise RuntimeError(f"{self.name} is down")
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        raise RuntimeError(f"{self.name} is down")
+
+
+def model(name: str, **settings) -> FakeChatModel:
+    return FakeChatModel(name=name, responses=[name], **settings)
+
+
+def request_for(primary) -> ModelRequest:
+    return ModelRequest(model=primary, messages=[HumanMessage(content="How much did I spend?")])
+
+
+class Handler:
+    """Calls the model of each attempt and records the order in which models were tried."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, request: ModelRequest):
+        self.calls.append(request.model.name)
+        return request.model.invoke(request.messages)
+
+    async def acall(self, request: ModelRequest):
+        self.calls.append(request.model.name)
+        return await request.model.ainvoke(request.messages)
+
+
+def test_primary_answer_is_used_without_touching_fallbacks():
+    middleware = ModelRoutingMiddleware(fallbacks=[model("fallback")], hedge_after_seconds=1)
+    handler = Handler()
+
+    assert middleware.wrap_model_call(request_for(model("primary")), handler).content == "primary"
+    assert handler.calls == ["primary"]
+
+
+def test_failures_fall_back_in_order():
+    middleware = ModelRoutingMiddleware(
+        fallbacks=[FailingChatModel(name="first-fallback"), model("second-fallback")], hedge_after_seconds=1)
+    handler = Handler()
+
+    response = middleware.wrap_model_call(request_for(FailingChatModel(name="primary")), handler)
+
+    assert response.content == "second-fallback"
+    assert handler.calls == ["primary", "first-fallback", "second-fallback"]
+
+
+def test_last_error_is_raised_when_every_model_fails():
+    middleware = ModelRoutingMiddleware(fallbacks=[FailingChatModel(name="fallback")], hedge_after_seconds=1)
+
+    with pytest.raises(RuntimeError, match="fallback is down"):
+        middleware.wrap_model_call(request_for(FailingChatModel(name="primary")), Handler())
+
+
+def test_slow_call_is_hedged_on_the_next_model():
+    middleware = ModelRoutingMiddleware(fallbacks=[model("fallback")], hedge_after_seconds=0.05)
+    handler = Handler()
+
+    started = time.perf_counter()
+    response = middleware.wrap_model_call(request_for(model("primary", latency_seconds=0.5)), handler)
+
+    assert response.content == "fallback"
+    assert time.perf_counter() - started < 0.4
+    assert handler.calls == ["primary", "fallback"]
+
+
+def test_timed_out_attempt_ends_and_frees_its_thread():
+    middleware = ModelRoutingMiddleware(timeout_seconds=0.2, hedge_after_seconds=0.05, max_workers=1)
+
+    with pytest.raises(TimeoutError):
+        middleware.wrap_model_call(request_for(model("primary", latency_seconds=30, timeout=0.2)), Handler())
+
+    # The client timeout ended the attempt, so the pool has nothing left running
+    started = time.perf_counter()
+    middleware._executor.shutdown(wait=True)
+    assert time.perf_counter() - started < 1
+
+
+def test_async_slow_call_is_hedged_and_falls_back():
+    middleware = ModelRoutingMiddleware(fallbacks=[FailingChatModel(name="broken"), model("fallback")],
+                                        hedge_after_seconds=0.05)
+    handler = Handler()
+
+    started = time.perf_counter()
+    response = asyncio.run(middleware.awrap_model_call(request_for(model("primary", latency_seconds=0.5)),
+                                                       handler.acall))
+
+    assert response.content == "fallback"
+    assert time.perf_counter() - started < 0.4
+    assert handler.calls == ["primary", "broken", "fallback"]
+
+
+def test_async_attempt_times_out():
+    middleware = ModelRoutingMiddleware(timeout_seconds=0.1, hedge_after_seconds=0.05)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(middleware.awrap_model_call(request_for(model("primary", latency_seconds=30)), Handler().acall))
@@ -0,0 +1,114 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import utils.read_routing as read_routing
+from models import UserDataVersion
+from utils import Base
+from utils.data_version import note_version
+from utils.database import batch_session
+
+
+def sqlite_engine(create_tables: bool = True):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    if create_tables:
+        Base.metadata.create_all(engine)
+    return engine
+
+
+def route_to(monkeypatch, primary, replica):
+    monkeypatch.setattr(read_routing, "engine", primary)
+    monkeypatch.setattr(read_routing, "replica_engine", replica)
+    monkeypatch.setattr(read_routing, "SessionLocal", sessionmaker(bind=primary))
+    monkeypatch.setattr(read_routing, "ReadSessionLocal", sessionmaker(bind=replica))
+
+
+@pytest.fixture
+def engines(monkeypatch):
+    """A primary and a replica as two separate databases."""
+    primary, replica = sqlite_engine(), sqlite_engine()
+    route_to(monkeypatch, primary, replica)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def replicate_version(replica, user_id, version: int):
+    with sessionmaker(bind=replica)() as session:
+        session.merge(UserDataVersion(user_id=user_id, version=version))
+        session.commit()
+
+
+def test_single_engine_reads_from_the_primary(monkeypatch):
+    primary = sqlite_engine()
+    route_to(monkeypatch, primary, primary)
+
+    with read_routing.read_session_for(uuid4()) as session:
+        assert session.get_bind() is primary
+
+
+def test_user_without_known_writes_reads_from_the_replica(engines):
+    primary, replica = engines
+
+    with read_routing.read_session_for(uuid4()) as session:
+        assert session.get_bind() is replica
+
+
+def test_replica_that_caught_up_serves_the_read(engines):
+    primary, replica = engines
+    user_id = uuid4()
+    note_version(user_id, 2)
+    replicate_version(replica, user_id, 2)
+
+    with read_routing.read_session_for(user_id) as session:
+        assert session.get_bind() is replica
+
+
+def test_lagging_replica_falls_back_to_the_primary(engines):
+    primary, replica = engines
+    user_id = uuid4()
+    note_version(user_id, 3)
+    replicate_version(replica, user_id, 2)
+
+    with read_routing.read_session_for(user_id) as session:
+        assert session.get_bind() is primary
+
+
+def test_replica_error_falls_back_to_the_primary(monkeypatch):
+    # The replica has no tables, so the version lookup fails
+    primary, replica = sqlite_engine(), sqlite_engine(create_tables=False)
+    route_to(monkeypatch, primary, replica)
+    user_id = uuid4()
+    note_version(user_id, 1)
+
+    with read_routing.read_session_for(user_id) as session:
+        assert session.get_bind() is primary
+
+
+def test_get_read_db_reuses_the_batch_session(engines):
+    shared = sessionmaker(bind=engines[0])()
+    token = batch_session.set(shared)
+    try:
+        dependency = read_routing.get_read_db(user=SimpleNamespace(id=uuid4()))
+        assert next(dependency) is shared
+        with pytest.raises(StopIteration):
+            next(dependency)
+    finally:
+        batch_session.reset(token)
+        shared.close()
+
+
+def test_get_read_db_routes_and_closes_its_session(engines):
+    primary, replica = engines
+    dependency = read_routing.get_read_db(user=SimpleNamespace(id=uuid4()))
+    session = next(dependency)
+    assert session.get_bind() is replica
+    session.connection()
+
+    with pytest.raises(StopIteration):
+        next(dependency)
+    assert not session.in_transaction()
@@ -0,0 +1,109 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Category, MonthlyCategoryTotal, Transaction, User
+from utils import Base
+from utils.data_version import get_data_state
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+import utils.soft_delete as soft_delete
+
+
+@pytest.fixture
+def session_factory(monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(soft_delete, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def session(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+def new_transaction(user, name, category=None, amount="3.50"):
+    # By id, as the routes do: the rollup listener runs before the flush fills in relationships
+    return Transaction(user_id=user.id, category_id=category.id if category else None, name=name, transaction_date=datetime(2026, 1, 5), amount=Decimal(amount),
+                       transaction_type=TransactionType.EXPENSE, payment_method=list(PaymentMethodEnum)[0],
+                       account=list(AccountEnum)[0])
+
+
+@pytest.fixture
+def rows(session):
+    user = User(first_name="Asha", email="asha@example.com", password="hash")
+    groceries, rent = Category(name="Groceries", user=user), Category(name="Rent", user=user)
+    session.add_all([groceries, rent])
+    session.commit()
+    session.add_all([new_transaction(user, "Milk", groceries), new_transaction(user, "Bread", groceries),
+                     new_transaction(user, "March rent", rent, "900"), new_transaction(user, "Cash")])
+    session.commit()
+    return user, groceries, rent
+
+
+def names(query):
+    return sorted(transaction.name for transaction in query)
+
+
+def rollup(session, category):
+    return session.query(MonthlyCategoryTotal.total_amount, MonthlyCategoryTotal.transaction_count).filter(
+        MonthlyCategoryTotal.category_id == category.id).all()
+
+
+def test_deleted_transaction_is_hidden_and_leaves_the_rollup(session, rows):
+    user, groceries, _ = rows
+    version, _ = get_data_state(session, user.id)
+    assert rollup(session, groceries) == [(Decimal("7.00"), 2)]
+
+    milk = session.query(Transaction).filter_by(name="Milk").one()
+    milk.deleted_at = datetime.now(timezone.utc)
+    session.commit()
+
+    assert names(session.query(Transaction)) == ["Bread", "Cash", "March rent"]
+    assert rollup(session, groceries) == [(Decimal("3.50"), 1)]
+    assert get_data_state(session, user.id)[0] == version + 1
+
+
+def test_transactions_of_a_deleted_category_are_hidden(session, rows):
+    user, groceries, rent = rows
+    soft_delete.soft_delete_category(session, groceries)
+    session.commit()
+
+    # Neither query touches categories, and uncategorized rows stay visible
+    assert names(session.query(Transaction)) == ["Cash", "March rent"]
+    assert session.query(Transaction.id).count() == 2
+    assert [category.name for category in session.query(Category)] == ["Rent"]
+    joined = session.query(Category.name, Transaction.name).join(Transaction, Transaction.category_id == Category.id)
+    assert joined.all() == [("Rent", "March rent")]
+    assert rollup(session, groceries) == []
+    assert rollup(session, rent) == [(Decimal("900.00"), 1)]
+
+
+def test_include_deleted_shows_everything(session, rows):
+    _, groceries, _ = rows
+    soft_delete.soft_delete_category(session, groceries)
+    session.commit()
+
+    everything = session.query(Transaction).execution_options(include_deleted=True)
+    assert names(everything) == ["Bread", "Cash", "March rent", "Milk"]
+
+
+def test_purge_removes_a_deleted_category_in_chunks(session, rows, monkeypatch):
+    _, groceries, _ = rows
+    monkeypatch.setattr(soft_delete, "PURGE_BATCH_SIZE", 1)
+    assert soft_delete.purge_category(groceries.id) == 0  # Not deleted
+
+    soft_delete.soft_delete_category(session, groceries)
+    session.commit()
+    assert soft_delete.purge_category(groceries.id) == 2
+
+    everything = session.query(Transaction).execution_options(include_deleted=True)
+    assert names(everything) == ["Cash", "March rent"]
+    assert session.query(Category).execution_options(include_deleted=True).count() == 1
@@ -0,0 +1,42 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from agents.Kashflo import _sub_agent_tool
+
+
+class FakeAgent:
+    def __init__(self, result):
+        self.result = result
+
+    def invoke(self, state, config=None):
+        return self.result
+
+    async def ainvoke(self, state, config=None):
+        return self.result
+
+
+def ask(result, asynchronous: bool = False) -> str:
+    tool = _sub_agent_tool("advisor", "Ask the advisor.", lambda: FakeAgent(result), "Advisor failed")
+    if asynchronous:
+        return asyncio.run(tool.ainvoke({"request": "How much did I spend?"}))
+    return tool.invoke({"request": "How much did I spend?"})
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_returns_the_last_message(asynchronous):
+    result = {"messages": [HumanMessage(content="How much did I spend?"), AIMessage(content="About 420")]}
+    assert ask(result, asynchronous) == "About 420"
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_empty_answer_does_not_dump_the_sub_agent_state(asynchronous):
+    result = {"messages": [HumanMessage(content="How much did I spend?"),
+                           ToolMessage(content="date,amount\n2026-01-05,420", tool_call_id="1"),
+                           AIMessage(content="")]}
+    assert ask(result, asynchronous) == ""
+
+
+def test_result_without_messages_falls_back_to_its_string_form():
+    assert ask({"output": "About 420"}) == str({"output": "About 420"})
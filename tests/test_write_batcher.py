@@ -0,0 +1,96 @@
+from concurrent.futures import Future
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models import Category, MonthlyCategoryTotal, Transaction, User
+from utils import Base
+from utils.data_version import get_data_state
+from utils.transaction_enums import TransactionType, PaymentMethodEnum, AccountEnum
+from utils.write_batcher import TransactionWriteBatcher
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+@pytest.fixture
+def user(session_factory):
+    with session_factory(expire_on_commit=False) as session:
+        user = User(first_name="Asha", email="asha@example.com", password="hash")
+        category = Category(name="Food", user=user)
+        session.add(category)
+        session.commit()
+    return user, category
+
+
+def new_transaction(user, name="Coffee"):
+    user, category = user
+    return Transaction(user_id=user.id, category_id=category.id, name=name, transaction_date=datetime(2026, 1, 5), amount=Decimal("3.50"),
+                       transaction_type=TransactionType.EXPENSE, payment_method=list(PaymentMethodEnum)[0],
+                       account=list(AccountEnum)[0])
+
+
+def test_batch_commits_every_row(session_factory, user):
+    batcher = TransactionWriteBatcher(window_ms=50, max_rows=10, session_factory=session_factory)
+    items = [(new_transaction(user, f"row {i}"), Future()) for i in range(3)]
+    batcher._write(batcher._start(items))
+
+    assert [future.result(timeout=0) for _, future in items] == [transaction for transaction, _ in items]
+    with session_factory() as session:
+        assert session.query(Transaction).count() == 3
+
+
+def test_failing_row_is_retried_alone(session_factory, user):
+    batcher = TransactionWriteBatcher(window_ms=50, max_rows=10, session_factory=session_factory)
+    bad = new_transaction(user, name=None)
+    items = [(new_transaction(user, "first"), Future()), (bad, Future()), (new_transaction(user, "last"), Future())]
+    batcher._write(batcher._start(items))
+
+    assert items[0][1].result(timeout=0).name == "first"
+    assert items[2][1].result(timeout=0).name == "last"
+    with pytest.raises(Exception):
+        items[1][1].result(timeout=0)
+    with session_factory() as session:
+        assert sorted(name for (name,) in session.query(Transaction.name)) == ["first", "last"]
+        # The failed batch's rollup and version updates were rolled back with it
+        assert session.query(MonthlyCategoryTotal.total_amount, MonthlyCategoryTotal.transaction_count).all() == [
+            (Decimal("7.00"), 2)]
+        assert get_data_state(session, user[0].id)[0] == 2  # One bump per committed row
+
+
+def test_submit_through_the_writer_thread(session_factory, user):
+    batcher = TransactionWriteBatcher(window_ms=5, max_rows=10, session_factory=session_factory)
+    batcher.start()
+    try:
+        transaction = batcher.submit(new_transaction(user))
+    finally:
+        batcher.stop(timeout_seconds=5)
+
+    with session_factory() as session:
+        assert session.get(Transaction, transaction.id).name == "Coffee"
+
+
+def test_submit_times_out_with_503_and_withdraws_the_row(session_factory, user):
+    batcher = TransactionWriteBatcher(window_ms=5, max_rows=10, session_factory=session_factory,
+                                      submit_timeout_seconds=0.05)
+    # Writer not running, as after stop()
+    with pytest.raises(HTTPException) as raised:
+        batcher.submit(new_transaction(user))
+    assert raised.value.status_code == 503
+    assert raised.value.headers["Retry-After"] == "1"
+
+    # A writer started later skips it instead of writing a row the client was told failed
+    batcher.start()
+    batcher.stop(timeout_seconds=5)
+    with session_factory() as session:
+        assert session.query(Transaction).count() == 0
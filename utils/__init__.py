@@ -2,3 +2,4 @@ from .database import Base, get_db, engine, SessionLocal
 from .password_hash import PasswordHasher
 from .token import Token
 from .dependencies import get_current_user
+from .token_store import TokenStore
@@ -0,0 +1,143 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from threading import Lock
+from typing import Dict
+
+from fastapi import HTTPException, status
+
+from const import AGENT_MAX_CONCURRENCY, AGENT_MAX_QUEUE, AGENT_QUEUE_TIMEOUT_SECONDS, AGENT_USER_RATE_PER_MINUTE, \
+    AGENT_USER_BURST
+
+
+class TokenBucket:
+    """Classic token bucket: ``capacity`` tokens, refilled at ``rate_per_second``."""
+
+    def __init__(self, capacity: float, rate_per_second: float):
+        self.capacity = capacity
+        self.rate_per_second = rate_per_second
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def take(self) -> float:
+        """Take one token. Returns 0 on success, otherwise the seconds until a token is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate_per_second)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        if self.rate_per_second <= 0:
+            return math.inf
+        return (1 - self.tokens) / self.rate_per_second
+
+
+class AdmissionController:
+    """
+    Admission control for expensive routes.
+
+    Requests first pass a per-user token bucket (429 when empty), then wait for one of
+    ``max_concurrency`` slots. At most ``max_queue`` requests may wait and each waits at most
+    ``queue_timeout_seconds``; beyond that the request is rejected with 503. Limits are per
+    process, so the effective cluster limit is multiplied by the number of API workers.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout_seconds: float,
+                 user_rate_per_minute: float, user_burst: int, max_tracked_users: int = 10000):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout_seconds = queue_timeout_seconds
+        self.user_rate_per_second = user_rate_per_minute / 60
+        self.user_burst = user_burst
+        self.max_tracked_users = max_tracked_users
+
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._buckets: Dict[str, TokenBucket] = OrderedDict()
+        self._lock = Lock()
+
+        self.waiting = 0
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected_rate_limited = 0
+        self.rejected_queue_full = 0
+        self.rejected_timeout = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def _check_rate_limit(self, user_id: str):
+        with self._lock:
+            bucket = self._buckets.get(user_id)
+            if bucket is None:
+                bucket = TokenBucket(self.user_burst, self.user_rate_per_second)
+                self._buckets[user_id] = bucket
+                if len(self._buckets) > self.max_tracked_users:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(user_id)
+            retry_after = bucket.take()
+
+        if retry_after:
+            self.rejected_rate_limited += 1
+            raise HTTPException(status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                                detail="Too many requests, please slow down",
+                                headers={"Retry-After": str(max(1, math.ceil(min(retry_after, 3600))))})
+
+    @asynccontextmanager
+    async def admit(self, user_id: str):
+        """Hold a concurrency slot for the duration of the block; yields the time spent queued in seconds."""
+        self._check_rate_limit(user_id)
+
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected_queue_full += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Assistant is busy, please retry shortly",
+                                headers={"Retry-After": "1"})
+
+        self.waiting += 1
+        started_at = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self.rejected_timeout += 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                                detail="Assistant is busy, please retry shortly",
+                                headers={"Retry-After": "1"})
+        finally:
+            self.waiting -= 1
+
+        wait_seconds = time.monotonic() - started_at
+        self.admitted += 1
+        self.total_wait_seconds += wait_seconds
+        self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+        self.in_flight += 1
+        try:
+            yield wait_seconds
+        finally:
+            self.in_flight -= 1
+            self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "queue_depth": self.waiting,
+            "admitted": self.admitted,
+            "rejected_rate_limited": self.rejected_rate_limited,
+            "rejected_queue_full": self.rejected_queue_full,
+            "rejected_timeout": self.rejected_timeout,
+            "avg_wait_ms": round(1000 * self.total_wait_seconds / self.admitted, 2) if self.admitted else 0.0,
+            "max_wait_ms": round(1000 * self.max_wait_seconds, 2),
+        }
+
+
+agent_admission = AdmissionController(
+    max_concurrency=AGENT_MAX_CONCURRENCY,
+    max_queue=AGENT_MAX_QUEUE,
+    queue_timeout_seconds=AGENT_QUEUE_TIMEOUT_SECONDS,
+    user_rate_per_minute=AGENT_USER_RATE_PER_MINUTE,
+    user_burst=AGENT_USER_BURST,
+)
@@ -0,0 +1,135 @@
+"""
+Archival tier for old transactions.
+
+``archive_transactions`` moves every month before a cutoff out of ``transactions`` into
+``transactions_archive``. There is one row per user and month, holding that month's
+transactions as column-oriented JSON compressed with zlib. The live table, its indexes and
+every hot query then only cover recent data. Each month moves in its own database
+transaction, so a month is always either live or archived, never both or neither.
+
+The monthly rollup keeps the archived months, so totals, budgets and snapshots are
+unchanged. Year reports read the archive only when asked to (``include_archived``).
+Soft-deleted transactions are dropped rather than archived.
+"""
+import json
+import logging
+import zlib
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from enum import Enum
+from typing import Dict, List
+from uuid import UUID
+
+from sqlalchemy import select, delete, func, cast, Date
+from sqlalchemy.orm import Session
+
+from const import TRANSACTIONS_ARCHIVE_AFTER_YEARS
+from models import Transaction, TransactionArchive
+from utils.data_version import bump_data_versions
+from utils.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = ("id", "name", "transaction_date", "amount", "currency", "transaction_type", "category_id",
+                  "description", "payment_method", "account", "created_at")
+
+
+def _encode_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (UUID, Decimal)):
+        return str(value)
+    return value
+
+
+def _pack(rows: List[List]) -> bytes:
+    document = {"fields": list(ARCHIVE_FIELDS), "rows": rows}
+    return zlib.compress(json.dumps(document, separators=(",", ":")).encode("utf-8"), 9)
+
+
+def _unpack(payload: bytes) -> Dict:
+    return json.loads(zlib.decompress(payload))
+
+
+def decode_transactions(payload: bytes) -> List[Dict]:
+    """Archived transactions as dicts of their JSON values (strings for ids, amounts and dates)."""
+    document = _unpack(payload)
+    return [dict(zip(document["fields"], row)) for row in document["rows"]]
+
+
+def _next_month(start: date) -> date:
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def archive_cutoff(years: int, today: date = None) -> date:
+    """First day of the current month ``years`` years ago; everything before it is archived."""
+    today = today or date.today()
+    return date(today.year - years, today.month, 1)
+
+
+def archive_month(session: Session, user_id, month: date) -> int:
+    """Move one user's transactions of one month to the archive and commit; returns how many were archived."""
+    table = Transaction.__table__
+    start = datetime(month.year, month.month, 1)
+    end = datetime.combine(_next_month(month), datetime.min.time())
+    in_month = (table.c.user_id == user_id, table.c.transaction_date >= start, table.c.transaction_date < end)
+
+    rows = [[_encode_value(value) for value in row] for row in session.execute(
+        select(*[table.c[field] for field in ARCHIVE_FIELDS]).where(*in_month, table.c.deleted_at.is_(None)
+                                                                    ).order_by(table.c.transaction_date))]
+
+    archived_count = len(rows)
+    # A month archived before can receive backdated transactions later; they join the same row
+    archived = session.get(TransactionArchive, (user_id, month), with_for_update=True)
+    if archived is None:
+        if rows:
+            session.add(TransactionArchive(user_id=user_id, month=month, transaction_count=len(rows),
+                                           payload=_pack(rows)))
+    elif rows:
+        rows = _unpack(archived.payload)["rows"] + rows
+        archived.payload = _pack(rows)
+        archived.transaction_count = len(rows)
+        archived.archived_at = datetime.now(timezone.utc)
+
+    # Soft-deleted rows of the month go too
+    if session.execute(delete(table).where(*in_month)).rowcount:
+        session.info.setdefault("data_versions", {}).update(bump_data_versions(session.connection(), {user_id}))
+    session.commit()
+    return archived_count
+
+
+def archive_transactions(before: date) -> int:
+    """Archive every month that ends on or before ``before`` (rounded down to a month start)."""
+    cutoff = datetime(before.year, before.month, 1)
+    table = Transaction.__table__
+    month = cast(func.date_trunc('month', table.c.transaction_date), Date)
+    with SessionLocal() as session:
+        months = session.execute(select(table.c.user_id, month).where(
+            table.c.transaction_date < cutoff, table.c.user_id.is_not(None)
+        ).group_by(table.c.user_id, month).order_by(month)).all()
+
+    archived = 0
+    for user_id, start in months:
+        with SessionLocal() as session:
+            archived += archive_month(session, user_id, start)
+    return archived
+
+
+def archive_old_transactions():
+    if TRANSACTIONS_ARCHIVE_AFTER_YEARS <= 0:
+        return
+    archived = archive_transactions(archive_cutoff(TRANSACTIONS_ARCHIVE_AFTER_YEARS))
+    if archived:
+        logger.info("Archived %s transactions older than %s years", archived, TRANSACTIONS_ARCHIVE_AFTER_YEARS)
+
+
+def archived_transactions(session: Session, user_id, start: date, end: date) -> List[Dict]:
+    """Decoded archived transactions of the months from ``start`` to ``end``, both included."""
+    payloads = session.query(TransactionArchive.payload).filter(
+        TransactionArchive.user_id == user_id,
+        TransactionArchive.month >= date(start.year, start.month, 1),
+        TransactionArchive.month <= end
+    ).order_by(TransactionArchive.month).all()
+    return [transaction for (payload,) in payloads for transaction in decode_transactions(payload)]
@@ -0,0 +1,78 @@
+"""
+In-process dispatch of ``POST /batch`` operations.
+
+Each operation is sent through the application itself as an ASGI sub-request, so routing,
+validation, dependencies and exception handlers behave exactly as for a normal request. The
+only difference is that ``get_db`` / ``get_read_db`` hand out the batch's shared session and
+``get_current_user`` returns the user authenticated once for the batch.
+"""
+import json
+from typing import Dict
+from urllib.parse import urlencode
+
+from schema.batch import BatchOperationSchema
+
+# Operations that can't take part in a batch: nested batches, and the agent routes which have
+# their own admission control and run far longer than a database transaction should stay open
+EXCLUDED_PREFIXES = ("/batch", "/agents")
+
+# Response headers worth returning per operation
+FORWARDED_HEADERS = ("etag", "last-modified", "location", "idempotency-replayed")
+
+
+async def dispatch(app, parent_scope: Dict, operation: BatchOperationSchema) -> Dict:
+    body = b"" if operation.body is None else json.dumps(operation.body).encode()
+    headers = [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+    headers += [(key.lower().encode("latin-1"), value.encode("latin-1")) for key, value in operation.headers.items()
+                if key.lower() not in ("content-type", "content-length", "authorization")]
+    authorization = dict(parent_scope["headers"]).get(b"authorization")
+    if authorization:
+        headers.append((b"authorization", authorization))
+
+    scope = {
+        **parent_scope,
+        "method": operation.method,
+        "path": operation.path,
+        "raw_path": operation.path.encode(),
+        "query_string": urlencode(operation.query, doseq=True).encode(),
+        "headers": headers,
+        "state": {},
+    }
+    for key in ("route", "endpoint", "path_params"):
+        scope.pop(key, None)
+
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    response = {"status": 500, "headers": {}, "body": b""}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {key.decode("latin-1"): value.decode("latin-1")
+                                   for key, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    try:
+        await app(scope, receive, send)
+    except Exception:
+        # Unhandled errors are re-raised after the 500 response has been sent
+        response["status"] = 500
+
+    content = response["body"]
+    if content and response["headers"].get("content-type", "").startswith("application/json"):
+        content = json.loads(content)
+    else:
+        content = content.decode() or None
+    return {
+        "status": response["status"],
+        "headers": {key: value for key, value in response["headers"].items() if key in FORWARDED_HEADERS},
+        "body": content,
+    }
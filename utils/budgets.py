@@ -0,0 +1,59 @@
+from datetime import date
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from const import DEFAULT_CURRENCY
+from models import Budget, Category, MonthlyCategoryTotal
+from utils.fx import converter
+from utils.transaction_enums import TransactionType
+
+
+def month_start(month: Optional[str] = None) -> date:
+    """First day of a "YYYY-MM" month, the current month by default."""
+    if not month:
+        today = date.today()
+        return date(today.year, today.month, 1)
+    year, month_number = month.split("-")
+    return date(int(year), int(month_number), 1)
+
+
+def budget_status(session: Session, user_id, month: date, currency: str = DEFAULT_CURRENCY) -> List[Dict]:
+    """
+    Spend against every budget of the user for ``month``, in ``currency``. Each budget is
+    matched to its counter rows in the rollup (one per currency spent in) by primary key,
+    nothing is aggregated at read time.
+    """
+    rows = session.query(Budget, Category.name, MonthlyCategoryTotal.currency,
+                         MonthlyCategoryTotal.total_amount).join(
+        Category, Category.id == Budget.category_id
+    ).outerjoin(MonthlyCategoryTotal, and_(
+        MonthlyCategoryTotal.user_id == Budget.user_id,
+        MonthlyCategoryTotal.month == month,
+        MonthlyCategoryTotal.category_id == Budget.category_id,
+        MonthlyCategoryTotal.transaction_type == TransactionType.EXPENSE,
+    )).filter(Budget.user_id == user_id).order_by(Category.name).all()
+
+    convert = converter(session, {row.currency for row in rows if row.currency}, currency)
+    spending = {}
+    for budget, category_name, spent_currency, spent in rows:
+        entry = spending.setdefault(budget.id, [budget, category_name, 0.0])
+        if spent_currency:
+            entry[2] += convert(spent, spent_currency, month)
+
+    statuses = []
+    for budget, category_name, spent in spending.values():
+        amount = float(budget.amount)
+        used = spent / amount if amount else 0
+        statuses.append({
+            "budget_id": budget.id,
+            "category_id": budget.category_id,
+            "category": category_name,
+            "amount": amount,
+            "spent": round(spent, 2),
+            "remaining": round(amount - spent, 2),
+            "percent_used": round(used * 100, 1),
+            "status": "over" if used > 1 else "warning" if used >= budget.alert_threshold else "ok",
+        })
+    return statuses
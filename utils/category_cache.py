@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from const import CATEGORY_CACHE_MAX_USERS
+from models import Category
+from utils.data_version import known_version
+from utils.database import batch_session
+
+
+def normalize_category_name(name: str) -> str:
+    # Same folding as the (user_id, lower(name)) unique index
+    return name.lower()
+
+
+class CategoryNameCache:
+    """
+    Per-user map of case-folded category names to ids, bounded to ``max_users`` users (LRU).
+
+    A user's map is loaded with one query on first use, after which a name lookup is a dict
+    hit. Category writes call ``invalidate``. Each map is also tagged with the user's data
+    version as this process knows it. A local commit, or a NOTIFY from another worker, bumps
+    that version, so a map read just before a concurrent write is never reused afterwards.
+    """
+
+    def __init__(self, max_users: int):
+        self.max_users = max_users
+        self._users: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _load(self, session: Session, user_id) -> Dict[str, UUID]:
+        return {normalize_category_name(name): category_id for name, category_id in session.query(
+            Category.name, Category.id).filter(Category.user_id == user_id)}
+
+    def names(self, session: Session, user_id) -> Dict[str, UUID]:
+        if batch_session.get() is not None:
+            return self._load(session, user_id)
+
+        key = str(user_id)
+        version = known_version(user_id)
+        with self._lock:
+            entry = self._users.get(key)
+            if entry is not None and entry[0] == version:
+                self._users.move_to_end(key)
+                return entry[1]
+
+        names = self._load(session, user_id)
+        with self._lock:
+            self._users[key] = (version, names)
+            self._users.move_to_end(key)
+            if len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        return names
+
+    def lookup(self, session: Session, user_id, name: str) -> Optional[UUID]:
+        return self.names(session, user_id).get(normalize_category_name(name))
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._users.pop(str(user_id), None)
+
+
+category_names = CategoryNameCache(CATEGORY_CACHE_MAX_USERS)
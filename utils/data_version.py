@@ -0,0 +1,188 @@
+"""
+Per-user data version used for cache coherency.
+
+A ``before_flush`` listener bumps ``user_data_versions`` for every user whose transactions,
+categories or budgets are written in the flush, inside the same database transaction, and
+queues a ``NOTIFY`` that Postgres delivers to listeners only once that transaction commits. Readers
+get the current version with a primary-key lookup (``get_data_version``). Versions committed
+by this process, and by every other process when a ``DataVersionListener`` runs, are also
+tracked in memory (``known_version``), which is what read-replica routing relies on for
+read-your-writes.
+"""
+import logging
+import select
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Connection, create_engine, event, func, inspect, select as sql_select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from const import DATA_VERSION_CHANNEL
+from models import Budget, Category, Transaction, UserDataVersion
+from utils.database import url
+
+logger = logging.getLogger(__name__)
+
+# Models whose writes change what a user's reads return
+VERSIONED_MODELS = (Transaction, Category, Budget)
+
+
+def _user_ids(objects, previous: bool = False) -> set:
+    user_ids = set()
+    for obj in objects:
+        if isinstance(obj, VERSIONED_MODELS):
+            user_ids.add(obj.user_id)
+            if previous:
+                history = inspect(obj).attrs.user_id.history
+                user_ids.update(history.deleted)
+    user_ids.discard(None)
+    return user_ids
+
+
+def bump_data_versions(connection, user_ids) -> Dict:
+    """Increment the version of each user and queue a notification; returns the new versions."""
+    table = UserDataVersion.__table__
+    versions = {}
+    # Sorted so concurrent flushes lock version rows in the same order
+    for user_id in sorted(user_ids, key=str):
+        statement = insert(table).values(user_id=user_id, version=1, updated_at=datetime.now(timezone.utc))
+        version = connection.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.user_id],
+            set_={"version": table.c.version + 1, "updated_at": statement.excluded.updated_at}
+        ).returning(table.c.version)).scalar_one()
+        # Other databases (SQLite in the tests) have no NOTIFY; versions are then only noted locally
+        if connection.dialect.name == "postgresql":
+            connection.execute(sql_select(func.pg_notify(DATA_VERSION_CHANNEL, f"{user_id}:{version}")))
+        versions[user_id] = version
+    return versions
+
+
+# Latest committed version seen by this process, per user id (as a string)
+_known_versions: Dict[str, int] = {}
+_known_versions_lock = threading.Lock()
+
+
+def note_version(user_id, version: int) -> bool:
+    """Remember a committed version; returns False if a newer one was already known."""
+    with _known_versions_lock:
+        if version <= _known_versions.get(str(user_id), 0):
+            return False
+        _known_versions[str(user_id)] = version
+        return True
+
+
+def known_version(user_id) -> int:
+    return _known_versions.get(str(user_id), 0)
+
+
+@event.listens_for(Session, "before_flush")
+def _bump_on_write(session: Session, flush_context, instances):
+    dirty = [obj for obj in session.dirty if session.is_modified(obj, include_collections=False)]
+    user_ids = _user_ids(session.new) | _user_ids(session.deleted) | _user_ids(dirty, previous=True)
+    if user_ids:
+        session.info.setdefault("data_versions", {}).update(bump_data_versions(session.connection(), user_ids))
+
+
+def _in_outer_transaction(session: Session) -> bool:
+    # A session joined to a transaction it did not begin (POST /batch) only commits or rolls back
+    # a savepoint; the owner of the outer transaction decides, see ``note_committed_versions``
+    bind = session.bind
+    return isinstance(bind, Connection) and bind.in_transaction()
+
+
+def note_committed_versions(session: Session):
+    for user_id, version in session.info.pop("data_versions", {}).items():
+        note_version(user_id, version)
+
+
+@event.listens_for(Session, "after_commit")
+def _remember_committed_versions(session: Session):
+    if not _in_outer_transaction(session):
+        note_committed_versions(session)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_versions(session: Session, previous_transaction):
+    # A rolled back savepoint keeps them: a version that is too high only costs a primary read
+    if previous_transaction.parent is None and not _in_outer_transaction(session):
+        session.info.pop("data_versions", None)
+
+
+def get_data_version(session: Session, user_id) -> int:
+    return session.query(UserDataVersion.version).filter(UserDataVersion.user_id == user_id).scalar() or 0
+
+
+def get_data_state(session: Session, user_id) -> Tuple[int, Optional[datetime]]:
+    """Version and time of the last write, ``(0, None)`` for users who never wrote anything."""
+    row = session.query(UserDataVersion.version, UserDataVersion.updated_at).filter(
+        UserDataVersion.user_id == user_id).first()
+    return (row.version, row.updated_at) if row else (0, None)
+
+
+class DataVersionListener:
+    """
+    Background thread that LISTENs for version bumps from every process, records them with
+    ``note_version`` and calls each subscriber with ``(user_id, version)``.
+    """
+
+    def __init__(self, channel: str = DATA_VERSION_CHANNEL, reconnect_delay_seconds: float = 5):
+        self.channel = channel
+        self.reconnect_delay_seconds = reconnect_delay_seconds
+        self._callbacks: List[Callable[[str, int], None]] = []
+        self._stop = threading.Event()
+        self._thread = None
+        # Dedicated connection outside the pool, it stays in LISTEN mode for the process lifetime
+        self._engine = create_engine(url, poolclass=NullPool)
+
+    def subscribe(self, callback: Callable[[str, int], None]):
+        self._callbacks.append(callback)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="data-version-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        self._engine.dispose()
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._listen()
+            except Exception:
+                logger.exception("Data version listener failed, reconnecting")
+                self._stop.wait(self.reconnect_delay_seconds)
+
+    def _listen(self):
+        connection = self._engine.raw_connection()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            with dbapi_connection.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.channel}")
+
+            while not self._stop.is_set():
+                if not select.select([dbapi_connection], [], [], 1.0)[0]:
+                    continue
+                dbapi_connection.poll()
+                while dbapi_connection.notifies:
+                    self._dispatch(dbapi_connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _dispatch(self, payload: str):
+        user_id, _, version = payload.rpartition(":")
+        version = int(version)
+        # Notifications can arrive out of order across connections, versions only move forward
+        if not note_version(user_id, version):
+            return
+        for callback in self._callbacks:
+            try:
+                callback(user_id, version)
+            except Exception:
+                logger.exception("Data version subscriber failed")
@@ -1,7 +1,11 @@
+from contextvars import ContextVar
+from typing import Optional
+
 from sqlalchemy.engine import create_engine
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy import URL
-from const import USERNAME, PASSWORD, HOST, PORT, DATABASE
+from sqlalchemy import URL, inspect, text
+from const import USERNAME, PASSWORD, HOST, PORT, DATABASE, DB_POOL_SIZE, DB_MAX_OVERFLOW, REPLICA_HOST, REPLICA_PORT, \
+    REPLICA_POOL_SIZE, REPLICA_MAX_OVERFLOW
 from sqlalchemy.ext.declarative import declarative_base
 
 Base = declarative_base()
@@ -15,13 +19,61 @@ url = URL.create(
     database=DATABASE
 )
 
-engine = create_engine(url=url)
+# Creating the engine does not open any connection; the pool is filled lazily or by warm_up_pool
+engine = create_engine(url=url, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW, pool_pre_ping=True)
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
 
+# Read-only traffic goes to the replica when one is configured, see utils/read_routing.py
+if REPLICA_HOST:
+    replica_engine = create_engine(url=url.set(host=REPLICA_HOST, port=REPLICA_PORT), pool_size=REPLICA_POOL_SIZE,
+                                   max_overflow=REPLICA_MAX_OVERFLOW, pool_pre_ping=True)
+else:
+    replica_engine = engine
+ReadSessionLocal = sessionmaker(bind=replica_engine, autocommit=False, autoflush=False)
+
+
+# Set by POST /batch: every operation of the batch shares its session and database transaction
+batch_session: ContextVar[Optional[Session]] = ContextVar("batch_session", default=None)
+
 
 def get_db():
+    shared_session = batch_session.get()
+    if shared_session is not None:
+        yield shared_session
+        return
+
     db: Session = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+def warm_up_pool(connections: int):
+    """Open ``connections`` pooled connections up front so the first requests don't pay for the handshake."""
+    opened = []
+    try:
+        for _ in range(min(connections, DB_POOL_SIZE)):
+            connection = engine.connect()
+            connection.execute(text("SELECT 1"))
+            opened.append(connection)
+    finally:
+        for connection in opened:
+            connection.close()
+
+
+def check_schema():
+    """Raise if any table declared on the models is missing from the database."""
+    existing_tables = set(inspect(engine).get_table_names())
+    missing_tables = sorted(set(Base.metadata.tables) - existing_tables)
+    if missing_tables:
+        raise RuntimeError(f"Database schema is missing tables: {', '.join(missing_tables)}")
+
+
+def ping() -> bool:
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
@@ -1,12 +1,23 @@
 from fastapi import Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
+from contextvars import ContextVar
 from functools import wraps
+from typing import Optional
+from uuid import UUID
 
 from models import User
 from utils import get_db, Token
 
 
+# Set by POST /batch: its operations reuse the user authenticated for the batch request
+batch_user: ContextVar[Optional[User]] = ContextVar("batch_user", default=None)
+
+
 def get_current_user(request: Request, session: Session = Depends(get_db)):
+    authenticated_user = batch_user.get()
+    if authenticated_user is not None:
+        return authenticated_user
+
     token = request.headers.get("Authorization")
 
     if not token:
@@ -21,8 +32,14 @@ def get_current_user(request: Request, session: Session = Depends(get_db)):
     except Exception:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
-    existing_user = session.query(User).filter(User.email == access_token_payload.get("email")).first()
-    if not existing_user:
+    # The access token is verified statelessly; the user is then loaded by primary key
+    try:
+        user_id = UUID(access_token_payload.get("id"))
+    except (TypeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+
+    existing_user = session.get(User, user_id)
+    if not existing_user or existing_user.email != access_token_payload.get("email"):
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
 
     return existing_user
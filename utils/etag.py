@@ -0,0 +1,134 @@
+"""
+Conditional GET support for read endpoints, keyed on the user's data version.
+
+Read endpoints depend on ``data_version`` (or call ``check_not_modified`` themselves). It
+computes the ETag and Last-Modified of the representation from a primary-key lookup and,
+when the client already has it (``If-None-Match`` / ``If-Modified-Since``), answers
+``304 Not Modified`` before the endpoint runs any of its queries. Endpoints that convert
+amounts between currencies depend on ``converted_data_version`` instead, whose validators also
+cover the last FX rate load. ``ETagMiddleware`` adds the validators and ``Cache-Control`` to the
+full responses.
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from utils.data_version import get_data_state
+from utils.dependencies import get_current_user
+from utils.fx import rates_updated_at
+from utils.read_routing import get_read_db
+
+# Clients may keep the response but must revalidate it (a 304 costs a few hundred bytes)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(user_id, version: int, *parts) -> str:
+    """Weak ETag of one representation (``parts``, e.g. path and query) at a data version."""
+    digest = hashlib.sha1("|".join(str(part) for part in (user_id, *parts)).encode()).hexdigest()[:16]
+    return f'W/"{version}-{digest}"'
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if if_none_match.strip() == "*":
+        return True
+    # Weak comparison: W/ prefixes are ignored
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def _utc(moment: datetime) -> datetime:
+    return moment if moment.tzinfo is not None else moment.replace(tzinfo=timezone.utc)
+
+
+def _not_modified_since(if_modified_since: str, last_modified: datetime) -> bool:
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    since = _utc(since)
+    # HTTP dates have one second resolution
+    return last_modified.replace(microsecond=0) <= since
+
+
+def check_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None):
+    """Record the validators for the response and raise 304 if the client's copy is current."""
+    request.state.etag = etag
+    if last_modified is not None:
+        last_modified = _utc(last_modified)
+        request.state.last_modified = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        not_modified = _etag_matches(if_none_match, etag)
+    else:
+        # If-Modified-Since is only considered when there is no If-None-Match
+        if_modified_since = request.headers.get("if-modified-since")
+        not_modified = bool(if_modified_since and last_modified and _not_modified_since(if_modified_since,
+                                                                                           last_modified))
+    if not_modified:
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if last_modified is not None:
+            headers["Last-Modified"] = request.state.last_modified
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+def data_version(request: Request, user=Depends(get_current_user), session: Session = Depends(get_read_db)) -> int:
+    """
+    Dependency for read endpoints: returns the user's data version, sets the validators for the
+    request path and query and short-circuits with 304 when the client's copy is current. The
+    version is read through the same session as the endpoint's data so both always agree.
+    """
+    version, updated_at = get_data_state(session, user.id)
+    check_not_modified(request, make_etag(user.id, version, request.url.path, request.url.query), updated_at)
+    return version
+
+
+def fx_data_state(session: Session, user_id) -> Tuple[int, Optional[datetime], str]:
+    """
+    ``get_data_state`` plus an ETag part for the FX rates, for representations with converted
+    amounts: they change with a rate load even when the user's data did not.
+    """
+    version, updated_at = get_data_state(session, user_id)
+    loaded_at = rates_updated_at(session)
+    if loaded_at is None:
+        return version, updated_at, "fx-none"
+    if updated_at is None or _utc(loaded_at) > _utc(updated_at):
+        updated_at = loaded_at
+    return version, updated_at, f"fx-{_utc(loaded_at).timestamp()}"
+
+
+def converted_data_version(request: Request, user=Depends(get_current_user),
+                           session: Session = Depends(get_read_db)) -> int:
+    """``data_version`` for endpoints whose amounts are converted between currencies."""
+    version, updated_at, fx_part = fx_data_state(session, user.id)
+    check_not_modified(request, make_etag(user.id, version, request.url.path, request.url.query, fx_part),
+                       updated_at)
+    return version
+
+
+class ETagMiddleware:
+    """Adds the validators chosen by the endpoint (``request.state``) to successful GET responses."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET":
+            return await self.app(scope, receive, send)
+
+        async def send_with_validators(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                state = scope.get("state", {})
+                if state.get("etag"):
+                    headers = [*message.get("headers", []), (b"etag", state["etag"].encode("latin-1")),
+                               (b"cache-control", CACHE_CONTROL.encode("latin-1"))]
+                    if state.get("last_modified"):
+                        headers.append((b"last-modified", state["last_modified"].encode("latin-1")))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_validators)
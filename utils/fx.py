@@ -0,0 +1,142 @@
+"""
+Currency conversion for reports, budgets and agent answers.
+
+Amounts are stored in the currency they were made in and aggregated per currency, either in
+SQL or by reading the rollup. Each aggregate is then converted once with the average rate
+of its month. ``FxRateCache`` loads a currency's whole rate history with one query. After
+that, a rate is a dictionary hit or a binary search over the cached dates, so a converted
+report never runs a rate query per row and never loops over individual transactions.
+"""
+import time
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from threading import Lock
+from typing import Callable, Iterable, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from const import FX_RATE_BASE, FX_CACHE_TTL_SECONDS
+from models import FxRate
+
+
+class MissingFxRate(HTTPException):
+    def __init__(self, currency: str):
+        super().__init__(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                         detail=f"No exchange rate available for {currency}")
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+class FxRateCache:
+    """
+    In-memory rate history per currency, reloaded from ``fx_rates`` after ``ttl_seconds``.
+
+    Rates are units of the currency per one unit of ``FX_RATE_BASE``. A day without a rate
+    (weekends, holidays) uses the latest earlier rate.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._history = {}
+        self._monthly = {}
+        self._lock = Lock()
+
+    def invalidate(self):
+        with self._lock:
+            self._history = {}
+            self._monthly = {}
+
+    def load(self, session: Session, currencies: Iterable[str]):
+        """Load, in one query, the rate history of every currency not cached or cached too long ago."""
+        now = time.monotonic()
+        with self._lock:
+            stale = {currency for currency in currencies if currency != FX_RATE_BASE and (
+                currency not in self._history or now - self._history[currency][2] > self.ttl_seconds)}
+        if not stale:
+            return
+
+        history = {currency: ([], [], now) for currency in stale}
+        for currency, rate_date, rate in session.query(FxRate.currency, FxRate.rate_date, FxRate.rate).filter(
+                FxRate.currency.in_(stale)).order_by(FxRate.currency, FxRate.rate_date):
+            history[currency][0].append(rate_date)
+            history[currency][1].append(rate)
+        # Entries are replaced, never removed, so a concurrent conversion always finds its rates
+        with self._lock:
+            self._history = {**self._history, **history}
+            self._monthly = {key: rate for key, rate in self._monthly.items() if key[0] not in stale}
+
+    def _series(self, currency: str):
+        series = self._history.get(currency)
+        if not series or not series[0]:
+            raise MissingFxRate(currency)
+        return series[0], series[1]
+
+    def rate(self, currency: str, day: date) -> Decimal:
+        if currency == FX_RATE_BASE:
+            return Decimal(1)
+        dates, rates = self._series(currency)
+        # Before the first known rate the earliest one is the best estimate
+        return rates[max(bisect_right(dates, day) - 1, 0)]
+
+    def month_rate(self, currency: str, month: date) -> Decimal:
+        """Average of the month's daily rates, or the latest earlier rate if the month has none."""
+        if currency == FX_RATE_BASE:
+            return Decimal(1)
+        key = (currency, month)
+        cached = self._monthly.get(key)
+        if cached is None:
+            dates, rates = self._series(currency)
+            first, last = bisect_left(dates, month), bisect_left(dates, _next_month(month))
+            cached = sum(rates[first:last]) / (last - first) if last > first else self.rate(currency, month)
+            self._monthly[key] = cached
+        return cached
+
+    def factor(self, source: str, target: str, month: date) -> Decimal:
+        if source == target:
+            return Decimal(1)
+        return self.month_rate(target, month) / self.month_rate(source, month)
+
+
+fx_rates = FxRateCache(FX_CACHE_TTL_SECONDS)
+
+
+def converter(session: Session, currencies: Iterable[str], target: str) -> Callable[[object, str, date], float]:
+    """
+    ``convert(amount, currency, month)`` into ``target`` for aggregates in ``currencies``.
+    When everything is already in ``target`` no rates are loaded at all.
+    """
+    currencies = set(currencies)
+    if currencies - {target}:
+        fx_rates.load(session, currencies | {target})
+
+    def convert(amount, currency: str, month: date) -> float:
+        if currency == target:
+            return float(amount or 0)
+        return float(Decimal(amount or 0) * fx_rates.factor(currency, target, month))
+
+    return convert
+
+
+def rates_updated_at(session: Session) -> Optional[datetime]:
+    """Time of the last rate load, ``None`` before the first one; an index lookup."""
+    return session.query(func.max(FxRate.updated_at)).scalar()
+
+
+def store_rates(session: Session, rates: List[dict], chunk_size: int = 5000) -> int:
+    """Upsert ``{"currency", "rate_date", "rate"}`` rows into ``fx_rates``."""
+    table = FxRate.__table__
+    loaded_at = datetime.now(timezone.utc)
+    for start in range(0, len(rates), chunk_size):
+        statement = insert(table).values([{**rate, "updated_at": loaded_at} for rate in rates[start:start + chunk_size]])
+        session.execute(statement.on_conflict_do_update(
+            index_elements=[table.c.currency, table.c.rate_date],
+            set_={"rate": statement.excluded.rate, "updated_at": statement.excluded.updated_at}))
+    session.commit()
+    fx_rates.invalidate()
+    return len(rates)
@@ -0,0 +1,106 @@
+"""
+``Idempotency-Key`` support for writes.
+
+A write endpoint depends on ``idempotency_key`` and calls ``claim`` before doing any work. The
+first request with a key inserts the key row in the endpoint's transaction and the endpoint
+``store``s its response in that row before committing, so the write and its stored response
+commit (or roll back) together. A retry finds the row with one indexed lookup and gets the
+stored response back without the write running again. A concurrent duplicate blocks on the
+key's unique index until the first request commits, then replays its response.
+"""
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone, timedelta
+from typing import Any, Optional
+
+from fastapi import HTTPException, Request, status
+from sqlalchemy import delete
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from const import IDEMPOTENCY_KEY_TTL_SECONDS
+from models import IdempotencyKey
+from utils.responses import FastJSONResponse
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotency-Replayed"
+
+
+@dataclass
+class IdempotentRequest:
+    key: str
+    request_hash: str
+
+
+async def idempotency_key(request: Request) -> Optional[IdempotentRequest]:
+    """Dependency: the request's idempotency key and fingerprint, ``None`` without the header."""
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    if not key or len(key) > 255:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST,
+                            detail=f"{IDEMPOTENCY_HEADER} must be between 1 and 255 characters")
+    fingerprint = hashlib.sha256(request.method.encode() + b" " + request.url.path.encode() + b"\n"
+                                 + await request.body()).hexdigest()
+    return IdempotentRequest(key=key, request_hash=fingerprint)
+
+
+def claim(session: Session, user_id, idempotent: Optional[IdempotentRequest]) -> Optional[FastJSONResponse]:
+    """
+    Reserve the key in the session's transaction. Returns the stored response when the request
+    was already processed, ``None`` when the endpoint should go ahead.
+    """
+    if idempotent is None:
+        return None
+
+    table = IdempotencyKey.__table__
+    existing = None
+    # The conflicting row can vanish before it is read (pruned, or its transaction rolled back);
+    # the key is free again then, so the insert is tried once more
+    for _ in range(2):
+        inserted = session.execute(insert(table).values(
+            user_id=user_id, key=idempotent.key, request_hash=idempotent.request_hash,
+            created_at=datetime.now(timezone.utc)
+        ).on_conflict_do_nothing(index_elements=[table.c.user_id, table.c.key]).returning(table.c.key)).first()
+        if inserted:
+            return None
+        existing = session.get(IdempotencyKey, (user_id, idempotent.key), populate_existing=True)
+        if existing is not None:
+            break
+
+    if existing is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="A request with this idempotency key is still being processed")
+    if existing.request_hash != idempotent.request_hash:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request")
+    if existing.status_code is None:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT,
+                            detail="A request with this idempotency key is still being processed")
+    return FastJSONResponse(existing.response, status_code=existing.status_code, headers={REPLAYED_HEADER: "true"})
+
+
+def store(session: Session, user_id, idempotent: Optional[IdempotentRequest], status_code: int, response: Any):
+    """Save the response on the claimed key; call before the endpoint's commit."""
+    if idempotent is None:
+        return
+    row = session.get(IdempotencyKey, (user_id, idempotent.key))
+    row.status_code = status_code
+    row.response = response
+
+
+def prune_expired_idempotency_keys():
+    from utils.database import SessionLocal
+
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=IDEMPOTENCY_KEY_TTL_SECONDS)
+    session = SessionLocal()
+    try:
+        pruned = session.execute(delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)).rowcount
+        session.commit()
+        if pruned:
+            logger.info("Pruned %s expired idempotency keys", pruned)
+    finally:
+        session.close()
@@ -0,0 +1,13 @@
+from enum import Enum
+
+
+class JobStatus(str, Enum):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+
+class JobKind(str, Enum):
+    CATEGORY_YEAR_REPORT = 'category_year_report'
+    AGENT_QUERY = 'agent_query'
@@ -0,0 +1,45 @@
+"""
+Handlers for background jobs. Each handler receives a worker-owned session, the submitting
+user and the validated params, and returns a JSON-serializable result.
+"""
+import asyncio
+from typing import Callable, Dict, Tuple, Type
+
+from pydantic import BaseModel
+from sqlalchemy.orm import Session
+
+from schema import YearWiseCategoryReportSchema, AgentQuerySchema
+from utils.job_enums import JobKind
+from utils.reports import year_wise_category_report
+
+
+def run_category_year_report(session: Session, user, params: YearWiseCategoryReportSchema) -> Dict:
+    currency = params.currency or user.base_currency
+    report = year_wise_category_report(session, user.id, params.year, params.exclude, currency,
+                                       params.include_archived)
+    if not report:
+        return {"message": "No Transactions found", "data": {}}
+    return {"message": "Transaction retrieved successfull", "currency": currency, "data": report}
+
+
+def run_agent_query(session: Session, user, params: AgentQuerySchema) -> Dict:
+    from agents.memory import summarize_conversation
+    from agents.runner import run_supervisor_turn
+
+    # Job workers are plain threads, so the async runner gets its own event loop
+    turn = asyncio.run(run_supervisor_turn(session, user, params.query, params.thread_id))
+    summarize_conversation(turn.thread_id)
+
+    return {
+        "response": turn.content,
+        "thread_id": str(turn.thread_id),
+        "truncated": turn.truncated,
+        "usage": turn.usage,
+        "user_name": f"{user.first_name} {user.last_name}"
+    }
+
+
+JOB_HANDLERS: Dict[JobKind, Tuple[Type[BaseModel], Callable]] = {
+    JobKind.CATEGORY_YEAR_REPORT: (YearWiseCategoryReportSchema, run_category_year_report),
+    JobKind.AGENT_QUERY: (AgentQuerySchema, run_agent_query),
+}
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timezone, timedelta
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from const import JOB_POLL_INTERVAL_SECONDS, JOB_STALE_AFTER_SECONDS, JOB_RESULT_TTL_SECONDS
+from models import Job, User
+from utils.database import SessionLocal
+from utils.job_enums import JobStatus, JobKind
+
+logger = logging.getLogger(__name__)
+
+# Set on submit so a local idle worker picks the job up without waiting for the next poll
+_job_available = threading.Event()
+
+
+def dedup_key(kind: JobKind, params: Dict) -> str:
+    payload = json.dumps({"kind": kind.value, "params": params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _find_in_flight(session: Session, user_id, key: str) -> Optional[Job]:
+    return session.query(Job).filter(
+        Job.user_id == user_id,
+        Job.dedup_key == key,
+        Job.status.in_([JobStatus.QUEUED, JobStatus.RUNNING])
+    ).first()
+
+
+def submit_job(session: Session, user_id, kind: JobKind, params: Dict) -> Tuple[Job, bool]:
+    """
+    Queue a job, or return the identical job this user already has queued or running.
+    Returns the job and whether it was newly created.
+    """
+    key = dedup_key(kind, params)
+    existing_job = _find_in_flight(session, user_id, key)
+    if existing_job:
+        return existing_job, False
+
+    job = Job(user_id=user_id, kind=kind, params=params, dedup_key=key, status=JobStatus.QUEUED)
+    session.add(job)
+    try:
+        session.commit()
+    except IntegrityError:
+        # A concurrent identical submission won the race on the partial unique index
+        session.rollback()
+        existing_job = _find_in_flight(session, user_id, key)
+        if existing_job:
+            return existing_job, False
+        raise
+
+    _job_available.set()
+    return job, True
+
+
+def claim_next_job(session: Session) -> Optional[Job]:
+    """Atomically move the oldest queued job to running; SKIP LOCKED lets many workers poll the same table."""
+    job = session.query(Job).filter(Job.status == JobStatus.QUEUED).order_by(
+        Job.created_at).with_for_update(skip_locked=True).first()
+    if not job:
+        session.rollback()
+        return None
+
+    job.status = JobStatus.RUNNING
+    job.started_at = datetime.now(timezone.utc)
+    job.attempts = (job.attempts or 0) + 1
+    session.commit()
+    return job
+
+
+def run_job(session: Session, job: Job):
+    from utils.job_handlers import JOB_HANDLERS
+
+    try:
+        params_schema, handler = JOB_HANDLERS[job.kind]
+        user = session.get(User, job.user_id)
+        if not user:
+            raise RuntimeError("User not found")
+        result = handler(session, user, params_schema.model_validate(job.params))
+        session.rollback()  # discard anything the handler left open before recording the outcome
+        job.status = JobStatus.SUCCEEDED
+        job.result = result
+    except Exception as e:
+        logger.exception("Job %s (%s) failed", job.id, job.kind)
+        session.rollback()
+        job.status = JobStatus.FAILED
+        job.error = str(e)
+    job.finished_at = datetime.now(timezone.utc)
+    session.commit()
+
+
+def requeue_stale_jobs():
+    """Jobs left running by a worker that died are put back in the queue."""
+    session = SessionLocal()
+    try:
+        stale_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_AFTER_SECONDS)
+        result = session.execute(
+            update(Job).where(Job.status == JobStatus.RUNNING, Job.started_at < stale_before)
+            .values(status=JobStatus.QUEUED, started_at=None)
+        )
+        session.commit()
+        if result.rowcount:
+            logger.warning("Requeued %s stale jobs", result.rowcount)
+    finally:
+        session.close()
+
+
+def prune_finished_jobs():
+    session = SessionLocal()
+    try:
+        finished_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_RESULT_TTL_SECONDS)
+        session.execute(delete(Job).where(Job.status.in_([JobStatus.SUCCEEDED, JobStatus.FAILED]),
+                                          Job.finished_at < finished_before))
+        session.commit()
+    finally:
+        session.close()
+
+
+class JobWorkerPool:
+    """Fixed set of threads that claim and run jobs from the jobs table."""
+
+    def __init__(self, workers: int, poll_interval_seconds: float = JOB_POLL_INTERVAL_SECONDS):
+        self.workers = workers
+        self.poll_interval_seconds = poll_interval_seconds
+        self._stop = threading.Event()
+        self._threads = []
+
+    def _work(self):
+        while not self._stop.is_set():
+            session = SessionLocal()
+            try:
+                job = claim_next_job(session)
+                if job:
+                    run_job(session, job)
+                    continue
+            except Exception:
+                logger.exception("Job worker iteration failed")
+            finally:
+                session.close()
+
+            _job_available.wait(self.poll_interval_seconds)
+            _job_available.clear()
+
+    def start(self):
+        requeue_stale_jobs()
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout_seconds: Optional[float] = None):
+        """Stop claiming new jobs and wait for running ones to finish."""
+        self._stop.set()
+        _job_available.set()
+        for thread in self._threads:
+            thread.join(timeout_seconds)
+        self._threads = []
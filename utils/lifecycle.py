@@ -0,0 +1,51 @@
+import asyncio
+import time
+from contextlib import contextmanager
+from threading import Lock
+
+
+class InFlightTracker:
+    """Counts in-flight requests of one kind so shutdown can wait for them to finish."""
+
+    def __init__(self):
+        self._count = 0
+        self._lock = Lock()
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @contextmanager
+    def track(self):
+        with self._lock:
+            self._count += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._count -= 1
+
+    async def wait_idle(self, timeout_seconds: float) -> bool:
+        """Wait until nothing is in flight; returns False if the timeout expired first."""
+        deadline = time.monotonic() + timeout_seconds
+        while self._count > 0:
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.1)
+        return True
+
+
+class AppLifecycle:
+    """Readiness state shared by the lifespan handler, the health check and long-running routes."""
+
+    def __init__(self):
+        self.ready = False
+        self.draining = False
+        self.agent_requests = InFlightTracker()
+
+    @property
+    def accepting_requests(self) -> bool:
+        return self.ready and not self.draining
+
+
+lifecycle = AppLifecycle()
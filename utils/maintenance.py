@@ -0,0 +1,18 @@
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodically(func: Callable[[], None], interval_seconds: float):
+    """
+    Run a blocking maintenance function in a worker thread every ``interval_seconds``
+    until the task is cancelled. Failures are logged and retried on the next tick.
+    """
+    while True:
+        try:
+            await asyncio.to_thread(func)
+        except Exception:
+            logger.exception("Maintenance task %s failed", getattr(func, "__name__", func))
+        await asyncio.sleep(interval_seconds)
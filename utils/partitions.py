@@ -0,0 +1,126 @@
+"""
+Range partitions of the ``transactions`` table by ``transaction_date``.
+
+With ``TRANSACTIONS_PARTITIONING`` set to "yearly" or "monthly" the table is created as a
+partitioned table (see ``models/transaction.py``). Partitions are named after their period
+(``transactions_p2025`` or ``transactions_p2025_03``); rows outside every partition land in
+``transactions_default``. Reports filter on a date range, so Postgres only scans the
+partitions of that range, and old periods can be detached (and archived) without a
+long-running DELETE or VACUUM on the live table.
+"""
+import logging
+import re
+from datetime import date
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, text
+
+from const import TRANSACTIONS_PARTITIONING, TRANSACTIONS_PARTITIONS_FROM, TRANSACTIONS_PARTITIONS_AHEAD
+from models import Transaction
+from models.transaction import TRANSACTIONS_PARTITIONED
+from utils.database import engine
+
+logger = logging.getLogger(__name__)
+
+PARENT = Transaction.__tablename__
+DEFAULT_PARTITION = f"{PARENT}_default"
+ARCHIVE_SCHEMA = "archive"
+
+_PARTITION_NAME = re.compile(rf"^{PARENT}_p(\d{{4}})(?:_(\d{{2}}))?$")
+
+
+def _period_start(day: date, interval: str) -> date:
+    return date(day.year, 1, 1) if interval == "yearly" else date(day.year, day.month, 1)
+
+
+def _next_period(start: date, interval: str) -> date:
+    if interval == "yearly":
+        return date(start.year + 1, 1, 1)
+    return date(start.year + start.month // 12, start.month % 12 + 1, 1)
+
+
+def partition_name(start: date, interval: str) -> str:
+    return f"{PARENT}_p{start.year}" if interval == "yearly" else f"{PARENT}_p{start.year}_{start.month:02d}"
+
+
+def partition_range(name: str) -> Optional[Tuple[date, date]]:
+    """``(start, end)`` of a partition from its name, ``None`` for the default partition."""
+    match = _PARTITION_NAME.match(name)
+    if not match:
+        return None
+    year, month = int(match.group(1)), match.group(2)
+    if month is None:
+        return date(year, 1, 1), date(year + 1, 1, 1)
+    start = date(year, int(month), 1)
+    return start, _next_period(start, "monthly")
+
+
+def list_partitions(connection) -> List[str]:
+    rows = connection.execute(text("""
+        SELECT child.relname FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :parent ORDER BY child.relname
+    """), {"parent": PARENT})
+    return [row[0] for row in rows]
+
+
+def ensure_partitions(connection, start: date, end: date, interval: str = TRANSACTIONS_PARTITIONING) -> List[str]:
+    """Create the missing partitions covering ``start`` up to ``end`` and the default partition."""
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {DEFAULT_PARTITION} PARTITION OF {PARENT} DEFAULT"))
+
+    existing = set(list_partitions(connection))
+    created = []
+    period = _period_start(start, interval)
+    while period < end:
+        name = partition_name(period, interval)
+        next_period = _next_period(period, interval)
+        if name not in existing:
+            connection.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {PARENT} "
+                f"FOR VALUES FROM ('{period.isoformat()}') TO ('{next_period.isoformat()}')"))
+            created.append(name)
+        period = next_period
+    return created
+
+
+def partition_horizon(ahead: int, interval: str = TRANSACTIONS_PARTITIONING) -> date:
+    """End of the period ``ahead`` periods after the current one."""
+    end = _period_start(date.today(), interval)
+    for _ in range(ahead + 1):
+        end = _next_period(end, interval)
+    return end
+
+
+def ensure_future_partitions(ahead: int = TRANSACTIONS_PARTITIONS_AHEAD):
+    """Make sure the current period and the next ``ahead`` periods have a partition."""
+    with engine.begin() as connection:
+        created = ensure_partitions(connection, date.today(), partition_horizon(ahead))
+    if created:
+        logger.info("Created transaction partitions %s", ", ".join(created))
+    return created
+
+
+def detach_partitions_before(connection, cutoff: date, archive: bool = False) -> List[str]:
+    """
+    Detach every partition that only holds rows before ``cutoff``. Detached partitions stay
+    as plain tables (moved to the ``archive`` schema with ``archive=True``) until dropped.
+    """
+    detached = []
+    for name in list_partitions(connection):
+        bounds = partition_range(name)
+        if bounds is None or bounds[1] > cutoff:
+            continue
+        connection.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name}"))
+        if archive:
+            connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        detached.append(name)
+    return detached
+
+
+if TRANSACTIONS_PARTITIONED:
+    @event.listens_for(Transaction.__table__, "after_create")
+    def _create_initial_partitions(target, connection, **kwargs):
+        ensure_partitions(connection, date.fromisoformat(TRANSACTIONS_PARTITIONS_FROM),
+                          partition_horizon(TRANSACTIONS_PARTITIONS_AHEAD))
@@ -1,14 +1,70 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from threading import BoundedSemaphore
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto", default="pbkdf2_sha256")
+from const import PASSWORD_HASH_ROUNDS, PASSWORD_HASH_EXECUTOR, PASSWORD_HASH_WORKERS, PASSWORD_HASH_QUEUE_SIZE, \
+    PASSWORD_HASH_TIMEOUT_SECONDS
+
+# Hashes created with a different round count are flagged by needs_update and rehashed on login
+pwd_context = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto", default="pbkdf2_sha256",
+                           pbkdf2_sha256__default_rounds=PASSWORD_HASH_ROUNDS,
+                           pbkdf2_sha256__min_rounds=PASSWORD_HASH_ROUNDS,
+                           pbkdf2_sha256__max_rounds=PASSWORD_HASH_ROUNDS)
+
+# pbkdf2 releases the GIL inside hashlib, so a thread pool scales with cores; a process pool is available
+# for deployments that prefer full isolation from the API worker
+if PASSWORD_HASH_EXECUTOR == "process":
+    _executor = ProcessPoolExecutor(max_workers=PASSWORD_HASH_WORKERS)
+else:
+    _executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+
+# Running plus queued hashing jobs; anything beyond this is rejected instead of piling up
+_slots = BoundedSemaphore(PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def _run(func, *args):
+    if not _slots.acquire(blocking=False):
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Server is busy, please retry shortly",
+                            headers={"Retry-After": "1"})
+    try:
+        future = _executor.submit(func, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+
+    # Awaited on the event loop: no request thread is held while the hash runs or waits in the queue
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), PASSWORD_HASH_TIMEOUT_SECONDS)
+    except TimeoutError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Server is busy, please retry shortly",
+                            headers={"Retry-After": "1"})
 
 
 class PasswordHasher:
 
     @staticmethod
-    def hash_password(password: str) -> str:
-        return pwd_context.hash(password)
+    async def hash_password(password: str) -> str:
+        return await _run(_hash, password)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(hashed_password, plain_password)
+    async def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """
+        Verify a password and, if the stored hash uses outdated parameters, also return a
+        replacement hash computed with the current ones (``None`` when no update is needed).
+        """
+        return await _run(_verify_and_update, plain_password, hashed_password)
@@ -0,0 +1,54 @@
+"""
+Read/write session routing.
+
+Writes always use the primary (``get_db`` / ``SessionLocal``). Read-only paths ask for a
+session for a specific user: it is served by the replica unless the replica has not yet
+replayed that user's latest known write, in which case the primary answers. The latest write
+is tracked through the per-user data version (``utils.data_version.known_version``), which
+covers writes made by this process and, with ``DATA_VERSION_LISTEN=true``, by every other
+process, so a user always reads their own writes.
+"""
+import logging
+
+from fastapi import Depends
+from sqlalchemy.orm import Session
+
+from utils.data_version import get_data_version, known_version
+from utils.database import SessionLocal, ReadSessionLocal, replica_engine, engine, batch_session
+from utils.dependencies import get_current_user
+
+logger = logging.getLogger(__name__)
+
+
+def read_session_for(user_id) -> Session:
+    """Session for read-only queries on ``user_id``'s data; the caller closes it."""
+    if replica_engine is engine:
+        return SessionLocal()
+
+    session = ReadSessionLocal()
+    required = known_version(user_id)
+    if not required:
+        return session
+    try:
+        if get_data_version(session, user_id) >= required:
+            return session
+    except Exception:
+        logger.warning("Replica unavailable, reading from the primary", exc_info=True)
+    # The replica is behind this user's last write (or down)
+    session.close()
+    return SessionLocal()
+
+
+def get_read_db(user=Depends(get_current_user)):
+    """Dependency for read-only endpoints, the counterpart of ``get_db``."""
+    shared_session = batch_session.get()
+    if shared_session is not None:
+        # Inside a batch reads see the batch's own uncommitted writes
+        yield shared_session
+        return
+
+    session = read_session_for(user.id)
+    try:
+        yield session
+    finally:
+        session.close()
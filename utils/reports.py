@@ -0,0 +1,93 @@
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import func, extract
+from sqlalchemy.orm import Session
+
+from const import DEFAULT_CURRENCY
+from utils.archive import archived_transactions
+from utils.fx import converter
+
+
+def month_name(month_num: int) -> str:
+    return datetime(1900, month_num, 1).strftime("%B")
+
+
+def _archived_rows(session: Session, user_id, year: int, exclude: Optional[List[str]]) -> List[tuple]:
+    """Archived transactions of the year aggregated like the live query's rows."""
+    from models import Category
+
+    totals = defaultdict(lambda: [Decimal(0), 0])
+    for transaction in archived_transactions(session, user_id, date(year, 1, 1), date(year, 12, 1)):
+        if transaction["category_id"] is None:
+            continue
+        key = (int(transaction["transaction_date"][5:7]), UUID(transaction["category_id"]), transaction["currency"])
+        totals[key][0] += Decimal(transaction["amount"])
+        totals[key][1] += 1
+    if not totals:
+        return []
+
+    # Like the join in the live query, transactions of categories that no longer exist are left out
+    query = session.query(Category.id, Category.name).filter(Category.id.in_({key[1] for key in totals}))
+    if exclude:
+        query = query.filter(~Category.name.in_(exclude))
+    names = dict(query.all())
+    return [(month, category_id, names[category_id], currency, amount, count)
+            for (month, category_id, currency), (amount, count) in totals.items() if category_id in names]
+
+
+def year_wise_category_report(session: Session, user_id, year: int, exclude: Optional[List[str]] = None,
+                              currency: str = DEFAULT_CURRENCY,
+                              include_archived: bool = False) -> Dict[str, List[Dict]]:
+    """
+    Monthly totals per category for one year in ``currency``, keyed by month name in calendar
+    order. Returns an empty dict when the user has no transactions in that year. Archived
+    months are only included with ``include_archived``.
+    """
+    from models import Transaction, Category
+
+    start_date = datetime(year, 1, 1)
+    end_date = datetime(year, 12, 31, 23, 59, 59)
+
+    # Summed per currency in the database; only these aggregates are converted
+    query = session.query(
+        extract('month', Transaction.transaction_date).label('month'),
+        Category.id.label('category_id'),
+        Category.name.label('category_name'),
+        Transaction.currency,
+        func.sum(Transaction.amount).label('total_amount'),
+        func.count(Transaction.id).label('transaction_count')
+    ).join(
+        Transaction.category
+    ).filter(
+        Transaction.user_id == user_id,
+        Transaction.transaction_date >= start_date,
+        Transaction.transaction_date <= end_date
+    ).group_by(extract('month', Transaction.transaction_date), Category.id, Transaction.currency).order_by(
+        extract('month', Transaction.transaction_date))
+
+    if exclude:
+        query = query.filter(~Category.name.in_(exclude))
+
+    rows = [(int(row.month), row.category_id, row.category_name, row.currency, row.total_amount,
+             row.transaction_count) for row in query.all()]
+    if include_archived:
+        rows = sorted(rows + _archived_rows(session, user_id, year, exclude), key=lambda row: row[0])
+    convert = converter(session, {row[3] for row in rows}, currency)
+
+    # Rows are ordered by month, so insertion order gives Jan → Dec
+    month_data = defaultdict(dict)
+    for month, category_id, category_name, row_currency, total_amount, transaction_count in rows:
+        entry = month_data[month_name(month)].setdefault(category_id, {
+            "category": category_name,
+            "total_amount": 0.0,
+            "transaction_count": 0,
+        })
+        entry["total_amount"] += convert(total_amount, row_currency, date(year, month, 1))
+        entry["transaction_count"] += transaction_count
+
+    return {month: [{**entry, "total_amount": round(entry["total_amount"], 2)} for entry in entries.values()]
+            for month, entries in month_data.items()}
@@ -0,0 +1,50 @@
+"""
+Project-wide JSON response class.
+
+``FastJSONResponse`` renders with orjson when it is installed. orjson serializes UUID,
+datetime, date and Enum values natively; Decimal and Pydantic models go through
+``_default``. Routes can therefore hand it ORM values directly instead of running
+``jsonable_encoder`` or a response model over every row. Without orjson it falls back to
+the stdlib encoder with the same conversions. Either way the output matches what Pydantic
+produced before, including "Z" for UTC timestamps.
+"""
+import json
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    # Only reached on the stdlib fallback, orjson handles these itself
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+        return json.dumps(content, default=_default, ensure_ascii=False, allow_nan=False,
+                          separators=(",", ":")).encode("utf-8")
@@ -0,0 +1,150 @@
+"""
+Incremental maintenance of ``monthly_category_totals``.
+
+A ``before_flush`` listener turns every inserted, updated and deleted transaction into
+deltas per (user, month, category, type, currency) and upserts them in the same database
+transaction as the write, so the rollup is always consistent with the transactions table.
+Setting ``deleted_at`` (a soft delete) counts as removing the transaction. Bulk
+``query().update()/delete()`` statements bypass the listener; run
+``python manage.py rollups rebuild`` after those or to backfill. Rows of archived months
+outlive their transactions, see ``utils.archive``.
+"""
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import event, func, delete, select, cast, Date, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from const import DEFAULT_CURRENCY
+from models import Transaction, Category, MonthlyCategoryTotal, TransactionArchive
+from utils.transaction_enums import TransactionType
+
+_TRACKED = ("user_id", "transaction_date", "category_id", "transaction_type", "currency", "amount", "deleted_at")
+
+
+def _month(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def _key(user_id, transaction_date, category_id, transaction_type, currency):
+    # A new transaction's column default is only applied by the flush itself
+    return user_id, _month(transaction_date), category_id, TransactionType(transaction_type), \
+        currency or DEFAULT_CURRENCY
+
+
+def _previous_values(transaction: Transaction) -> dict:
+    """Column values as they were loaded from the database, before this flush's changes."""
+    state = inspect(transaction)
+    values = {}
+    for name in _TRACKED:
+        history = state.attrs[name].history
+        if history.deleted:
+            values[name] = history.deleted[0]
+        elif history.unchanged:
+            values[name] = history.unchanged[0]
+        else:
+            values[name] = getattr(transaction, name)
+    return values
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+# active_history makes SQLAlchemy load the old value of an expired attribute before it is
+# replaced, otherwise the deltas for an update made after a commit would miss the old key
+for _name in _TRACKED:
+    event.listen(getattr(Transaction, _name), "set", _load_previous_value, active_history=True, retval=True)
+
+
+def collect_deltas(session: Session) -> dict:
+    deltas = defaultdict(lambda: [Decimal(0), 0])
+
+    def add(values: dict, sign: int):
+        if values["user_id"] is None or values["transaction_date"] is None or values["category_id"] is None \
+                or values["deleted_at"] is not None:
+            return
+        key = _key(values["user_id"], values["transaction_date"], values["category_id"], values["transaction_type"],
+                   values["currency"])
+        deltas[key][0] += sign * Decimal(values["amount"] or 0)
+        deltas[key][1] += sign
+
+    for obj in session.new:
+        if isinstance(obj, Transaction):
+            add({name: getattr(obj, name) for name in _TRACKED}, 1)
+    for obj in session.deleted:
+        if isinstance(obj, Transaction):
+            add(_previous_values(obj), -1)
+    for obj in session.dirty:
+        if isinstance(obj, Transaction) and session.is_modified(obj, include_collections=False):
+            add(_previous_values(obj), -1)
+            add({name: getattr(obj, name) for name in _TRACKED}, 1)
+
+    return {key: delta for key, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def apply_deltas(connection, deltas: dict):
+    if not deltas:
+        return
+    table = MonthlyCategoryTotal.__table__
+    # Sorted so concurrent flushes lock rollup rows in the same order
+    rows = [{
+        "user_id": user_id, "month": month, "category_id": category_id, "transaction_type": transaction_type,
+        "currency": currency, "total_amount": amount, "transaction_count": count,
+    } for (user_id, month, category_id, transaction_type, currency), (amount, count) in sorted(deltas.items(),
+                                                                                                key=str)]
+
+    statement = insert(table).values(rows)
+    connection.execute(statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.month, table.c.category_id, table.c.transaction_type,
+                        table.c.currency],
+        set_={
+            "total_amount": table.c.total_amount + statement.excluded.total_amount,
+            "transaction_count": table.c.transaction_count + statement.excluded.transaction_count,
+        }
+    ))
+    connection.execute(delete(table).where(
+        table.c.user_id.in_({row["user_id"] for row in rows}),
+        table.c.transaction_count <= 0
+    ))
+
+
+@event.listens_for(Session, "before_flush")
+def _maintain_rollups(session: Session, flush_context, instances):
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def rebuild_rollups(session: Session, user_id=None):
+    """
+    Recompute the rollup from the live transactions, for one user or everyone. Archived months
+    are left as they are: most of their transactions are no longer here to count.
+    """
+    table = MonthlyCategoryTotal.__table__
+    archive = TransactionArchive.__table__
+    month = cast(func.date_trunc('month', Transaction.transaction_date), Date)
+
+    clear = delete(table).where(~select(archive.c.month).where(
+        archive.c.user_id == table.c.user_id, archive.c.month == table.c.month).exists())
+    # Explicit: the soft delete filter only applies to ORM selects, this runs inside an INSERT
+    source = select(
+        Transaction.user_id, month, Transaction.category_id, Transaction.transaction_type, Transaction.currency,
+        func.sum(Transaction.amount), func.count(Transaction.id)
+    ).join(Category, Category.id == Transaction.category_id).where(
+        Transaction.user_id.is_not(None), Transaction.deleted_at.is_(None), Category.deleted_at.is_(None),
+        ~select(archive.c.month).where(archive.c.user_id == Transaction.user_id, archive.c.month == month).exists()
+    ).group_by(
+        Transaction.user_id, month, Transaction.category_id, Transaction.transaction_type, Transaction.currency)
+    if user_id is not None:
+        clear = clear.where(table.c.user_id == user_id)
+        source = source.where(Transaction.user_id == user_id)
+
+    session.execute(clear)
+    session.execute(insert(table).from_select(
+        ["user_id", "month", "category_id", "transaction_type", "currency", "total_amount", "transaction_count"],
+        source))
+    session.commit()
+
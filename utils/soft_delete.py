@@ -0,0 +1,121 @@
+"""
+Soft delete for transactions and categories.
+
+Deleting either only sets ``deleted_at``. A ``do_orm_execute`` listener adds
+``deleted_at IS NULL`` for both models to every ORM select, joins and subqueries included,
+so deleted rows drop out of lists, reports, budgets and the agent tools at once and those
+queries stay on the partial indexes in ``models/transaction.py``. Transactions of a deleted
+category are hidden with it until they are purged. Pass
+``execution_options(include_deleted=True)`` to see them.
+
+The rows are removed for good in the background. ``purge_category`` runs after the
+response of a category delete and removes its transactions in chunks of
+``PURGE_BATCH_SIZE``, one database transaction per chunk, instead of the request cascading
+over all of them. ``purge_deleted`` runs periodically; it picks up categories whose purge
+did not run or finish and hard-deletes transactions deleted more than
+``SOFT_DELETE_RETENTION_DAYS`` ago.
+"""
+import logging
+from datetime import datetime, timezone, timedelta
+
+from sqlalchemy import event, select, delete, and_
+from sqlalchemy.orm import Session, ORMExecuteState, with_loader_criteria
+
+from const import PURGE_BATCH_SIZE, SOFT_DELETE_RETENTION_DAYS
+from models import Category, Transaction, MonthlyCategoryTotal
+from utils.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# An alias of the table, not the entity: the Category criterion below leaves it alone and it is
+# never correlated with categories joined by the enclosing query
+_deleted_categories = Category.__table__.alias("deleted_categories")
+
+
+def _live_transaction(cls):
+    # Correlated per row and scoped to the user, a probe of ix_categories_user_deleted, which
+    # only holds deleted categories
+    in_deleted_category = select(_deleted_categories.c.id).where(
+        _deleted_categories.c.user_id == cls.user_id, _deleted_categories.c.id == cls.category_id,
+        _deleted_categories.c.deleted_at.is_not(None)).correlate_except(_deleted_categories)
+    return and_(cls.deleted_at.is_(None), ~in_deleted_category.exists())
+
+
+def _live_category(cls):
+    return cls.deleted_at.is_(None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_deleted(execute_state: ORMExecuteState):
+    # Relationship and column loads inherit the criteria from the query that loaded the parent
+    if not execute_state.is_select or execute_state.is_column_load or execute_state.is_relationship_load \
+            or execute_state.execution_options.get("include_deleted", False):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(Transaction, _live_transaction, include_aliases=True),
+        with_loader_criteria(Category, _live_category, include_aliases=True),
+    )
+
+
+def soft_delete_category(session: Session, category: Category):
+    category.deleted_at = datetime.now(timezone.utc)
+    # Its rollup rows go right away so totals and budgets stop counting it before the purge
+    table = MonthlyCategoryTotal.__table__
+    session.execute(delete(table).where(table.c.user_id == category.user_id, table.c.category_id == category.id))
+
+
+def _delete_chunk(session: Session, *criteria) -> int:
+    table = Transaction.__table__
+    chunk = select(table.c.id).where(*criteria).limit(PURGE_BATCH_SIZE)
+    return session.execute(delete(table).where(table.c.id.in_(chunk))).rowcount
+
+
+def purge_category(category_id) -> int:
+    """
+    Hard-delete a soft-deleted category and its transactions; returns how many transactions
+    were deleted. Does nothing for a category that is not (or not yet visibly) deleted.
+    """
+    with SessionLocal() as session:
+        user_id = session.query(Category.user_id).execution_options(include_deleted=True).filter(
+            Category.id == category_id, Category.deleted_at.is_not(None)).scalar()
+    if user_id is None:
+        return 0
+
+    table = Transaction.__table__
+    purged = 0
+    while True:
+        # Hidden along with the category, whose delete already bumped the data version
+        with SessionLocal() as session:
+            deleted = _delete_chunk(session, table.c.user_id == user_id, table.c.category_id == category_id)
+            session.commit()
+        purged += deleted
+        if deleted < PURGE_BATCH_SIZE:
+            break
+
+    with SessionLocal() as session:
+        rollups = MonthlyCategoryTotal.__table__
+        # Again, in case a queued write reached the rollup after the delete request; budgets cascade
+        session.execute(delete(rollups).where(rollups.c.user_id == user_id, rollups.c.category_id == category_id))
+        session.execute(delete(Category.__table__).where(Category.__table__.c.id == category_id))
+        session.commit()
+    return purged
+
+
+def purge_deleted():
+    """Finish pending category purges and hard-delete transactions past the retention period."""
+    categories = Category.__table__
+    with SessionLocal() as session:
+        category_ids = session.scalars(select(categories.c.id).where(categories.c.deleted_at.is_not(None))).all()
+    for category_id in category_ids:
+        purged = purge_category(category_id)
+        logger.info("Purged deleted category %s with %s transactions", category_id, purged)
+
+    table = Transaction.__table__
+    cutoff = datetime.now(timezone.utc) - timedelta(days=SOFT_DELETE_RETENTION_DAYS)
+    while True:
+        # Already hidden and out of the rollup, so neither needs updating
+        with SessionLocal() as session:
+            deleted = _delete_chunk(session, table.c.deleted_at < cutoff)
+            session.commit()
+        if deleted < PURGE_BATCH_SIZE:
+            break
@@ -1,30 +1,38 @@
 from datetime import timedelta, datetime, timezone
-from typing import Dict
+from typing import Dict, Tuple
+from uuid import uuid4
 
 from fastapi import HTTPException
 from jwt import encode, decode, exceptions, ExpiredSignatureError, InvalidTokenError
 from starlette import status
 
-from const import ACCESS_SECRET_KEY, REFRESH_SECRET_KEY
+from const import ACCESS_SECRET_KEY, REFRESH_SECRET_KEY, ACCESS_TOKEN_EXPIRE_MINUTES, REFRESH_TOKEN_EXPIRE_MINUTES
 
 
 class Token:
 
     @staticmethod
-    def generate_token(email, id):
+    def generate_token(email, id) -> Tuple[str, str, Dict]:
+        """
+        Issue an access/refresh token pair. Both tokens carry a unique ``jti`` claim;
+        the refresh token payload is returned as well so it can be recorded in the token store.
+        """
+        now = datetime.now(timezone.utc)
         access_token_payload = {
             "email": email,
             "id": id,
-            "exp": datetime.now(timezone.utc) + timedelta(minutes=30)
+            "jti": str(uuid4()),
+            "exp": now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         }
         refresh_token_payload = {
             "email": email,
             "id": id,
-            "exp": datetime.now(timezone.utc) + timedelta(minutes=30)
+            "jti": str(uuid4()),
+            "exp": now + timedelta(minutes=REFRESH_TOKEN_EXPIRE_MINUTES)
         }
         access_token = encode(payload=access_token_payload, key=ACCESS_SECRET_KEY, algorithm='HS256')
         refresh_token = encode(payload=refresh_token_payload, key=REFRESH_SECRET_KEY, algorithm='HS256')
-        return access_token, refresh_token
+        return access_token, refresh_token, refresh_token_payload
 
     @staticmethod
     def verify_access_token(access_token: str) -> str:
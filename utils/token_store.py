@@ -0,0 +1,146 @@
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, Optional
+from uuid import UUID
+
+from sqlalchemy import event, update, delete
+from sqlalchemy.orm import Session
+
+from const import REVOKED_TOKEN_CACHE_SIZE
+
+logger = logging.getLogger(__name__)
+
+
+class RevokedTokenCache:
+    """
+    Bounded LRU set of revoked refresh token ids.
+
+    Replayed (already rotated or logged out) tokens are rejected from memory without a
+    database round trip. The database remains the source of truth, so a miss here only
+    means the id has to be checked against the token store.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._ids = OrderedDict()
+        self._lock = Lock()
+
+    def add(self, jti: str):
+        with self._lock:
+            self._ids[jti] = None
+            self._ids.move_to_end(jti)
+            if len(self._ids) > self.max_size:
+                self._ids.popitem(last=False)
+
+    def __contains__(self, jti: str) -> bool:
+        with self._lock:
+            if jti in self._ids:
+                self._ids.move_to_end(jti)
+                return True
+            return False
+
+    def __len__(self):
+        return len(self._ids)
+
+
+revoked_tokens = RevokedTokenCache(REVOKED_TOKEN_CACHE_SIZE)
+
+
+def _revoke_on_commit(session: Session, token_id: UUID):
+    # Cached only once the revocation is committed; a rolled back one leaves the token active
+    session.info.setdefault("revoked_jtis", set()).add(str(token_id))
+
+
+@event.listens_for(Session, "after_commit")
+def _cache_committed_revocations(session: Session):
+    for jti in session.info.pop("revoked_jtis", ()):
+        revoked_tokens.add(jti)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _forget_rolled_back_revocations(session: Session, previous_transaction):
+    if previous_transaction.parent is None:
+        session.info.pop("revoked_jtis", None)
+
+
+def _parse_jti(jti) -> Optional[UUID]:
+    try:
+        return UUID(str(jti))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenStore:
+    """Refresh token bookkeeping, keyed by the token id (``jti``) instead of the full token string."""
+
+    @staticmethod
+    def issue(session: Session, refresh_token_payload: Dict):
+        """Record a freshly issued refresh token. The caller is responsible for committing."""
+        from models import RefreshToken
+
+        session.add(RefreshToken(
+            jti=UUID(refresh_token_payload["jti"]),
+            user_id=UUID(refresh_token_payload["id"]),
+            expires_at=refresh_token_payload["exp"]
+        ))
+
+    @staticmethod
+    def consume(session: Session, jti) -> bool:
+        """
+        Atomically revoke a refresh token that is still active and report whether it was.
+
+        This is a single primary-key update, so concurrent attempts to reuse the same
+        refresh token can never both succeed.
+        """
+        from models import RefreshToken
+
+        token_id = _parse_jti(jti)
+        if token_id is None or str(token_id) in revoked_tokens:
+            return False
+
+        result = session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.jti == token_id,
+                   RefreshToken.is_revoked == False,
+                   RefreshToken.expires_at > datetime.now(timezone.utc))
+            .values(is_revoked=True)
+        )
+        if result.rowcount == 1:
+            _revoke_on_commit(session, token_id)
+            return True
+        # Already revoked, expired or unknown in the database, nothing of this transaction to wait for
+        revoked_tokens.add(str(token_id))
+        return False
+
+    @staticmethod
+    def revoke(session: Session, jti):
+        from models import RefreshToken
+
+        token_id = _parse_jti(jti)
+        if token_id is None:
+            return
+        session.execute(update(RefreshToken).where(RefreshToken.jti == token_id).values(is_revoked=True))
+        _revoke_on_commit(session, token_id)
+
+    @staticmethod
+    def prune_expired(session: Session) -> int:
+        """Delete tokens past their expiry; revoked-but-unexpired ids are kept so replays stay detectable."""
+        from models import RefreshToken
+
+        result = session.execute(delete(RefreshToken).where(RefreshToken.expires_at <= datetime.now(timezone.utc)))
+        session.commit()
+        return result.rowcount
+
+
+def prune_expired_tokens():
+    from utils.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        pruned = TokenStore.prune_expired(session)
+        if pruned:
+            logger.info("Pruned %s expired refresh tokens", pruned)
+    finally:
+        session.close()
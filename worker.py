@@ -0,0 +1,33 @@
+"""
+Standalone background job worker.
+
+Run it as a separate deployment (with JOB_WORKERS=0 on the API) so heavy reports and agent
+analyses never compete with request handling:
+
+    uv run python worker.py
+"""
+import logging
+import signal
+import threading
+
+from const import JOB_WORKERS
+from utils.jobs import JobWorkerPool
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+
+    pool = JobWorkerPool(workers=max(JOB_WORKERS, 1))
+    pool.start()
+    logging.info("Job worker started with %s threads", pool.workers)
+    stop.wait()
+
+    logging.info("Stopping job worker, waiting for running jobs")
+    pool.stop()
+
+
+if __name__ == "__main__":
+    main()